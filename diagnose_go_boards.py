@@ -0,0 +1,84 @@
+"""
+Benchmarks of the Go boards
+- clone: board.clone() vs copy.deepcopy, clones/sec on a half-filled board
+- playout: GoPlayoutEvaluator vs RandomRolloutEvaluator, playouts/sec from the empty board,
+  batch: GoPlayoutEvaluator of batch playouts per evaluate_state (the start & the scoring shared)
+"""
+import argparse
+import copy
+import time
+import numpy as np
+
+from go.go_common import GoStone
+from go.go_basic_board import GoBasicBoard
+from go.go_fast_board import GoFastBoard
+from go.go_array_board import GoArrayBoard
+from go.go_game import GoState
+from go.go_playout import GoPlayoutEvaluator
+from search.evaluators import RandomRolloutEvaluator
+
+
+BOARDS = (GoBasicBoard, GoFastBoard, GoArrayBoard)
+
+
+def get_random_board(board_cls, num, move_num, seed=0):
+    board = board_cls(num)
+    rng = np.random.RandomState(seed)
+    stone = GoStone.Black
+    for _ in range(move_num):
+        actions = board.iter_valid_moves(stone)
+        board.put_stone(actions[rng.randint(0, len(actions))], stone)
+        stone = GoStone.get_opponent(stone)
+    return board
+
+
+def get_rate(func, seconds, repeat=3):
+    """
+    :return: calls/sec, the best of repeat windows (less noise of other processes)
+    """
+    rates = []
+    for _ in range(repeat):
+        num = 0
+        beg = time.perf_counter()
+        while True:
+            func()
+            num += 1
+            elapsed = time.perf_counter() - beg
+            if elapsed >= seconds / repeat:
+                break
+        rates.append(num / elapsed)
+    return max(rates)
+
+
+def bench_clone(nums, seconds):
+    print("%-14s %4s %14s %14s %8s" % ("board", "num", "deepcopy/sec", "clone/sec", "speedup"))
+    for num in nums:
+        for board_cls in BOARDS:
+            board = get_random_board(board_cls, num, num * num // 2)
+            deepcopy_rate = get_rate(lambda: copy.deepcopy(board), seconds)
+            clone_rate = get_rate(board.clone, seconds)
+            print("%-14s %4d %14.0f %14.0f %7.1fx" % (
+                board_cls.__name__, num, deepcopy_rate, clone_rate, clone_rate / deepcopy_rate))
+
+
+def bench_playout(nums, seconds, batch=8):
+    print("%-24s %5s %4s %14s" % ("evaluator", "batch", "num", "playouts/sec"))
+    for num in nums:
+        for evaluator_cls, playout_num in ((RandomRolloutEvaluator, 1), (GoPlayoutEvaluator, 1),
+                                           (GoPlayoutEvaluator, batch)):
+            evaluator = evaluator_cls(playout_num, np.random.RandomState(0))
+            state = GoState(GoFastBoard(num))
+            rate = get_rate(lambda: evaluator.evaluate_state(state), seconds) * playout_num
+            print("%-24s %5d %4d %14.1f" % (evaluator_cls.__name__, playout_num, num, rate))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--nums", type=int, nargs="+", default=[9, 19], help="board sizes")
+    parser.add_argument("-s", "--seconds", type=float, default=1.0, help="seconds of each measure")
+    parser.add_argument("-t", "--tests", nargs="+", default=["clone", "playout"], choices=["clone", "playout"])
+    args = parser.parse_args()
+    if "clone" in args.tests:
+        bench_clone(args.nums, args.seconds)
+    if "playout" in args.tests:
+        bench_playout(args.nums, args.seconds)
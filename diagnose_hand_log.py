@@ -0,0 +1,32 @@
+import argparse
+import numpy as np
+
+from texas.judge import TexasJudge
+from texas.texas_games import NoLimitTexasGame
+from texas.hand_log import HandLogReader
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fname")
+    parser.add_argument("-n", "--num", type=int, default=None, help="only the hands of n players")
+    parser.add_argument("-r", "--replay", action="store_true", help="replay every hand & check the amounts")
+    args = parser.parse_args()
+
+    reader = HandLogReader(args.fname)
+    indexes = reader.filter(num=args.num)
+    records = reader[indexes]
+    print("hands", len(records), "showdowns", len(np.intersect1d(indexes, reader.filter(is_showdown=True))))
+    for num in np.unique(records["num"]):
+        sub_records = records[records["num"] == num]
+        big_blinds = sub_records["big_blind"][:, None].astype(np.int64)
+        bb_per_100 = (sub_records["amounts"][:, :num] / big_blinds).mean(axis=0) * 100
+        print("%d players" % num, "hands", len(sub_records), "bb/100 by seat", np.round(bb_per_100, 2))
+    if args.replay:
+        game = NoLimitTexasGame(TexasJudge())
+        wrong_num = 0
+        for index in indexes:
+            amounts, _ = reader.replay(index, game)
+            num = len(amounts)
+            wrong_num += not np.array_equal(amounts, reader[index]["amounts"][:num])
+        print("replayed", len(indexes), "wrong", wrong_num)
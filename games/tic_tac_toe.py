@@ -80,7 +80,9 @@ class TicTacToeState(TicTacToeBoard, IGameState):
         return score > 0.0
 
     def clone(self) -> IGameState:
-        return copy.deepcopy(self)
+        state = copy.copy(self)
+        state.board = self.board.copy()
+        return state
 
     def to_str(self) -> str:
         return super(TicTacToeState, self).to_str()
@@ -0,0 +1,19 @@
+import argparse
+import numpy as np
+
+from texas.judge import TexasJudge
+from texas.monte_carlo import BatchSimulator
+from texas import preflop
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--trial", type=int, default=100000)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default=preflop.TABLE_PATH)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    simulator = BatchSimulator(TexasJudge(), seed=args.seed)
+    table = preflop.build_table(simulator, args.trial, verbose=args.verbose)
+    np.save(args.output, table)
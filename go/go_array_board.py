@@ -0,0 +1,361 @@
+"""
+Array board
+1. 和GoFastBoard一样：int位置，pseudo liberty，环表示chain，empty单独成环
+2. 状态都在flat typed arrays (array.array)里，chain统计信息按chain head的位置存放
+3. Zobrist hash，落子/提子时增量更新
+4. move journal：每次写数组都记下旧值，undo()按O(改动的数量)恢复上一步，搜索可以原地落子/悔棋而不必clone
+5. positional superko：每条chain也有hash，提子后的hash可以O(1)算出，和历史局面的hash集合比较
+"""
+from __future__ import annotations
+import array
+import copy
+import numpy as np
+from typing import List, Iterable, Dict
+
+from .go_common import GoStone, IGoBoard, Coordinate, TStone, get_zobrist_keys
+
+
+BoardIndex = int
+GO_STONE_EMPTY = GoStone.Empty
+GUARD_HEAD = 0  # the chain head of the guards, its liberties never run out
+
+
+class GoArrayBoard(IGoBoard):
+    """
+    head[index]: chain head, the index of an empty point itself, GUARD_HEAD for the guards
+    next[index]: the ring of the chain
+    stones/liberties/liberty_sums/liberty_square_sums/chain_hashes[head]: the chain stats, see FastChainStat
+    positional superko（全局同型禁止）: history, the hashes of all the positions so far
+    """
+    PASS_INDEX = 0
+
+    def __init__(self, num: int):
+        self._num = num + 2
+        size = self._num ** 2
+        self._board = array.array("b", [GoStone.Guard] * size)
+        self._head = array.array("i", [GUARD_HEAD] * size)
+        self._next = array.array("i", range(size))
+        self._stones = array.array("i", [0] * size)
+        self._liberties = array.array("i", [0] * size)
+        self._liberty_sums = array.array("q", [0] * size)
+        self._liberty_square_sums = array.array("q", [0] * size)
+        self._chain_hashes = array.array("Q", [0] * size)
+        self._board_indexes: List[BoardIndex] = []
+        for row in range(1, self._num - 1):
+            for col in range(1, self._num - 1):
+                self._board_indexes.append(row * self._num + col)
+        for index in self._board_indexes:
+            self._board[index] = GO_STONE_EMPTY
+            self._head[index] = index
+        for index in self._board_indexes:
+            self._stones[index] = 1
+            for n in self._neighbors(index):
+                if self._board[n] == GO_STONE_EMPTY:
+                    self._add_liberty(index, n)
+        self._stones[GUARD_HEAD] = (self._num - 1) * 4
+        self._liberties[GUARD_HEAD] = 1 << 30
+
+        self._zobrist_keys = get_zobrist_keys(size)
+        self._hash = 0
+        self._history = {self._hash}
+        # journal: (array, index, old value), moves: (journal length, hash before the move, is a new position)
+        self._journal = []
+        self._moves = []
+
+    def _neighbors(self, index) -> Iterable[BoardIndex]:
+        return index - self._num, index - 1, index + 1, index + self._num
+
+    def _get_index(self, pos: Coordinate) -> BoardIndex:
+        return pos[0] * self._num + pos[1]
+
+    # journaled writes
+    def _set(self, values, index, value):
+        self._journal.append((values, index, values[index]))
+        values[index] = value
+
+    def _add_liberty(self, head, index):
+        self._liberties[head] += 1
+        self._liberty_sums[head] += index
+        self._liberty_square_sums[head] += index * index
+
+    def _journal_stats(self, head):
+        journal = self._journal
+        journal.append((self._liberties, head, self._liberties[head]))
+        journal.append((self._liberty_sums, head, self._liberty_sums[head]))
+        journal.append((self._liberty_square_sums, head, self._liberty_square_sums[head]))
+
+    def _in_atari(self, head) -> bool:
+        return self._liberty_sums[head] ** 2 == self._liberty_square_sums[head] * self._liberties[head]
+
+    # IGoBoard
+    def iter_valid_moves(self, stone: TStone) -> List[BoardIndex]:
+        # is_valid_move inlined, the captures are found once
+        board = self._board
+        liberties = self._liberties
+        keys = self._zobrist_keys[stone]
+        position_hash = self._hash
+        history = self._history
+        captures = self._get_captures(GoStone.get_opponent(stone))
+        actions = []
+        for index in self._board_indexes:
+            if board[index] != GO_STONE_EMPTY:
+                continue
+            if index in captures:
+                if position_hash ^ keys[index] ^ captures[index] not in history:
+                    actions.append(index)
+            elif (liberties[index] > 0 or self.is_valid_move(index, stone)) and \
+                    position_hash ^ keys[index] not in history:
+                actions.append(index)
+        actions.append(GoArrayBoard.PASS_INDEX)
+        return actions
+
+    def _get_captures(self, oppo_stone: TStone) -> Dict[BoardIndex, int]:
+        """
+        :return: {the liberty of the oppo chains in atari: xor of the hashes of the chains captured there}
+        """
+        captures = {}
+        chain_heads = set()
+        for index in self._board_indexes:
+            if self._board[index] != oppo_stone:
+                continue
+            chain_head = self._head[index]
+            if chain_head in chain_heads:
+                continue
+            chain_heads.add(chain_head)
+            if self._in_atari(chain_head):
+                # all the pseudo liberties are the same one
+                liberty = self._liberty_sums[chain_head] // self._liberties[chain_head]
+                captures[liberty] = captures.get(liberty, 0) ^ self._chain_hashes[chain_head]
+        return captures
+
+    def get_pass_move(self) -> BoardIndex:
+        return GoArrayBoard.PASS_INDEX
+
+    def is_valid_move(self, index: BoardIndex, stone: TStone) -> bool:
+        if index == GoArrayBoard.PASS_INDEX:
+            return True
+        board = self._board
+        if board[index] != GO_STONE_EMPTY:
+            return False
+        # one pass over the neighbors: liberties after the move & the captured chains for the hash
+        head = self._head
+        has_liberty = self._liberties[index] > 0
+        position_hash = self._hash ^ self._zobrist_keys[stone][index]
+        oppo_stone = GoStone.get_opponent(stone)
+        captured = []
+        for n in self._neighbors(index):
+            if board[n] == stone:
+                if not has_liberty and not self._in_atari(head[n]):
+                    has_liberty = True
+            elif board[n] == oppo_stone and head[n] not in captured and self._in_atari(head[n]):
+                # the only liberty is index
+                captured.append(head[n])
+                position_hash ^= self._chain_hashes[head[n]]
+                has_liberty = True
+        return has_liberty and position_hash not in self._history
+
+    def put_stone(self, index: BoardIndex, stone: TStone) -> None:
+        journal_len = len(self._journal)
+        old_hash = self._hash
+        if index == GoArrayBoard.PASS_INDEX:
+            self._moves.append((journal_len, old_hash, False))
+            return
+        assert self._board[index] == GO_STONE_EMPTY
+        self._join_chains(index, stone)
+        key = self._zobrist_keys[stone][index]
+        head = self._head
+        self._set(self._chain_hashes, head[index], self._chain_hashes[head[index]] ^ key)
+        self._hash ^= key
+        # remove liberties from all neighbors, including empty
+        for n in self._neighbors(index):
+            n_head = head[n]
+            self._journal_stats(n_head)
+            self._liberties[n_head] -= 1
+            self._liberty_sums[n_head] -= index
+            self._liberty_square_sums[n_head] -= index * index
+        # capture
+        oppo_stone = GoStone.get_opponent(stone)
+        for n in self._neighbors(index):
+            if self._board[n] == oppo_stone and self._liberties[head[n]] == 0:
+                self._remove_chain(n)
+        is_new = self._hash not in self._history
+        if is_new:
+            self._history.add(self._hash)
+        self._moves.append((journal_len, old_hash, is_new))
+
+    def _join_chains(self, index: BoardIndex, stone: TStone) -> None:
+        board = self._board
+        head = self._head
+        largest_size = 0
+        largest_head = 0
+        largest_index = 0
+        for n in self._neighbors(index):
+            if board[n] == stone and self._stones[head[n]] > largest_size:
+                largest_head = head[n]
+                largest_size = self._stones[largest_head]
+                largest_index = n
+        self._set(board, index, stone)
+        if largest_size == 0:
+            # use the stats of the empty point
+            return
+        for n in self._neighbors(index):
+            if board[n] != stone or head[n] == largest_head:
+                continue
+            self._join_stats(largest_head, head[n])
+            cur = n
+            while True:
+                self._set(head, cur, largest_head)
+                cur = self._next[cur]
+                if cur == n:
+                    break
+            # link the rings
+            next_n = self._next[n]
+            self._set(self._next, n, self._next[largest_index])
+            self._set(self._next, largest_index, next_n)
+        # join the stone
+        self._set(self._next, index, self._next[largest_index])
+        self._set(self._next, largest_index, index)
+        self._join_stats(largest_head, index)
+        self._set(head, index, largest_head)
+
+    def _join_stats(self, head, another):
+        self._set(self._stones, head, self._stones[head] + self._stones[another])
+        self._set(self._chain_hashes, head, self._chain_hashes[head] ^ self._chain_hashes[another])
+        self._journal_stats(head)
+        self._liberties[head] += self._liberties[another]
+        self._liberty_sums[head] += self._liberty_sums[another]
+        self._liberty_square_sums[head] += self._liberty_square_sums[another]
+
+    def _remove_chain(self, index: BoardIndex):
+        board = self._board
+        head = self._head
+        stone = board[index]
+        self._hash ^= self._chain_hashes[head[index]]
+        cur = index
+        while True:
+            self._set(board, cur, GO_STONE_EMPTY)
+            for n in self._neighbors(cur):
+                # the stones of the chain not removed yet (the head index may be reused by an empty point)
+                if board[n] == stone:
+                    continue
+                self._journal_stats(head[n])
+                self._add_liberty(head[n], cur)
+            # the stats of the empty point
+            self._set(head, cur, cur)
+            self._set(self._stones, cur, 1)
+            self._set(self._chain_hashes, cur, 0)
+            self._journal_stats(cur)
+            self._liberties[cur] = 0
+            self._liberty_sums[cur] = 0
+            self._liberty_square_sums[cur] = 0
+            for n in self._neighbors(cur):
+                if board[n] == GO_STONE_EMPTY:
+                    self._add_liberty(cur, n)
+            next_cur = self._next[cur]
+            self._set(self._next, cur, cur)
+            cur = next_cur
+            if cur == index:
+                break
+
+    def undo(self) -> None:
+        """
+        Restore the position before the last put_stone (pass included)
+        """
+        journal_len, old_hash, is_new = self._moves.pop()
+        if is_new:
+            self._history.remove(self._hash)
+        self._hash = old_hash
+        journal = self._journal
+        while len(journal) > journal_len:
+            values, index, value = journal.pop()
+            values[index] = value
+
+    def clone(self) -> GoArrayBoard:
+        """
+        Slice copies of the arrays, the journal is not copied: the clone can't undo the moves before it
+        """
+        board = copy.copy(self)
+        for name in ("_board", "_head", "_next", "_stones", "_liberties", "_liberty_sums", "_liberty_square_sums",
+                     "_chain_hashes"):
+            setattr(board, name, getattr(self, name)[:])
+        board._history = set(self._history)
+        board._journal = []
+        board._moves = []
+        return board
+
+    def get_move_num(self) -> int:
+        """
+        :return: the number of moves that can be undone
+        """
+        return len(self._moves)
+
+    def get_hash(self) -> int:
+        return self._hash
+
+    def is_repeated(self, position_hash: int) -> bool:
+        return position_hash in self._history
+
+    def get_board(self) -> np.array:
+        return np.array(self._board, dtype=int).reshape((self._num, self._num))
+
+    def num(self) -> int:
+        return self._num - 2
+
+    def to_str(self) -> str:
+        lines = []
+        for base in range(0, self._num ** 2, self._num):
+            lines.append(' '.join(GoStone.format(s) for s in self._board[base: base + self._num]))
+        return '\n'.join(lines)
+
+    def check_consistence(self) -> (bool, str):
+        """
+        For debugging/testing, the chain stats & the hash
+        """
+        board = self._board
+        head = self._head
+        checked_indexes = set()
+        position_hash = 0
+        for index in self._board_indexes:
+            position_hash ^= self._zobrist_keys[board[index]][index]
+            if index in checked_indexes:
+                continue
+            chain_head = head[index]
+            if self._liberties[chain_head] == 0 and board[index] != GO_STONE_EMPTY:
+                return False, "Chain({0}) w/o liberties".format(index)
+            cur = index
+            chain_len = 0
+            pseudo_liberties = 0
+            chain_hash = 0
+            liberties = set()
+            while True:
+                if head[cur] != chain_head:
+                    return False, "Chain heads diverge {0}/{1}".format(index, cur)
+                chain_len += 1
+                chain_hash ^= self._zobrist_keys[board[cur]][cur]
+                for n in self._neighbors(cur):
+                    if board[n] == GO_STONE_EMPTY:
+                        pseudo_liberties += 1
+                        liberties.add(n)
+                checked_indexes.add(cur)
+                cur = self._next[cur]
+                if cur == index:
+                    break
+            if board[index] != GO_STONE_EMPTY and ((len(liberties) == 1) ^ self._in_atari(chain_head)):
+                return False, "Chain({0}) wrong atari state".format(index)
+            if chain_len != self._stones[chain_head]:
+                return False, "Chain({0}) stones {1}, expecting {2}".format(
+                    index, chain_len, self._stones[chain_head])
+            if pseudo_liberties != self._liberties[chain_head]:
+                return False, "Chain({0}) pseudo liberties {1}, expecting {2}".format(
+                    index, pseudo_liberties, self._liberties[chain_head])
+            if chain_hash != self._chain_hashes[chain_head]:
+                return False, "Chain({0}) wrong hash".format(index)
+        if position_hash != self._hash:
+            return False, "Hash {0}, expecting {1}".format(self._hash, position_hash)
+        return True, ""
+
+    def put_stone_by_coordinate(self, coordinate: Coordinate, stone: TStone) -> None:
+        self.put_stone(self._get_index(coordinate), stone)
+
+    def is_valid_move_by_coordinate(self, coordinate: Coordinate, stone: TStone) -> bool:
+        return self.is_valid_move(self._get_index(coordinate), stone)
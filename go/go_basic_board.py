@@ -2,7 +2,7 @@ from __future__ import annotations
 import numpy as np
 from typing import List, Set, Iterable, Optional
 
-from .go_common import GoStone, IGoBoard, Coordinate, TStone
+from .go_common import GoStone, IGoBoard, Coordinate, TStone, get_zobrist_keys
 
 
 GoMove = Optional[Coordinate]
@@ -26,12 +26,14 @@ class GoBasicBoardUtil(object):
 class BasicChain(object):
     """
     Chain: joined stones and their liberties
+    hash: xor of the Zobrist keys of the stones, kept by GoBasicBoard
     """
     def __init__(self, stone: TStone) -> type(None):
         self._stone: TStone = stone
         self._stone_coordinates: List[Coordinate] = []
         self._liberties: Set[Coordinate] = set()
         self._oppo_neighbors: Set[BasicChain] = set()
+        self.hash = 0
 
     def append_stone(self, stone: TStone, coordinate: Coordinate,
                      liberties: Iterable[Coordinate], oppo_neighbors: Iterable[BasicChain]) -> type(None):
@@ -48,9 +50,21 @@ class BasicChain(object):
         self._stone_coordinates.extend(another._stone_coordinates)
         self._liberties.update(another._liberties)
         self._oppo_neighbors.update(another._oppo_neighbors)
+        self.hash ^= another.hash
         for oppo_neighbor in another._oppo_neighbors:
             oppo_neighbor._change_oppo(another, self)
 
+    def copy(self) -> BasicChain:
+        """
+        The opponent neighbors are still the original chains, see GoBasicBoard.clone
+        """
+        chain = BasicChain(self._stone)
+        chain._stone_coordinates = self._stone_coordinates[:]
+        chain._liberties = set(self._liberties)
+        chain._oppo_neighbors = set(self._oppo_neighbors)
+        chain.hash = self.hash
+        return chain
+
     def _change_oppo(self, src: BasicChain, dst: BasicChain):
         self._oppo_neighbors.remove(src)
         self._oppo_neighbors.add(dst)
@@ -140,7 +154,7 @@ class GoBasicBoard(IGoBoard):
     Basic implementation, w/o acceleration
     Boundary: use guard stones as boundary to avoid if/else
     Chain: joined stones and their liberties
-    ko is ignored（全局同型没有禁止）
+    positional superko（全局同型禁止）: Zobrist hash of the position, history: the hashes of all the positions so far
     """
     def __init__(self, num: int):
         # empty board
@@ -152,20 +166,29 @@ class GoBasicBoard(IGoBoard):
         self._board[:, -1] = GoStone.Guard
         # their chains
         self._chains = np.full((num + 2, num + 2), None, dtype=BasicChain)
+        # the same keys as the flat indexes of GoFastBoard
+        self._zobrist_keys = get_zobrist_keys((num + 2) ** 2)
+        self._hash = 0
+        self._history = {self._hash}
+
+    def _get_key(self, coordinate: Coordinate, stone: TStone) -> int:
+        return self._zobrist_keys[stone][coordinate[0] * (self._num + 2) + coordinate[1]]
 
     # board operation
     def is_valid_move(self, pos: GoMove, stone: TStone):
         """
-        尚未考虑全局同型（打劫相关问题）
+        全局同型禁止
         :param pos:
         :param stone:
         :return:
         """
         if pos is None:
             return True
-        my_coord = pos
-        if self._board[my_coord] != GoStone.Empty:
+        if self._board[pos] != GoStone.Empty:
             return False
+        return self._has_liberty_after(pos, stone) and self._get_hash_after(pos, stone) not in self._history
+
+    def _has_liberty_after(self, my_coord: Coordinate, stone: TStone) -> bool:
         opponent_stone = GoStone.get_opponent(stone)
 
         same_chains = set()
@@ -185,6 +208,24 @@ class GoBasicBoard(IGoBoard):
             return True
         return False
 
+    def _get_hash_after(self, my_coord: Coordinate, stone: TStone) -> int:
+        position_hash = self._hash ^ self._get_key(my_coord, stone)
+        opponent_stone = GoStone.get_opponent(stone)
+        captured = set()
+        for nx, ny in GoBasicBoardUtil.neighbors(*my_coord):
+            chain = self._chains[nx, ny]
+            if self._board[nx, ny] == opponent_stone and chain not in captured and \
+                    chain.get_liberties() == {my_coord}:
+                captured.add(chain)
+                position_hash ^= chain.hash
+        return position_hash
+
+    def get_hash(self) -> int:
+        return self._hash
+
+    def is_repeated(self, position_hash: int) -> bool:
+        return position_hash in self._history
+
     def put_stone(self, pos: GoMove, stone: TStone) -> None:
         if pos is None:
             return
@@ -219,6 +260,9 @@ class GoBasicBoard(IGoBoard):
             my_chain = BasicChain(stone)
             my_chain.append_stone(stone, my_coord, liberties, oppo_chains)
         self._chains[my_coord] = my_chain
+        key = self._get_key(my_coord, stone)
+        my_chain.hash ^= key
+        self._hash ^= key
         # check the opponents
         if oppo_chains:
             for chain in set(oppo_chains):
@@ -229,13 +273,32 @@ class GoBasicBoard(IGoBoard):
                     for coord in chain.get_coordinates():
                         self._chains[coord] = None
                         self._board[coord] = GoStone.Empty
+                    self._hash ^= chain.hash
                     chain.destroy_and_update_neighbors(self._board)
                     del chain
+        self._history.add(self._hash)
         return
 
     def get_board(self):
         return self._board
 
+    def clone(self) -> GoBasicBoard:
+        """
+        Each chain is copied once, the references between the chains are mapped to the copies
+        """
+        board = GoBasicBoard.__new__(GoBasicBoard)
+        board._num = self._num
+        board._board = self._board.copy()
+        board._zobrist_keys = self._zobrist_keys
+        board._hash = self._hash
+        board._history = set(self._history)
+        chains = {chain: chain.copy() for chain in set(self._chains.flat) if chain is not None}
+        for chain in chains.values():
+            chain._oppo_neighbors = {chains[c] for c in chain._oppo_neighbors}
+        board._chains = np.empty_like(self._chains)
+        board._chains.flat[:] = [chains.get(chain) for chain in self._chains.flat]
+        return board
+
     def iter_valid_moves(self, stone: TStone):
         moves = []
         for x in range(1, self._num + 1):
@@ -259,6 +322,13 @@ class GoBasicBoard(IGoBoard):
 
     # self-check
     def check_consistence(self) -> (bool, str):
+        position_hash = 0
+        for x in range(1, self._num + 1):
+            for y in range(1, self._num + 1):
+                if self._board[x, y] != GoStone.Empty:
+                    position_hash ^= self._get_key((x, y), self._board[x, y])
+        if position_hash != self._hash:
+            return False, "Hash {0}, expecting {1}".format(self._hash, position_hash)
         return True, ""
 
     # coordinate operation
@@ -43,6 +43,22 @@ class GoStone(object):
         }.get(stone, "Unknown")
 
 
+_zobrist_keys = {}
+
+
+def get_zobrist_keys(size: int) -> List[List[int]]:
+    """
+    Random 64-bit keys, keys[stone][index] for the flat indexes of a board with the guards (size = (num + 2) ** 2)
+    - the same keys for the same size, so the hashes of any boards of the same size are comparable
+    """
+    keys = _zobrist_keys.get(size)
+    if keys is None:
+        rng = np.random.default_rng(size)
+        keys = [[0] * size] + [rng.integers(1, 1 << 64, size, dtype=np.uint64).tolist() for _ in range(2)]
+        _zobrist_keys[size] = keys
+    return keys
+
+
 class IGoBoard(object):
     def is_valid_move(self, pos: Any, stone: TStone) -> bool:
         raise NotImplementedError()
@@ -62,6 +78,24 @@ class IGoBoard(object):
     def num(self) -> int:
         raise NotImplementedError()
 
+    def get_hash(self) -> int:
+        """
+        Zobrist hash of the position, the same for the same stones on any board implementation of the same size
+        """
+        raise NotImplementedError()
+
+    def is_repeated(self, position_hash: int) -> bool:
+        """
+        Whether the position of the hash has appeared on the board, forbidden by positional superko
+        """
+        raise NotImplementedError()
+
+    def clone(self) -> IGoBoard:
+        """
+        An independent copy, cheaper than copy.deepcopy
+        """
+        raise NotImplementedError()
+
     def to_str(self) -> str:
         raise NotImplementedError()
 
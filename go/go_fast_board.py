@@ -7,9 +7,9 @@ Fast board
 """
 from __future__ import annotations
 import numpy as np
-from typing import List, Iterable
+from typing import List, Iterable, Dict
 
-from .go_common import GoStone, IGoBoard, Coordinate, TStone
+from .go_common import GoStone, IGoBoard, Coordinate, TStone, get_zobrist_keys
 
 
 BoardIndex = int
@@ -21,17 +21,24 @@ class FastChainStat(object):
     Chain统计信息
     pseudo liberties: 各stone的liberty单独计算
     empty: 和谁都不想连，包括empty
+    hash: xor of the Zobrist keys of the stones, 0 for empty
     """
+    __slots__ = ("id_", "num_stones", "num_pseudo_liberties", "_pos_sum", "_pos_square_sum", "hash")
+
     def __init__(self, id_=0):
         self.id_ = id_
         self.num_stones = 1
         self.num_pseudo_liberties = 0
         self._pos_sum = 0
         self._pos_square_sum = 0
+        self.hash = 0
 
     def in_atari(self):
         return self._pos_sum ** 2 == self._pos_square_sum * self.num_pseudo_liberties
 
+    def get_atari_liberty(self):
+        return self._pos_sum // self.num_pseudo_liberties
+
     def add_liberty(self, index):
         self.num_pseudo_liberties += 1
         self._pos_sum += index
@@ -42,11 +49,22 @@ class FastChainStat(object):
         self._pos_sum -= index
         self._pos_square_sum -= index ** 2
 
+    def copy(self) -> FastChainStat:
+        stat = FastChainStat.__new__(FastChainStat)
+        stat.id_ = self.id_
+        stat.num_stones = self.num_stones
+        stat.num_pseudo_liberties = self.num_pseudo_liberties
+        stat._pos_sum = self._pos_sum
+        stat._pos_square_sum = self._pos_square_sum
+        stat.hash = self.hash
+        return stat
+
     def join(self, another: FastChainStat):
         self.num_stones += another.num_stones
         self.num_pseudo_liberties += another.num_pseudo_liberties
         self._pos_sum += another._pos_sum
         self._pos_square_sum += another._pos_square_sum
+        self.hash ^= another.hash
 
     def __repr__(self):
         return f"{self.id_}-{self.num_stones}/{self.num_pseudo_liberties}/{self.in_atari()}"
@@ -56,7 +74,7 @@ class GoFastBoard(IGoBoard):
     """
     chain_next: 形成一个环
     chain_head: 统计信息，FastChainStat
-    ko is ignored（全局同型没有禁止）
+    positional superko（全局同型禁止）: Zobrist hash of the position, history: the hashes of all the positions so far
     """
     PASS_INDEX = 0
 
@@ -72,6 +90,9 @@ class GoFastBoard(IGoBoard):
         self._board_indexes: List[BoardIndex] = []
         for index in self._iter_indexes():
             self._board_indexes.append(index)
+        self._zobrist_keys = get_zobrist_keys(board_size)
+        self._hash = 0
+        self._history = {self._hash}
 
     def _init_guard(self):
         self._board[:self._num] = [GoStone.Guard] * self._num
@@ -103,10 +124,8 @@ class GoFastBoard(IGoBoard):
         return chain_head
 
     def _neighbors(self, index) -> Iterable[BoardIndex]:
-        yield index - self._num
-        yield index - 1
-        yield index + 1
-        yield index + self._num
+        # a tuple is faster than a generator
+        return index - self._num, index - 1, index + 1, index + self._num
 
     def _iter_indexes(self) -> Iterable[BoardIndex]:
         index = self._num + 1
@@ -124,19 +143,51 @@ class GoFastBoard(IGoBoard):
         # Warning: NOT a good design, just to reduce time
         # cache _iter_indexes()
         # use const GO_STONE_EMPTY instead of GoStone.Empty
+        # is_valid_move inlined, the captures are found once
+        board = self._board
+        chain_head = self._chain_head
+        keys = self._zobrist_keys[stone]
+        position_hash = self._hash
+        history = self._history
+        captures = self._get_captures(GoStone.get_opponent(stone))
         actions = []
         for index in self._board_indexes:
-            if self._board[index] == GO_STONE_EMPTY and self.is_valid_move(index, stone):
+            if board[index] != GO_STONE_EMPTY:
+                continue
+            if index in captures:
+                if position_hash ^ keys[index] ^ captures[index] not in history:
+                    actions.append(index)
+            elif (chain_head[index].num_pseudo_liberties > 0 or self.is_valid_move(index, stone)) and \
+                    position_hash ^ keys[index] not in history:
                 actions.append(index)
         actions.append(GoFastBoard.PASS_INDEX)
         return actions
 
+    def _get_captures(self, oppo_stone: TStone) -> Dict[BoardIndex, int]:
+        """
+        :return: {the liberty of the oppo chains in atari: xor of the hashes of the chains captured there}
+        """
+        captures = {}
+        chain_heads = set()
+        for index in self._board_indexes:
+            if self._board[index] != oppo_stone:
+                continue
+            chain_head = self._chain_head[index]
+            if chain_head in chain_heads:
+                continue
+            chain_heads.add(chain_head)
+            if chain_head.in_atari():
+                # all the pseudo liberties are the same one
+                liberty = chain_head.get_atari_liberty()
+                captures[liberty] = captures.get(liberty, 0) ^ chain_head.hash
+        return captures
+
     def get_pass_move(self) -> BoardIndex:
         return GoFastBoard.PASS_INDEX
 
     def is_valid_move(self, index: BoardIndex, stone: TStone) -> bool:
         """
-        Pass is not included
+        Pass is always valid
         :param index:
         :param stone:
         :return:
@@ -145,23 +196,40 @@ class GoFastBoard(IGoBoard):
             return True
         if self._board[index] != GO_STONE_EMPTY:
             return False
-        if self._chain_head[index].num_pseudo_liberties > 0:
-            return True
+        # one pass over the neighbors: liberties after the move & the captured chains for the hash
+        chain_head = self._chain_head
+        has_liberty = chain_head[index].num_pseudo_liberties > 0
+        position_hash = self._hash ^ self._zobrist_keys[stone][index]
         oppo_stone = GoStone.get_opponent(stone)
-        for n in self._neighbors(index):
-            if self._board[n] == stone and not self._chain_head[n].in_atari():
-                return True
-            if self._board[n] == oppo_stone and self._chain_head[n].in_atari():
-                return True
-        return False
+        captured = []
+        for n in (index - self._num, index - 1, index + 1, index + self._num):
+            if self._board[n] == stone:
+                if not has_liberty and not chain_head[n].in_atari():
+                    has_liberty = True
+            elif self._board[n] == oppo_stone and chain_head[n].in_atari() and chain_head[n] not in captured:
+                # the only liberty is index
+                captured.append(chain_head[n])
+                position_hash ^= chain_head[n].hash
+                has_liberty = True
+        return has_liberty and position_hash not in self._history
+
+    def get_hash(self) -> int:
+        return self._hash
+
+    def is_repeated(self, position_hash: int) -> bool:
+        return position_hash in self._history
 
     def put_stone(self, index: BoardIndex, stone: TStone) -> None:
         if index == GoFastBoard.PASS_INDEX:
             return
         assert self._board[index] == GO_STONE_EMPTY
         self._join_chains(index, stone)
+        key = self._zobrist_keys[stone][index]
+        self._chain_head[index].hash ^= key
+        self._hash ^= key
         self._remove_neighbor_liberties(index)
         self._capture_dead_chains(index, stone)
+        self._history.add(self._hash)
         return
 
     def _join_chains(self, index: BoardIndex, stone: TStone) -> None:
@@ -218,6 +286,7 @@ class GoFastBoard(IGoBoard):
 
     def _remove_chain(self, index: BoardIndex):
         chain_head = self._chain_head[index]
+        self._hash ^= chain_head.hash
         cur = index
         while True:
             self._board[cur] = GO_STONE_EMPTY
@@ -233,6 +302,22 @@ class GoFastBoard(IGoBoard):
                 break
         return
 
+    def clone(self) -> GoFastBoard:
+        """
+        Slice copies of the lists, each chain stat is copied once & shared by its stones as before
+        """
+        board = GoFastBoard.__new__(GoFastBoard)
+        board._num = self._num
+        board._board = self._board[:]
+        board._chain_next = self._chain_next[:]
+        stats = {stat: stat.copy() for stat in set(self._chain_head)}
+        board._chain_head = [stats[stat] for stat in self._chain_head]
+        board._board_indexes = self._board_indexes  # never changed
+        board._zobrist_keys = self._zobrist_keys
+        board._hash = self._hash
+        board._history = set(self._history)
+        return board
+
     def get_board(self) -> np.array:
         return np.array(self._board).reshape((self._num, self._num))
 
@@ -257,7 +342,9 @@ class GoFastBoard(IGoBoard):
         :return:
         """
         checked_indexes = set()
+        position_hash = 0
         for index in self._iter_indexes():
+            position_hash ^= self._zobrist_keys[self._board[index]][index]
             if index in checked_indexes:
                 continue
             chain_head = self._chain_head[index]
@@ -266,11 +353,13 @@ class GoFastBoard(IGoBoard):
             cur = index
             chain_len = 0
             chain_pseudo_liberties = 0
+            chain_hash = 0
             liberties = set()
             while True:
                 if self._chain_head[cur] != chain_head:
                     return False, "Chain heads diverge {0}/{1}".format(index, cur)
                 chain_len += 1
+                chain_hash ^= self._zobrist_keys[self._board[cur]][cur]
                 for n in self._neighbors(cur):
                     if self._board[n] == GO_STONE_EMPTY:
                         chain_pseudo_liberties += 1
@@ -287,6 +376,10 @@ class GoFastBoard(IGoBoard):
                 return False, "Chain({0}) pseudo liberties {1}, expecting {2}".format(
                     index, chain_pseudo_liberties, chain_head.num_pseudo_liberties
                 )
+            if chain_hash != chain_head.hash:
+                return False, "Chain({0}) wrong hash".format(index)
+        if position_hash != self._hash:
+            return False, "Hash {0}, expecting {1}".format(self._hash, position_hash)
         return True, ""
 
     def put_stone_by_coordinate(self, coordinate: Coordinate, stone: TStone) -> None:
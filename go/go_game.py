@@ -30,6 +30,15 @@ class GoState(IGameState):
     def get_move_count(self) -> int:
         return self._move_cnt
 
+    def get_pass_count(self) -> int:
+        return self._pass_cnt
+
+    def get_max_move_count(self) -> int:
+        return self._max_move_count
+
+    def get_board(self) -> IGoBoard:
+        return self._board
+
     def get_valid_actions(self) -> List[Action]:
         return self._board.iter_valid_moves(self._stone)
 
@@ -63,7 +72,9 @@ class GoState(IGameState):
         return score > 0
 
     def clone(self) -> GoState:
-        return copy.deepcopy(self)
+        state = copy.copy(self)
+        state._board = self._board.clone()
+        return state
 
     def to_str(self) -> str:
         return self._board.to_str()
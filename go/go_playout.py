@@ -0,0 +1,310 @@
+"""
+Light playouts of Go, for the rollouts of MCTS
+1. 独立的playout引擎：从get_board()建立flat lists（和GoArrayBoard一样的chain/pseudo liberty），逻辑都inline在run里
+2. 维护空点列表，增量更新（落子删除，提子加回），不扫描整个棋盘
+3. 随机选空点，非法或填自己的眼就换一个（从候选中换出），都不行就pass
+4. 只禁止简单的劫（立即提回一子），不检查全局同型，max_move_num保证结束
+   开始时的劫由get_ko_index从真实棋盘的历史局面得到
+5. pass-pass结束（包括开始前已有的pass），然后快速数子：空点都是单点时直接按邻居计算，否则用GoJudge
+"""
+from __future__ import annotations
+import random
+import numpy as np
+from typing import List, Tuple, Any
+
+from .go_common import GoStone, TStone, IGoBoard, get_zobrist_keys
+from .go_game import GoState
+from .go_judge import GoJudge
+from search.mcts import IEvaluator
+
+
+GUARD_HEAD = 0  # the chain head of the guards, its liberties never run out
+
+
+class GoPlayout(object):
+    def __init__(self, seed=0):
+        self._rand = random.Random(seed)
+        self._judge = GoJudge()
+
+    def prepare(self, raw_board: np.array) -> tuple:
+        """
+        The chain lists & the empties of raw_board, built once for all the playouts from it
+        :return: the start of run, not changed by run
+        """
+        width = len(raw_board)
+        board, head, next_, stones, liberties, liberty_sums, liberty_square_sums = self._init_chains(
+            np.asarray(raw_board).ravel(), width)
+        empties = [index for index, s in enumerate(board) if s == GoStone.Empty]
+        # positions[index]: where index is in empties
+        positions = [0] * len(board)
+        for n, index in enumerate(empties):
+            positions[index] = n
+        return width, (board, head, next_, stones, liberties, liberty_sums, liberty_square_sums, empties, positions)
+
+    def run(self, raw_board: np.array, stone: TStone, max_move_num: int, pass_num=0, ko_index=-1,
+            start=None) -> List[int]:
+        """
+        :param raw_board: IGoBoard.get_board(), with the guards, not changed
+        :param stone: who moves first
+        :param max_move_num: the playout stops when reaching it, even w/o pass-pass
+        :param pass_num: the passes just before, 1 for the game ends if stone passes
+        :param ko_index: the flat index stone can't play at first, -1 for none, see get_ko_index
+        :param start: prepare(raw_board), None to build it here
+        :return: the final board, flat
+        """
+        width, lists = self.prepare(raw_board) if start is None else start
+        board, head, next_, stones, liberties, liberty_sums, liberty_square_sums, empties, positions = [
+            values[:] for values in lists]
+        rand = self._rand.random
+        empty_stone = GoStone.Empty
+        guard_stone = GoStone.Guard
+        oppo_stone = GoStone.get_opponent(stone)
+        for _ in range(max_move_num):
+            # candidates: empties[:candidate_num], the rejected ones are swapped out
+            candidate_num = len(empties)
+            index = -1
+            while candidate_num > 0:
+                n = int(rand() * candidate_num)
+                index = empties[n]
+                neighbors = (index - width, index - 1, index + 1, index + width)
+                is_valid = False
+                if index != ko_index:
+                    # own eye: all the neighbors are its stones or guards, oppo diagonals < 2 (< 1 on the edges)
+                    is_eye = True
+                    on_edge = False
+                    for nb in neighbors:
+                        if board[nb] == guard_stone:
+                            on_edge = True
+                        elif board[nb] != stone:
+                            is_eye = False
+                            break
+                    if is_eye:
+                        oppo_num = 0
+                        for nb in (index - width - 1, index - width + 1, index + width - 1, index + width + 1):
+                            if board[nb] == oppo_stone:
+                                oppo_num += 1
+                        is_eye = oppo_num == 0 if on_edge else oppo_num < 2
+                    if not is_eye:
+                        is_valid = liberties[index] > 0
+                        for nb in neighbors:
+                            if is_valid:
+                                break
+                            h = head[nb]
+                            in_atari = liberty_sums[h] ** 2 == liberty_square_sums[h] * liberties[h]
+                            if board[nb] == stone and not in_atari or board[nb] == oppo_stone and in_atari:
+                                is_valid = True
+                if is_valid:
+                    break
+                candidate_num -= 1
+                other = empties[candidate_num]
+                empties[n], empties[candidate_num] = other, index
+                positions[other], positions[index] = n, candidate_num
+                index = -1
+            if index < 0:
+                pass_num += 1
+                if pass_num >= 2:
+                    break
+                # the ko binds only the player to retake, the opponent may fill it
+                ko_index = -1
+                stone, oppo_stone = oppo_stone, stone
+                continue
+            pass_num = 0
+            # remove index from empties
+            last = empties.pop()
+            if last != index:
+                empties[positions[index]] = last
+                positions[last] = positions[index]
+            # join: the stats of the empty point are those of the new stone
+            board[index] = stone
+            h = index
+            for nb in neighbors:
+                nb_head = head[nb]
+                if board[nb] != stone or nb_head == h:
+                    continue
+                if stones[nb_head] > stones[h]:
+                    h, nb_head = nb_head, h
+                # relabel the smaller chain & link the rings
+                cur = nb_head
+                while True:
+                    head[cur] = h
+                    cur = next_[cur]
+                    if cur == nb_head:
+                        break
+                next_[h], next_[nb_head] = next_[nb_head], next_[h]
+                stones[h] += stones[nb_head]
+                liberties[h] += liberties[nb_head]
+                liberty_sums[h] += liberty_sums[nb_head]
+                liberty_square_sums[h] += liberty_square_sums[nb_head]
+            # remove liberties from all neighbors (including empty), then capture
+            # a chain next to 2 neighbors is captured after the 2nd
+            square = index * index
+            captured_num = 0
+            captured_index = -1
+            for nb in neighbors:
+                nb_head = head[nb]
+                liberties[nb_head] -= 1
+                liberty_sums[nb_head] -= index
+                liberty_square_sums[nb_head] -= square
+                if board[nb] != oppo_stone or liberties[nb_head] > 0:
+                    continue
+                cur = nb
+                while True:
+                    board[cur] = empty_stone
+                    captured_num += 1
+                    captured_index = cur
+                    positions[cur] = len(empties)
+                    empties.append(cur)
+                    cur_neighbors = (cur - width, cur - 1, cur + 1, cur + width)
+                    for n in cur_neighbors:
+                        # the stones of the chain not removed yet are skipped
+                        if board[n] != oppo_stone:
+                            n_head = head[n]
+                            liberties[n_head] += 1
+                            liberty_sums[n_head] += cur
+                            liberty_square_sums[n_head] += cur * cur
+                    # the stats of the empty point
+                    head[cur] = cur
+                    stones[cur] = 1
+                    liberties[cur] = liberty_sums[cur] = liberty_square_sums[cur] = 0
+                    for n in cur_neighbors:
+                        if board[n] == empty_stone:
+                            liberties[cur] += 1
+                            liberty_sums[cur] += n
+                            liberty_square_sums[cur] += n * n
+                    next_cur = next_[cur]
+                    next_[cur] = cur
+                    cur = next_cur
+                    if cur == nb:
+                        break
+            # simple ko: a single stone captured a single stone & is in atari
+            ko_index = captured_index if captured_num == 1 and stones[h] == 1 and liberties[h] == 1 else -1
+            stone, oppo_stone = oppo_stone, stone
+        return board
+
+    @staticmethod
+    def get_ko_index(board: IGoBoard, stone: TStone) -> int:
+        """
+        The point stone can't play now for retaking a ko, by the hashes of the positions of the board
+        :return: the flat index of IGoBoard.get_board(), -1 for none
+        """
+        raw_board = np.asarray(board.get_board())
+        width = len(raw_board)
+        flat_board = raw_board.ravel()
+        oppo_stone = GoStone.get_opponent(stone)
+        # the candidates: all the neighbors are the opponent's or the guards
+        indexes = np.flatnonzero(flat_board == GoStone.Empty)
+        is_blocked = (flat_board == oppo_stone) | (flat_board == GoStone.Guard)
+        indexes = indexes[is_blocked[indexes - width] & is_blocked[indexes - 1] & is_blocked[indexes + 1] &
+                          is_blocked[indexes + width]]
+        if len(indexes) == 0:
+            return -1
+        flat_board = flat_board.tolist()
+        keys = get_zobrist_keys(len(flat_board))
+        position_hash = board.get_hash()
+        for index in indexes.tolist():
+            neighbors = (index - width, index - 1, index + 1, index + width)
+            # the single stones with the only liberty at index
+            captured = [nb for nb in neighbors if flat_board[nb] == oppo_stone and all(
+                n == index or flat_board[n] == stone or flat_board[n] == GoStone.Guard
+                for n in (nb - width, nb - 1, nb + 1, nb + width))]
+            if len(captured) == 1 and board.is_repeated(
+                    position_hash ^ keys[stone][index] ^ keys[oppo_stone][captured[0]]):
+                return index
+        return -1
+
+    @staticmethod
+    def _init_chains(flat_board: np.array, width: int):
+        """
+        :return: board, head, next, stones, liberties, liberty_sums, liberty_square_sums (lists), see GoArrayBoard
+        """
+        size = len(flat_board)
+        board = flat_board.tolist()
+        head = np.where(flat_board == GoStone.Guard, GUARD_HEAD, np.arange(size)).tolist()
+        next_ = list(range(size))
+        stones = [1] * size
+        # the heads & the rings of the stones, an empty point is a chain of itself
+        for index in np.flatnonzero((flat_board == GoStone.Black) | (flat_board == GoStone.White)).tolist():
+            if head[index] != index or stones[index] != 1:
+                continue
+            stone = board[index]
+            chain = [index]
+            for cur in chain:
+                for n in (cur - width, cur - 1, cur + 1, cur + width):
+                    if board[n] == stone and n != index and head[n] == n:
+                        head[n] = index
+                        stones[n] = 0
+                        chain.append(n)
+            for cur, next_cur in zip(chain, chain[1:] + chain[:1]):
+                next_[cur] = next_cur
+            stones[index] = len(chain)
+        # the pseudo liberties: (head of the point, its empty neighbor) for all the points
+        points = np.flatnonzero(flat_board != GoStone.Guard)
+        neighbors = np.concatenate([points + d for d in (-width, -1, 1, width)])
+        is_liberty = flat_board[neighbors] == GoStone.Empty
+        heads = np.array(head)[np.tile(points, 4)[is_liberty]]
+        neighbors = neighbors[is_liberty]
+        liberties = np.bincount(heads, minlength=size)
+        liberties[GUARD_HEAD] = 1 << 30
+        liberty_sums = np.bincount(heads, weights=neighbors, minlength=size).astype(np.int64)
+        liberty_square_sums = np.bincount(heads, weights=neighbors ** 2, minlength=size).astype(np.int64)
+        return board, head, next_, stones, liberties.tolist(), liberty_sums.tolist(), liberty_square_sums.tolist()
+
+    def count_black(self, board: List[int]) -> float:
+        """
+        The same as GoJudge.count_black
+        After a playout almost all the empty points are single eyes, counted by their neighbors directly
+        :param board: flat, the result of run
+        """
+        width = int(round(len(board) ** 0.5))
+        black_cnt = 0.0
+        for index, stone in enumerate(board):
+            if stone == GoStone.Black:
+                black_cnt += 1
+            elif stone == GoStone.Empty:
+                is_black = False
+                is_white = False
+                for n in (index - width, index - 1, index + 1, index + width):
+                    if board[n] == GoStone.Black:
+                        is_black = True
+                    elif board[n] == GoStone.White:
+                        is_white = True
+                    elif board[n] == GoStone.Empty:
+                        # a larger empty region
+                        return self._judge.count_black(np.array(board).reshape((width, width)))
+                black_cnt += 0.5 if is_black and is_white else 1 if is_black else 0
+        return black_cnt
+
+    def get_black_win(self, board: List[int]) -> int:
+        return GoJudge.get_black_win_by_count(self.count_black(board), int(round(len(board) ** 0.5)))
+
+
+class GoPlayoutEvaluator(IEvaluator):
+    """
+    RandomRolloutEvaluator with light playouts, for GoState of any IGoBoard
+    """
+    def __init__(self, num, random_state):
+        self._num = num
+        self._playout = GoPlayout(random_state.randint(1 << 31))
+        self._judge = GoJudge()
+
+    def evaluate_action_priors(self, state: GoState) -> List[Tuple[Any, float]]:
+        actions = state.get_valid_actions()
+        if not actions:
+            return []
+        return list(zip(actions, [1 / len(actions)] * len(actions)))
+
+    def evaluate_state(self, state: GoState) -> List[float]:
+        board = state.get_board()
+        raw_board = board.get_board()
+        stone = state.get_current_stone()
+        max_move_num = state.get_max_move_count() - state.get_move_count()
+        ko_index = self._playout.get_ko_index(board, stone)
+        start = self._playout.prepare(raw_board)
+        final_boards = [self._playout.run(raw_board, stone, max_move_num, state.get_pass_count(), ko_index, start)
+                        for _ in range(self._num)]
+        if self._num == 1:
+            win = self._playout.get_black_win(final_boards[0])
+        else:
+            # scored at once
+            win = self._judge.get_black_win_batch(np.array(final_boards).reshape((-1, ) + raw_board.shape)).mean()
+        return np.array([win, -win])
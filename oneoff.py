@@ -4,7 +4,7 @@ import datetime as dt
 from texas.direct_calc import ApproxCalc
 from texas.direct_cmp import ApproxComparer
 from texas.judge import TexasJudge
-from texas.monte_carlo import Simulator
+from texas.monte_carlo import Simulator, BatchSimulator
 
 if __name__ == "__main__":
     cards = [(1, 2), (1, 3), (1, 4), (1, 5)]
@@ -25,3 +25,10 @@ if __name__ == "__main__":
         simulator.get_pr(hole_cards, community_cards, trial_num=1000)
     delta = dt.datetime.now() - beg
     print(delta)
+
+    batch_simulator = BatchSimulator(TexasJudge())
+    beg = dt.datetime.now()
+    for n in range(1000):
+        batch_simulator.get_pr(hole_cards, community_cards, trial_num=1000)
+    delta = dt.datetime.now() - beg
+    print(delta)
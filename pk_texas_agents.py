@@ -2,19 +2,24 @@ import argparse
 import numpy as np
 import pickle
 import copy
-import cProfile
 
 from texas.texas_games import NoLimitTexasGame
 from texas.judge import TexasJudge
-from texas.monte_carlo import Simulator
-from texas.agent import naive_agents
+from texas.monte_carlo import BatchSimulator
+from texas.preflop import PreflopTablePrCalc
+from texas.enumeration import ExactPrCalc
+from texas.pr_cache import CachedPrCalc
+from texas.hand_log import HandLogWriter
+from texas.duplicate import DuplicateEvaluator
+from texas.instrument import Instrument
+from texas.agent import naive_agents, model_io
 
 
-def start_game(agents, big_blind, max_epoch, seed):
+def start_game(agents, big_blind, max_epoch, seed, hand_log=None):
     judge = TexasJudge()
 
     np.random.seed(seed)
-    game = NoLimitTexasGame(judge, big_blind)
+    game = NoLimitTexasGame(judge, big_blind, seed=seed, hand_log=hand_log)
 
     max_bankrupt_num = 10
     min_agent_num = 4
@@ -61,10 +66,7 @@ def start_game(agents, big_blind, max_epoch, seed):
         print(a.get_name(), a.get_amount() + agent_rewards[a])
 
 
-def get_model(fname, big_blind):
-    judge = TexasJudge()
-    calc = Simulator(judge)
-
+def get_model(fname, big_blind, calc):
     model = {
         "static": naive_agents.StaticAgent(big_blind, 0, calc, 1000),
         "brave": naive_agents.BraveAgent(big_blind, 0, calc),
@@ -72,29 +74,60 @@ def get_model(fname, big_blind):
     }.get(fname)
     if model:
         return model
+    if model_io.is_model_dir(fname):
+        return model_io.load_model(fname, calc)
     with open(fname, "rb") as fin:
         return pickle.load(fin)
 
 
-def start_pk(left_name, right_name, seed):
+def start_duplicate(judge, left_name, right_name, models, big_blind, calc, deal_num, seed):
+    evaluator = DuplicateEvaluator(judge, models, big_blind=big_blind, seed=seed, memo={id(calc): calc})
+    scores = evaluator.run(deal_num)
+    print("Duplicate results -", deal_num, "deals x", len(models), "rotations")
+    for name, (bb_per_100, (low, high)) in zip((left_name, right_name), evaluator.get_bb_per_100(scores)):
+        print(name, "bb/100 %.2f [%.2f, %.2f]" % (bb_per_100, low, high))
+
+
+def start_pk(left_name, right_name, seed, hand_log_fname=None, duplicate_num=0):
     big_blind = 20
-    left_model = get_model(left_name, big_blind)
-    right_model = get_model(right_name, big_blind)
+    # shared by all the agents & their copies
+    judge = TexasJudge()
+    calc = CachedPrCalc(PreflopTablePrCalc(ExactPrCalc(judge, BatchSimulator(judge))))
+    left_model = get_model(left_name, big_blind, calc)
+    right_model = get_model(right_name, big_blind, calc)
     agents = [
         left_model, right_model,
-        *([copy.deepcopy(left_model) for _ in range(2)]),
-        *([copy.deepcopy(right_model) for _ in range(2)]),
+        *([copy.deepcopy(left_model, {id(calc): calc}) for _ in range(2)]),
+        *([copy.deepcopy(right_model, {id(calc): calc}) for _ in range(2)]),
     ]
     for index, a in enumerate(agents):
         a._agent_index = index
     if seed is None:
         seed = np.random.randint(0, 32768, (1), np.int)[0]
-    start_game(agents, big_blind, 1000, seed)
+    if duplicate_num > 0:
+        start_duplicate(judge, left_name, right_name, [left_model, right_model], big_blind, calc, duplicate_num, seed)
+        return
+    if hand_log_fname is None:
+        start_game(agents, big_blind, 1000, seed)
+        return
+    with HandLogWriter(hand_log_fname) as hand_log:
+        start_game(agents, big_blind, 1000, seed, hand_log)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("-l", "--left", required=True)
     parser.add_argument("-r", "--right", required=True)
     parser.add_argument("-s", "--seed", type=int, default=-1)
+    parser.add_argument("-o", "--hand_log", help="append the hands to this binary file")
+    parser.add_argument("-d", "--duplicate", type=int, default=0, help="duplicate poker of n deals, 0 for off")
+    parser.add_argument("-p", "--profile", action="store_true", help="time breakdown of the hot calls at the end")
+    parser.add_argument("--pstats", type=int, default=0, help="cProfile the first n hands to pk.pstats")
     args = parser.parse_args()
-    start_pk(args.left, args.right, args.seed if args.seed >= 0 else None)
\ No newline at end of file
+    instrument = Instrument()
+    if args.profile or args.pstats > 0:
+        instrument.enable()
+        if args.pstats > 0:
+            instrument.profile_hands(args.pstats, "pk.pstats")
+    start_pk(args.left, args.right, args.seed if args.seed >= 0 else None, args.hand_log, args.duplicate)
+    if args.profile:
+        print(instrument.format_stats())
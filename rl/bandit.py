@@ -1,8 +1,14 @@
+import copy
 import random
 import math
+import numpy as np
 
 
 class GreedySampler(object):
+    def seed(self, seed):
+        # deterministic
+        pass
+
     @staticmethod
     def get_action(available_actions, action_scores, _):
         largest = None
@@ -25,6 +31,9 @@ class EpsilonGreedySampler(object):
         self._rand = random.Random(0)
         self._count = 0
 
+    def seed(self, seed):
+        self._rand.seed(seed)
+
     def get_action(self, available_actions, action_scores, _):
         self._count += 1
         eps_threshold = self._eps_end + (self._eps_start - self._eps_end) * math.exp(
@@ -54,6 +63,9 @@ class ThompsonSampler(object):
         self._b = b
         self._rand = random.Random(0)
 
+    def seed(self, seed):
+        self._rand.seed(seed)
+
     def get_action(self, available_actions, action_scores, action_counts):
         largest = None
         best = None
@@ -69,3 +81,94 @@ class ThompsonSampler(object):
                 largest = r
                 best = action
         return best
+
+
+def get_best_actions(scores, masks=None, rng=None):
+    """
+    Argmax of each row over the available actions
+    :param scores: [B, A]
+    :param masks: bool [B, A], the available actions, None for all, at least one in each row
+    :param rng: np.random.Generator to break the ties uniformly, None for the first one
+    :return: int array [B]
+    """
+    scores = np.asarray(scores, dtype=float)
+    if masks is not None:
+        scores = np.where(masks, scores, -np.inf)
+    if rng is None:
+        return scores.argmax(axis=1)
+    is_best = scores == scores.max(axis=1, keepdims=True)
+    return (rng.random(scores.shape) * is_best).argmax(axis=1)
+
+
+def get_random_actions(masks, rng):
+    """
+    :return: int array [B], uniform over the available actions of each row
+    """
+    return (rng.random(masks.shape) * masks).argmax(axis=1)
+
+
+class BatchSampler(object):
+    """
+    get_actions(scores [B, A], counts [B, A], masks) -> B actions, the column indexes
+    - one np.random.Generator per sampler, spawn() for independent streams, e.g. one per environment
+    """
+    def __init__(self, seed=0):
+        self._seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self._rng = np.random.default_rng(self._seed_seq)
+
+    def spawn(self, num):
+        samplers = []
+        for seed_seq in self._seed_seq.spawn(num):
+            sampler = copy.copy(self)
+            BatchSampler.__init__(sampler, seed_seq)
+            samplers.append(sampler)
+        return samplers
+
+    def get_actions(self, scores, counts, masks=None):
+        raise NotImplementedError()
+
+
+class BatchGreedySampler(BatchSampler):
+    """
+    GreedySampler: the first best one, the first available one if the row is not visited
+    """
+    def get_actions(self, scores, counts, masks=None):
+        masks = np.ones(np.shape(scores), dtype=bool) if masks is None else masks
+        return np.where(np.asarray(counts).any(axis=1), get_best_actions(scores, masks), masks.argmax(axis=1))
+
+
+class BatchEpsilonGreedySampler(BatchSampler):
+    """
+    EpsilonGreedySampler, the decay goes on per row
+    """
+    def __init__(self, eps_start=0.9, eps_end=0.05, eps_decay=1000, seed=0):
+        super().__init__(seed)
+        self._eps_start = eps_start
+        self._eps_end = eps_end
+        self._eps_decay = eps_decay
+        self._count = 0
+
+    def get_actions(self, scores, counts, masks=None):
+        batch_size = len(scores)
+        masks = np.ones(np.shape(scores), dtype=bool) if masks is None else masks
+        row_counts = self._count + np.arange(1, batch_size + 1)
+        self._count += batch_size
+        eps_thresholds = self._eps_end + (self._eps_start - self._eps_end) * np.exp(-row_counts / self._eps_decay)
+        is_random = self._rng.random(batch_size) < eps_thresholds
+        return np.where(is_random, get_random_actions(masks, self._rng), get_best_actions(scores, masks, self._rng))
+
+
+class BatchThompsonSampler(BatchSampler):
+    """
+    ThompsonSampler, scores in [-1, 1]
+    """
+    def __init__(self, a=1, b=1, seed=0):
+        super().__init__(seed)
+        self._a = a
+        self._b = b
+
+    def get_actions(self, scores, counts, masks=None):
+        counts = np.asarray(counts, dtype=float)
+        a = counts * (np.asarray(scores) + 1.0) * 0.5
+        draws = self._rng.beta(self._a + a, self._b + counts - a)
+        return get_best_actions(draws, masks)
@@ -2,13 +2,17 @@
 Simple Q-learning
 """
 
+import copy
 import random
+import numpy as np
 from collections import defaultdict
 from rl import bandit
 
 
 class QLearner(object):
     GAMMA = 0.99
+    # no update at all, e.g. the copies for an evaluation
+    is_frozen = False
 
     def __init__(self, sampler, alpha):
         self._q_values = {}
@@ -29,6 +33,8 @@ class QLearner(object):
         return self._sampler.get_action(available_actions, action_scores, action_counts)
 
     def update(self, state, action, next_state, reward):
+        if self.is_frozen:
+            return
         action_values = self._q_values.get(state)
         if action_values is None:
             action_values = defaultdict(self._get_default_value)
@@ -42,6 +48,10 @@ class QLearner(object):
         )
         action_counts[action] += 1
 
+    def update_batch(self, states, actions, next_states, rewards):
+        for transition in zip(states, actions, next_states, rewards):
+            self.update(*transition)
+
     def _get_q_value(self, state, action):
         action_values = self._q_values.get(state)
         if action_values is None:
@@ -53,3 +63,129 @@ class QLearner(object):
         if action_values is None:
             return self._default_value
         return max(action_values.values())
+
+
+class ActorQLearner(QLearner):
+    """
+    Acts by a copy of the table, records the transitions instead of learning
+    - transitions: [(state, action, next_state, reward)], for QLearner.update of the learner
+    - set_values: the table broadcast by the learner
+    """
+    def __init__(self, sampler, alpha, seed=0):
+        super().__init__(copy.deepcopy(sampler), alpha)
+        self._rand.seed(seed)
+        self._sampler.seed(seed)
+        self.transitions = []
+
+    def update(self, state, action, next_state, reward):
+        if self.is_frozen:
+            return
+        self.transitions.append((state, action, next_state, reward))
+
+    def pop_transitions(self):
+        transitions, self.transitions = self.transitions, []
+        return transitions
+
+    def set_values(self, q_values, q_counts):
+        """
+        :param q_values: {state: {action: value}}, only the states changed
+        """
+        self._q_values.update(q_values)
+        self._q_counts.update(q_counts)
+
+
+class DenseQLearner(QLearner):
+    """
+    QLearner on a DenseQTable, the same actions & values as the dict tables
+    - state None is terminal
+    - with a replay_buffer, update only records the transition, learn() replays them in batches
+    - is_frozen: no update at all, e.g. a read-only table for inference
+    """
+    def __init__(self, sampler, alpha, table, replay_buffer=None, is_frozen=False):
+        super().__init__(sampler, alpha)
+        self.table = table
+        self.replay_buffer = replay_buffer
+        self.is_frozen = is_frozen
+        self._q_values = None
+        self._q_counts = None
+
+    def get_action(self, state, available_actions, iter_cnt=None):
+        table = self.table
+        index = table.get_index(state)
+        is_visited = index >= 0 and table.max_values.item(index) != -float("inf")
+        if iter_cnt is None:
+            if not is_visited:
+                return available_actions[0]
+            best = None
+            largest = None
+            for action in available_actions:
+                score = table.values.item(index, table.get_action_index(action))
+                if largest is None or score > largest:
+                    largest = score
+                    best = action
+            return best
+        if not is_visited:
+            return self._sampler.get_action(available_actions, {}, {})
+        action_scores = dict(zip(table.actions, table.values[index].tolist()))
+        action_counts = dict(zip(table.actions, table.counts[index].tolist()))
+        return self._sampler.get_action(available_actions, action_scores, action_counts)
+
+    def get_actions(self, states, masks=None, sampler=None):
+        """
+        get_action for a batch
+        :param states: flat indexes of the table, int array [B]
+        :param masks: bool [B, num_actions], the available actions, None for all
+        :param sampler: bandit.BatchSampler, None for greedy
+        :return: columns, int array [B]
+        """
+        sampler = bandit.BatchGreedySampler() if sampler is None else sampler
+        return sampler.get_actions(self.table.values[states], self.table.counts[states], masks)
+
+    def update(self, state, action, next_state, reward):
+        if state is None or self.is_frozen:
+            return
+        table = self.table
+        index = table.get_index(state)
+        column = table.get_action_index(action)
+        next_index = table.get_index(next_state)
+        if self.replay_buffer is not None:
+            self.replay_buffer.add(index, column, next_index, reward)
+            return
+        value = table.values.item(index, column)
+        next_value = table.get_value(next_index)
+        if next_index == index:
+            # the action is visited already in the max, the same as the defaultdict
+            next_value = max(next_value, value)
+        table.set_value(index, column, (1.0 - self._alpha) * value + self._alpha * (
+            reward + next_value * self.GAMMA
+        ))
+
+    def _get_q_value(self, state, action):
+        if state is None:
+            return self.table.default_value
+        return self.table.values.item(self.table.get_index(state), self.table.get_action_index(action))
+
+    def _get_value(self, state):
+        return self.table.get_value(self.table.get_index(state))
+
+    def update_batch(self, states, actions, next_states, rewards):
+        """
+        TD update of a batch against the values before it, k duplicates of (state, action) with the mean target t:
+        v = (1 - alpha)^k * v + (1 - (1 - alpha)^k) * t, exact if their targets are the same
+        :param states: flat indexes of the table, int array [B]
+        :param actions: columns, int array [B]
+        :param next_states: flat indexes, -1 for terminal
+        """
+        targets = np.asarray(rewards, dtype=float) + self.table.get_max_values(next_states) * self.GAMMA
+        self.table.add_targets(states, actions, targets, self._alpha)
+
+    def learn(self, batch_size=None, batch_num=1):
+        """
+        Replay the buffer
+        :param batch_size: None for all the transitions once, in batches of the buffer order
+        """
+        if batch_size is None:
+            self.update_batch(*self.replay_buffer.get_all())
+            return
+        for _ in range(batch_num):
+            self.update_batch(*self.replay_buffer.sample(batch_size))
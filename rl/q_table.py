@@ -0,0 +1,156 @@
+"""
+Dense Q-table for small bounded state spaces
+- state: tuple of ints, dimension d in [offsets[d], offsets[d] + sizes[d]), clipped into it
+- flat index: row-major over sizes, values & counts [num_states, num_actions]
+- an action is visited iff its count > 0, the same as the keys of the dict table of QLearner
+- max_values [num_states]: max over the visited actions, -inf if none, kept by set_value
+"""
+import copy
+import numpy as np
+
+
+class DenseQTable(object):
+    def __init__(self, sizes, actions, offsets=None, default_value=0.0, *, values=None, counts=None, max_values=None):
+        """
+        :param sizes: size of each state dimension
+        :param actions: all the actions, the columns
+        :param offsets: min of each state dimension, None for 0s
+        :param values: with counts & max_values, the arrays of a saved table (e.g. read-only memmaps), None for new
+        """
+        self.sizes = tuple(sizes)
+        self.offsets = (0, ) * len(self.sizes) if offsets is None else tuple(offsets)
+        self.actions = list(actions)
+        self.num_states = int(np.prod(self.sizes))
+        self.num_actions = len(self.actions)
+        self.default_value = default_value
+        if values is None:
+            values = np.full((self.num_states, self.num_actions), default_value)
+            counts = np.zeros((self.num_states, self.num_actions), dtype=np.int32)
+            max_values = np.full(self.num_states, -np.inf)
+        assert values.shape == counts.shape == (self.num_states, self.num_actions)
+        self.values = values
+        self.counts = counts
+        self.max_values = max_values
+        self._action_indexes = {action: n for n, action in enumerate(self.actions)}
+        self._strides = [int(np.prod(self.sizes[d + 1:])) for d in range(len(self.sizes))]
+        self._bounds = list(zip(self.offsets, self.sizes, self._strides))
+        self._index_cache = {None: -1}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_index_cache"] = {None: -1}
+        return state
+
+    def __deepcopy__(self, memo):
+        # the read-only arrays (e.g. memmaps of a saved model) are shared by the copies
+        table = copy.copy(self)
+        memo[id(self)] = table
+        for name in ("values", "counts", "max_values"):
+            array = getattr(self, name)
+            setattr(table, name, array.copy() if array.flags.writeable else array)
+        table._index_cache = dict(self._index_cache)
+        return table
+
+    def get_index(self, state):
+        """
+        :return: flat index, -1 for None (terminal)
+        """
+        index = self._index_cache.get(state)
+        if index is not None:
+            return index
+        index = 0
+        for x, (offset, size, stride) in zip(state, self._bounds):
+            x -= offset
+            index += (0 if x < 0 else size - 1 if x >= size else x) * stride
+        self._index_cache[state] = index
+        return index
+
+    def get_indexes(self, states):
+        """
+        :param states: int array [B, d]
+        :return: int array [B]
+        """
+        states = np.clip(np.asarray(states) - self.offsets, 0, np.array(self.sizes) - 1)
+        return np.ravel_multi_index(tuple(states.T), self.sizes)
+
+    def get_action_index(self, action):
+        return self._action_indexes[action]
+
+    def get_action_indexes(self, actions):
+        return np.array([self._action_indexes[a] for a in actions], dtype=int)
+
+    def get_value(self, index):
+        """
+        Max over the visited actions, default_value if none or index -1
+        """
+        value = self.max_values.item(index) if index >= 0 else -np.inf
+        return self.default_value if value == -np.inf else value
+
+    def get_max_values(self, indexes):
+        """
+        get_value for arrays
+        :param indexes: int array [B]
+        """
+        indexes = np.asarray(indexes)
+        values = np.where(indexes >= 0, self.max_values[indexes], -np.inf)
+        return np.where(values == -np.inf, self.default_value, values)
+
+    def set_value(self, index, column, value):
+        """
+        Visit (index, column) with the new value
+        """
+        old_value = self.values.item(index, column)
+        max_value = self.max_values.item(index)
+        self.values[index, column] = value
+        self.counts[index, column] += 1
+        if value >= max_value:
+            self.max_values[index] = value
+        elif old_value == max_value:
+            self.max_values[index] = max(self.values.item(index, c) for c in range(self.num_actions)
+                                         if self.counts.item(index, c) > 0)
+
+    def add_targets(self, indexes, columns, targets, alpha):
+        """
+        Batched set_value, see DenseQLearner.update_batch
+        """
+        flats, inverse = np.unique(np.asarray(indexes) * self.num_actions + np.asarray(columns), return_inverse=True)
+        nums = np.bincount(inverse, minlength=len(flats))
+        means = np.bincount(inverse, weights=targets, minlength=len(flats)) / nums
+        values = self.values.reshape(-1)
+        decays = (1.0 - alpha) ** nums
+        values[flats] = decays * values[flats] + (1.0 - decays) * means
+        self.counts.reshape(-1)[flats] += nums.astype(self.counts.dtype)
+        rows = np.unique(flats // self.num_actions)
+        self.max_values[rows] = np.where(self.counts[rows] > 0, self.values[rows], -np.inf).max(axis=1)
+
+    def _update_max_values(self):
+        self.max_values = np.where(self.counts > 0, self.values, -np.inf).max(axis=1)
+
+    def get_best_actions(self, indexes, action_indexes=None):
+        """
+        The first best action of the available ones, the first available one if the state is not visited
+        :param action_indexes: int array [k], the available columns, None for all
+        :return: int array [B], the columns
+        """
+        action_indexes = np.arange(self.num_actions) if action_indexes is None else np.asarray(action_indexes)
+        rows = np.asarray(indexes)[:, None]
+        best = action_indexes[self.values[rows, action_indexes].argmax(axis=1)]
+        return np.where(self.counts[rows[:, 0]].any(axis=1), best, action_indexes[0])
+
+    def get_visited_num(self):
+        return int((self.counts > 0).any(axis=1).sum())
+
+    def load_dict(self, q_values, q_counts):
+        """
+        From the dict tables of QLearner, the states out of range are clipped
+        """
+        for state, action_values in q_values.items():
+            if state is None:
+                continue
+            index = self.get_index(state)
+            for action, value in action_values.items():
+                if action in self._action_indexes:
+                    self.values[index, self._action_indexes[action]] = value
+                    self.counts[index, self._action_indexes[action]] += q_counts[state][action]
+        self._update_max_values()
+        return self
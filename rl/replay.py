@@ -0,0 +1,62 @@
+"""
+Experience replay
+- ring buffer of transitions in arrays, the oldest are overwritten when full
+- states: flat indexes of DenseQTable, -1 for the terminal state
+"""
+import numpy as np
+
+
+class ReplayBuffer(object):
+    def __init__(self, capacity, seed=0):
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.next_states = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity)
+        self._pos = 0
+        self._num = 0
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self._num
+
+    def add(self, state, action, next_state, reward):
+        pos = self._pos
+        self.states[pos] = state
+        self.actions[pos] = action
+        self.next_states[pos] = next_state
+        self.rewards[pos] = reward
+        self._pos = (pos + 1) % self.capacity
+        self._num = min(self._num + 1, self.capacity)
+
+    def add_batch(self, states, actions, next_states, rewards):
+        n = len(states)
+        if n > self.capacity:
+            states, actions, next_states, rewards = (
+                x[-self.capacity:] for x in (states, actions, next_states, rewards))
+            n = self.capacity
+        positions = (self._pos + np.arange(n)) % self.capacity
+        self.states[positions] = states
+        self.actions[positions] = actions
+        self.next_states[positions] = next_states
+        self.rewards[positions] = rewards
+        self._pos = (self._pos + n) % self.capacity
+        self._num = min(self._num + n, self.capacity)
+
+    def get_all(self):
+        """
+        :return: states, actions, next_states, rewards, the oldest first
+        """
+        positions = (self._pos - self._num + np.arange(self._num)) % self.capacity
+        return self.states[positions], self.actions[positions], self.next_states[positions], self.rewards[positions]
+
+    def sample(self, batch_size):
+        """
+        Uniform, with replacement
+        """
+        positions = self._rng.integers(0, self._num, batch_size)
+        return self.states[positions], self.actions[positions], self.next_states[positions], self.rewards[positions]
+
+    def clear(self):
+        self._pos = 0
+        self._num = 0
@@ -0,0 +1,31 @@
+import argparse
+import time
+
+from texas.tournament import Tournament
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("agents", nargs="+", help="static/brave/random or pickled models")
+    parser.add_argument("-n", "--hand_num", type=int, default=1000, help="hands per match")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-w", "--worker_num", type=int, default=None, help="None for all cores")
+    parser.add_argument("-r", "--swiss_round", type=int, default=0, help="0 for round-robin")
+    args = parser.parse_args()
+
+    beg_time = time.time()
+    tournament = Tournament(args.agents, args.hand_num, args.seed, worker_num=args.worker_num)
+    if args.swiss_round > 0:
+        tournament.run_swiss(args.swiss_round)
+    else:
+        tournament.run_round_robin()
+    print("Matches")
+    for match in tournament.matches:
+        left, right = match["results"].sum(axis=0)
+        print(match["index"], args.agents[match["left"]], args.agents[match["right"]],
+              "seed", match["seed"], "chips", left, right)
+    print("Standings (bb/100 per seat, 95% interval)")
+    standings = sorted(tournament.get_standings(), key=lambda x: -x[1])
+    for name, bb_per_100, (low, high), hand_num in standings:
+        print("\t%s\t%.1f\t[%.1f, %.1f]\thands %d" % (name, bb_per_100, low, high, hand_num))
+    print("seconds", time.time() - beg_time)
@@ -11,7 +11,7 @@ from go.go_game import GoState, IGameState
 from go.go_basic_board import GoBasicBoard
 from go.go_fast_board import GoFastBoard
 from search.mcts import Mcts
-from search.evaluators import RandomRolloutEvaluator
+from go.go_playout import GoPlayoutEvaluator
 
 
 class GoToIndexConverter(IActionConverter):
@@ -68,7 +68,7 @@ if __name__ == "__main__":
     def state_factory_method():
         return GoState(GoFastBoard(board_size))
 
-    mcts_core = Mcts(RandomRolloutEvaluator(1, rng), puct_const=2.0, max_simulations=1000, random_state=rng)
+    mcts_core = Mcts(GoPlayoutEvaluator(1, rng), puct_const=2.0, max_simulations=1000, random_state=rng)
     # agent0 = MctsAgent(0, mcts_core, state_factory_method())
     agent0 = SimpleAgentV1(0, board_size, to_index_action)
     # agent1 = MctsAgent(1, mcts_core, state_factory_method())
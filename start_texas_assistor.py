@@ -5,6 +5,7 @@ from texas import monte_carlo
 from texas import judge
 from texas.poker import PokerCard
 from texas.direct_cmp import ApproxComparer
+from texas.enumeration import ExactPrCalc
 
 
 if __name__ == "__main__":
@@ -12,10 +13,11 @@ if __name__ == "__main__":
     parser.add_argument("-v", "--verbose", action="store_true")
     parser.add_argument("-p", "--player_num", type=int, default=4)
     parser.add_argument("-a", "--auto_num", type=int, default=0)
-    parser.add_argument("-t", "--trial", type=int, default=1000)
+    parser.add_argument("-t", "--trial", type=int, default=100000)
+    parser.add_argument("-w", "--worker_num", type=int, default=None, help="None for all cores")
     args = parser.parse_args()
 
-    simulator = monte_carlo.Simulator(judge.TexasJudge(args.verbose))
+    simulator = monte_carlo.ParallelSimulator(judge.TexasJudge(args.verbose), args.worker_num)
     total_cards = [PokerCard(x[0], x[1]) for x in simulator.total_cards]
     r = random.Random(0)
 
@@ -51,4 +53,13 @@ if __name__ == "__main__":
             [c.get_data() for c in cards[2:]],
             player_num=args.player_num,
         )
+        if len(cards) - 2 >= ExactPrCalc.MIN_COMMON_NUM:
+            pr3 = ExactPrCalc(simulator.judge).get_pr(
+                [c.get_data() for c in cards[:2]],
+                [c.get_data() for c in cards[2:]],
+                player_num=args.player_num,
+            )
+            print(cards, f"Winning pr: {pr1:.1%}(MC) {pr2:.1%}(Appox) {pr3:.1%}(Exact)")
+            continue
         print(cards, f"Winning pr: {pr1:.1%}(MC) {pr2:.1%}(Appox)")
+    simulator.close()
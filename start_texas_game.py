@@ -4,28 +4,32 @@ import random
 
 from texas.texas_games import NoLimitTexasGame
 from texas.judge import TexasJudge
-from texas.monte_carlo import Simulator
+from texas.monte_carlo import AdaptiveSimulator
+from texas.preflop import PreflopTablePrCalc
+from texas.enumeration import ExactPrCalc
 from texas.agent import human_agent, naive_agents
-from texas.agent import key_state_agent
+from texas.agent import key_state_agent, model_io
 from texas.common import BaseAgent
 from rl import q_learner, bandit
 
 
-def load_model(fname):
+def load_model(fname, pr_calc):
+    if model_io.is_model_dir(fname):
+        return model_io.load_model(fname, pr_calc)
     with open(fname, "rb") as fin:
         return pickle.load(fin)
 
 
 def start_game(agent_num, is_public, models, seed):
     judge = TexasJudge()
-    simulator = Simulator(judge)
+    simulator = PreflopTablePrCalc(ExactPrCalc(judge, AdaptiveSimulator(judge)))
     big_blind = 20
 
     agents = []
     for n in range(agent_num - len(models) - 1):
         agents.append(naive_agents.StaticAgent(big_blind, 2000, simulator, 1000))
     for n in range(len(models)):
-        agents.append(load_model(models[n]))
+        agents.append(load_model(models[n], simulator))
         agents[-1].set_amount(2000)
         agents[-1].is_test = True
     agents.append(human_agent.HumanAgent(big_blind, 2000, simulator))
@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+
+from rl import bandit
+from rl.q_learner import DenseQLearner
+from rl.q_table import DenseQTable
+
+
+class SamplerTestCase(unittest.TestCase):
+    def test_seed(self):
+        for sampler in (bandit.EpsilonGreedySampler(0.5, 0.5), bandit.ThompsonSampler()):
+            actions = []
+            for _ in range(2):
+                sampler.seed(7)
+                actions.append([sampler.get_action([0, 1, 2], {0: 0.1}, {0: 3}) for _ in range(50)])
+            self.assertEqual(actions[0], actions[1])
+            sampler.seed(8)
+            self.assertNotEqual([sampler.get_action([0, 1, 2], {0: 0.1}, {0: 3}) for _ in range(50)], actions[0])
+        bandit.GreedySampler().seed(7)
+
+
+class BatchSamplerTestCase(unittest.TestCase):
+    def test_best_actions(self):
+        rng = np.random.default_rng(0)
+        scores = np.array([[1.0, 3.0, 3.0, 0.0], [2.0, 2.0, 5.0, 2.0]])
+        masks = np.array([[True, True, True, True], [True, True, False, True]])
+        self.assertEqual(bandit.get_best_actions(scores, masks).tolist(), [1, 0])
+        actions = np.array([bandit.get_best_actions(scores, masks, rng) for _ in range(3000)])
+        # uniform over the ties
+        self.assertEqual(set(actions[:, 0]), {1, 2})
+        self.assertEqual(set(actions[:, 1]), {0, 1, 3})
+        self.assertAlmostEqual((actions[:, 1] == 3).mean(), 1 / 3, delta=0.05)
+
+    def test_greedy(self):
+        sampler = bandit.BatchGreedySampler()
+        scores = np.array([[0.0, -1.0, 2.0], [0.0, 0.0, 0.0]])
+        counts = np.array([[1, 1, 0], [0, 0, 0]])
+        masks = np.array([[True, True, False], [False, True, True]])
+        # the first best available one, the first available one if not visited
+        self.assertEqual(sampler.get_actions(scores, counts, masks).tolist(), [0, 1])
+
+    def test_epsilon_greedy(self):
+        sampler = bandit.BatchEpsilonGreedySampler(eps_start=0.5, eps_end=0.5, seed=1)
+        scores = np.tile([0.0, 1.0, 0.0, 0.0], (20000, 1))
+        masks = np.tile([True, True, True, False], (20000, 1))
+        actions = sampler.get_actions(scores, None, masks)
+        # 1/2 + 1/2 * 1/3 best, never unavailable
+        self.assertAlmostEqual((actions == 1).mean(), 2 / 3, delta=0.02)
+        self.assertFalse((actions == 3).any())
+        # the same seed, the same stream; spawned ones are independent
+        self.assertEqual(bandit.BatchEpsilonGreedySampler(0.5, 0.5, seed=1).get_actions(
+            scores, None, masks).tolist(), actions.tolist())
+        left, right = sampler.spawn(2)
+        self.assertNotEqual(left.get_actions(scores, None, masks).tolist(),
+                            right.get_actions(scores, None, masks).tolist())
+
+    def test_thompson(self):
+        sampler = bandit.BatchThompsonSampler(seed=2)
+        scores = np.tile([0.2, -0.2, 0.6], (10000, 1))
+        counts = np.tile([100, 100, 2], (10000, 1))
+        actions = sampler.get_actions(scores, counts)
+        self.assertGreater((actions == 0).mean(), (actions == 1).mean())
+        self.assertGreater((actions == 2).mean(), 0.3)
+
+    def test_dense_learner(self):
+        learner = DenseQLearner(bandit.GreedySampler(), 0.1, DenseQTable((3, ), [0, 1]))
+        learner.update((1, ), 1, None, 1.0)
+        self.assertEqual(learner.get_actions(np.array([0, 1])).tolist(), [0, 1])
+        masks = np.array([[True, True], [True, False]])
+        self.assertEqual(learner.get_actions(np.array([1, 1]), masks, bandit.BatchEpsilonGreedySampler(
+            0.0, 0.0)).tolist(), [1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
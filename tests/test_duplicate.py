@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+
+from texas.duplicate import DuplicateEvaluator
+from texas.judge import TexasJudge
+from texas.monte_carlo import BatchSimulator
+from texas.preflop import PreflopTablePrCalc
+from texas.pr_cache import CachedPrCalc
+from texas.agent import naive_agents, key_state_agent
+from rl import q_learner, bandit
+
+
+class DuplicateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.judge = TexasJudge()
+        self.calc = CachedPrCalc(PreflopTablePrCalc(BatchSimulator(self.judge)))
+
+    def test_same_models(self):
+        # the same deterministic agent on the same cards: no luck left
+        models = [naive_agents.StaticAgent(20, 0, self.calc, 100), naive_agents.StaticAgent(20, 0, self.calc, 100)]
+        evaluator = DuplicateEvaluator(self.judge, models, memo={id(self.calc): self.calc})
+        self.assertEqual(np.abs(evaluator.run(20)).max(), 0)
+
+    def test_scores(self):
+        models = [naive_agents.StaticAgent(20, 0, self.calc, 100), naive_agents.RandomAgent(20, 0)]
+        scores = DuplicateEvaluator(self.judge, models, seed=3, memo={id(self.calc): self.calc}).run(20)
+        self.assertEqual(scores.shape, (20, 2))
+        self.assertTrue(np.allclose(scores.sum(axis=1), 0))
+        self.assertEqual(scores.tolist(), DuplicateEvaluator(
+            self.judge, models, seed=3, memo={id(self.calc): self.calc}).run(20).tolist())
+
+    def test_frozen_learner(self):
+        learner = q_learner.QLearner(bandit.EpsilonGreedySampler(), 0.1)
+        model = key_state_agent.InnerKeyStateAgent(
+            20, 2000, self.calc, key_state_agent.State2Quantizer(), learner)
+        models = [model, naive_agents.StaticAgent(20, 0, self.calc, 100)]
+        evaluator = DuplicateEvaluator(self.judge, models, memo={id(self.calc): self.calc})
+        # one copy of the learner for all the seats of the model
+        learners = {id(agent.q_learner) for agent in evaluator.agents[0]}
+        self.assertEqual(len(learners), 1)
+        copied = evaluator.agents[0][0].q_learner
+        self.assertIsNot(copied, learner)
+        q_values = {s: dict(v) for s, v in copied._q_values.items()}
+        evaluator.run(20)
+        self.assertEqual({s: dict(v) for s, v in copied._q_values.items()}, q_values)
+        self.assertEqual(learner._q_values, {})
+        self.assertFalse(learner.is_frozen)
+
+
+if __name__ == "__main__":
+    unittest.main()
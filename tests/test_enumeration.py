@@ -0,0 +1,60 @@
+import itertools
+import unittest
+
+from texas import poker
+from texas import monte_carlo
+from texas.enumeration import ExactPrCalc
+from texas.judge import TexasJudge, HandEvaluator
+
+
+class ExactPrCalcTestCase(unittest.TestCase):
+    def setUp(self):
+        heart, diamond, spade, club = (poker.PokerSymbol.heart, poker.PokerSymbol.diamond,
+                                       poker.PokerSymbol.spade, poker.PokerSymbol.club)
+        self.cases = [
+            ([(heart, 14), (heart, 13)], [(heart, 2), (heart, 7), (spade, 9), (diamond, 11)]),
+            ([(spade, 5), (diamond, 6)], [(heart, 2), (heart, 7), (heart, 9), (heart, 11), (heart, 3)]),
+            ([(club, 10), (spade, 11)], [(diamond, 2), (club, 9), (heart, 12), (diamond, 13), (club, 8)]),
+        ]
+
+    @staticmethod
+    def _brute_force_pr(hole_cards, common_cards):
+        evaluator = HandEvaluator()
+        total_cards = [(s, d) for s in range(1, 5) for d in range(2, 15)]
+        left_cards = [c for c in total_cards if c not in hole_cards + common_cards]
+        boards = [common_cards] if len(common_cards) == 5 else [common_cards + [c] for c in left_cards]
+        wins = 0.0
+        count = 0
+        for board in boards:
+            my_strength = evaluator.evaluate(hole_cards + board)
+            for oppo_cards in itertools.combinations([c for c in left_cards if c not in board], 2):
+                strength = evaluator.evaluate(list(oppo_cards) + board)
+                wins += 1.0 if my_strength > strength else (0.5 if my_strength == strength else 0.0)
+                count += 1
+        return wins / count
+
+    def test_heads_up(self):
+        calc = ExactPrCalc(TexasJudge())
+        for hole_cards, common_cards in self.cases:
+            self.assertAlmostEqual(calc.get_pr(hole_cards, common_cards, 2),
+                                   self._brute_force_pr(hole_cards, common_cards), places=12)
+
+    def test_multiway(self):
+        judge = TexasJudge()
+        calc = ExactPrCalc(judge)
+        simulator = monte_carlo.BatchSimulator(judge)
+        for hole_cards, common_cards in self.cases:
+            self.assertAlmostEqual(calc.get_pr(hole_cards, common_cards, 4),
+                                   simulator.get_pr(hole_cards, common_cards, 4, trial_num=20000), delta=0.03)
+
+    def test_fallback(self):
+        judge = TexasJudge()
+        cards = [(poker.PokerSymbol.heart, 2), (poker.PokerSymbol.diamond, 3)]
+        with self.assertRaises(ValueError):
+            ExactPrCalc(judge).get_pr(cards, [], 2)
+        simulator = monte_carlo.BatchSimulator(judge)
+        self.assertEqual(ExactPrCalc(judge, simulator).get_pr(cards, [], 2), simulator.get_pr(cards, [], 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
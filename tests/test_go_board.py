@@ -4,6 +4,7 @@ import numpy as np
 from go.go_common import GoStone, IGoBoard
 from go.go_basic_board import GoBasicBoard
 from go.go_fast_board import GoFastBoard
+from go.go_array_board import GoArrayBoard
 
 
 class GoBoardUnitTest(unittest.TestCase):
@@ -43,4 +44,103 @@ class GoBoardUnitTest(unittest.TestCase):
             n = rng.randint(0, len(src_valid_actions))
             src_board.put_stone(src_valid_actions[n], stone)
             dst_board.put_stone(dst_valid_actions[n], stone)
+            self.assertEqual(src_board.get_hash(), dst_board.get_hash(), "test-%d" % itr)
+            self.assertEqual(src_board.check_consistence(), (True, ""), "test-%d" % itr)
+            self.assertEqual(dst_board.check_consistence(), (True, ""), "test-%d" % itr)
             stone = GoStone.get_opponent(stone)
+
+    def test_array_board(self):
+        self._test_atari(GoArrayBoard(9))
+        src_board = GoFastBoard(9)
+        dst_board = GoArrayBoard(9)
+        stone = GoStone.Black
+        rng = np.random.RandomState(0)
+        hashes = [dst_board.get_hash()]
+        boards = [dst_board.get_board()]
+        for itr in range(9 * 9 * 3):
+            src_valid_actions = list(src_board.iter_valid_moves(stone))
+            dst_valid_actions = list(dst_board.iter_valid_moves(stone))
+            self.assertEqual(src_valid_actions, dst_valid_actions, "test-%d" % itr)
+            action = dst_valid_actions[rng.randint(0, len(dst_valid_actions))]
+            src_board.put_stone(action, stone)
+            dst_board.put_stone(action, stone)
+            self.assertTrue((src_board.get_board() == dst_board.get_board()).all(), "test-%d" % itr)
+            self.assertEqual(dst_board.check_consistence(), (True, ""), "test-%d" % itr)
+            hashes.append(dst_board.get_hash())
+            boards.append(dst_board.get_board())
+            stone = GoStone.get_opponent(stone)
+        # undo all the moves
+        while dst_board.get_move_num() > 0:
+            hashes.pop()
+            boards.pop()
+            dst_board.undo()
+            self.assertEqual(dst_board.get_hash(), hashes[-1])
+            self.assertTrue((dst_board.get_board() == boards[-1]).all())
+            self.assertEqual(dst_board.check_consistence(), (True, ""))
+        self.assertEqual(dst_board.get_hash(), 0)
+
+    def _test_clone(self, board: IGoBoard):
+        stone = GoStone.Black
+        rng = np.random.RandomState(1)
+        for itr in range(9 * 9):
+            actions = board.iter_valid_moves(stone)
+            board.put_stone(actions[rng.randint(0, len(actions))], stone)
+            stone = GoStone.get_opponent(stone)
+        cloned = board.clone()
+        raw_board = np.array(board.get_board())
+        # both go on with the same moves
+        for itr in range(9 * 9 * 2):
+            actions = board.iter_valid_moves(stone)
+            self.assertEqual(actions, cloned.iter_valid_moves(stone), "test-%d" % itr)
+            action = actions[rng.randint(0, len(actions))]
+            board.put_stone(action, stone)
+            self.assertTrue((board.get_board() != raw_board).any() or action == board.get_pass_move())
+            cloned.put_stone(action, stone)
+            self.assertTrue((board.get_board() == cloned.get_board()).all(), "test-%d" % itr)
+            self.assertEqual(cloned.check_consistence(), (True, ""))
+            raw_board = np.array(board.get_board())
+            stone = GoStone.get_opponent(stone)
+        # the clone is independent
+        cloned = board.clone()
+        actions = cloned.iter_valid_moves(stone)
+        cloned.put_stone(actions[0], stone)
+        self.assertTrue((board.get_board() == raw_board).all())
+        self.assertEqual(board.check_consistence(), (True, ""))
+
+    def test_clone(self):
+        self._test_clone(GoBasicBoard(9))
+        self._test_clone(GoFastBoard(9))
+        self._test_clone(GoArrayBoard(9))
+
+    def _test_ko(self, board: IGoBoard):
+        for coordinate in ((1, 2), (2, 1), (3, 2)):
+            board.put_stone_by_coordinate(coordinate, GoStone.Black)
+        for coordinate in ((1, 3), (2, 4), (3, 3), (2, 2)):
+            board.put_stone_by_coordinate(coordinate, GoStone.White)
+        board.put_stone_by_coordinate((2, 3), GoStone.Black)
+        self.assertEqual((board.get_board() == GoStone.White).sum(), 3)
+        # the recapture repeats the position
+        self.assertFalse(board.is_valid_move_by_coordinate((2, 2), GoStone.White))
+        # 7 stones, the ko & the suicide at (1, 1) are invalid, pass is valid
+        self.assertEqual(len(board.iter_valid_moves(GoStone.White)), 9 * 9 - 7 - 2 + 1)
+        # ko threats, then the position is new
+        board.put_stone_by_coordinate((9, 9), GoStone.White)
+        board.put_stone_by_coordinate((9, 8), GoStone.Black)
+        self.assertTrue(board.is_valid_move_by_coordinate((2, 2), GoStone.White))
+        board.put_stone_by_coordinate((2, 2), GoStone.White)
+        self.assertEqual((board.get_board() == GoStone.Black).sum(), 4)
+        self.assertEqual(board.check_consistence(), (True, ""))
+
+    def test_ko(self):
+        self._test_ko(GoBasicBoard(9))
+        self._test_ko(GoFastBoard(9))
+        self._test_ko(GoArrayBoard(9))
+        board = GoArrayBoard(9)
+        self._test_ko(board)
+        # undo gives the recapture back
+        for _ in range(3):
+            board.undo()
+        self.assertFalse(board.is_valid_move_by_coordinate((2, 2), GoStone.White))
+        board.undo()
+        self.assertEqual(board.get_board()[2, 2], GoStone.White)
+        self.assertTrue(board.is_valid_move_by_coordinate((2, 3), GoStone.Black))
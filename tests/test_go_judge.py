@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 
 from go.go_judge import GoJudge
 from go.go_basic_board import GoStone, GoBasicBoardUtil
@@ -23,3 +24,33 @@ class GoJudgeTestCase(unittest.TestCase):
     def test_manual1(self):
         judge = GoJudge()
         self.assertEqual(judge.count_black(self.simple_board), 7 * 9, "7-rows")
+
+    def test_shared_region(self):
+        judge = GoJudge()
+        board = GoBasicBoardUtil.get_empty_board(9)
+        board[1, 1] = GoStone.Black
+        board[9, 9] = GoStone.White
+        # the empty region touches both
+        self.assertEqual(judge.count_black(board), 1 + 79 * 0.5)
+        # a black wall, the region above is black only, the one below is shared
+        board[3, 1:-1] = GoStone.Black
+        self.assertEqual(judge.count_black(board), 10 + 17 + 53 * 0.5)
+        # a white stone inside, both are shared
+        board[1, 5] = GoStone.White
+        self.assertEqual(judge.count_black(board), 10 + 16 * 0.5 + 53 * 0.5)
+
+    def test_batch(self):
+        judge = GoJudge()
+        rng = np.random.RandomState(0)
+        boards = []
+        for _ in range(20):
+            board = GoBasicBoardUtil.get_empty_board(9)
+            board[1:-1, 1:-1] = rng.choice([GoStone.Empty, GoStone.Black, GoStone.White], (9, 9), p=[0.5, 0.3, 0.2])
+            boards.append(board)
+        boards.append(self.empty_board)
+        boards.append(self.simple_board)
+        counts = judge.count_black_batch(boards)
+        wins = judge.get_black_win_batch(boards)
+        for board, cnt, win in zip(boards, counts, wins):
+            self.assertEqual(cnt, judge.count_black(board))
+            self.assertEqual(win, judge.get_black_win(board))
@@ -0,0 +1,140 @@
+import unittest
+import numpy as np
+
+from go.go_common import GoStone
+from go.go_basic_board import GoBasicBoard
+from go.go_fast_board import GoFastBoard
+from go.go_game import GoState
+from go.go_judge import GoJudge
+from go.go_playout import GoPlayout, GoPlayoutEvaluator
+
+
+class GoPlayoutTestCase(unittest.TestCase):
+    @staticmethod
+    def _get_dead_chain(board):
+        """
+        :return: a stone of a chain w/o liberties, None if all alive
+        """
+        board = np.asarray(board)
+        visited = np.zeros(board.shape, dtype=bool)
+        for row, col in zip(*np.nonzero((board == GoStone.Black) | (board == GoStone.White))):
+            if visited[row, col]:
+                continue
+            chain = [(row, col)]
+            visited[row, col] = True
+            has_liberty = False
+            for x, y in chain:
+                for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                    if board[nx, ny] == GoStone.Empty:
+                        has_liberty = True
+                    elif board[nx, ny] == board[row, col] and not visited[nx, ny]:
+                        visited[nx, ny] = True
+                        chain.append((nx, ny))
+            if not has_liberty:
+                return row, col
+        return None
+
+    def test_run(self):
+        playout = GoPlayout(0)
+        judge = GoJudge()
+        for num in (5, 9):
+            raw_board = GoFastBoard(num).get_board()
+            for _ in range(20):
+                final_board = playout.run(raw_board, GoStone.Black, num * num * 4)
+                final_board = np.array(final_board).reshape(raw_board.shape)
+                self.assertTrue((raw_board[1:-1, 1:-1] == GoStone.Empty).all())
+                self.assertIsNone(self._get_dead_chain(final_board))
+                self.assertEqual(playout.count_black(final_board.ravel().tolist()), judge.count_black(final_board))
+                # only eyes are left
+                self.assertGreater((final_board != GoStone.Empty).sum(), num * num // 2)
+
+    def test_prepare(self):
+        raw_board = GoFastBoard(9).get_board()
+        start = GoPlayout(0).prepare(raw_board)
+        final_board = GoPlayout(1).run(raw_board, GoStone.Black, 100)
+        for _ in range(2):
+            # start isn't changed by run
+            self.assertEqual(GoPlayout(1).run(raw_board, GoStone.Black, 100, start=start), final_board)
+
+    def test_own_eye(self):
+        board = GoBasicBoard(5)
+        for coordinate in ((1, 2), (2, 1), (2, 2), (3, 3), (4, 2), (5, 1)):
+            board.put_stone_by_coordinate(coordinate, GoStone.Black)
+        for coordinate in ((4, 4), (5, 5)):
+            board.put_stone_by_coordinate(coordinate, GoStone.White)
+        # (1, 1) is black's only eye, (3, 1) & (3, 2) may be filled
+        raw_board = np.array(board.get_board())
+        playout = GoPlayout(0)
+        for _ in range(20):
+            final_board = np.array(playout.run(raw_board, GoStone.Black, 1)).reshape(raw_board.shape)
+            self.assertEqual(final_board[1, 1], GoStone.Empty)
+            self.assertEqual((final_board != raw_board).sum(), 1)
+
+    def test_pass_num(self):
+        # black: only its eye (1, 1) left, white: 2 eyes & can capture black at (1, 1)
+        raw_board = np.array(GoBasicBoard(5).get_board())
+        raw_board[1:-1, 1:-1] = GoStone.White
+        for row, col in ((1, 2), (2, 1), (2, 2)):
+            raw_board[row, col] = GoStone.Black
+        for row, col in ((1, 1), (3, 5), (5, 5)):
+            raw_board[row, col] = GoStone.Empty
+        playout = GoPlayout(0)
+        final_board = np.array(playout.run(raw_board, GoStone.Black, 10, pass_num=1)).reshape(raw_board.shape)
+        self.assertTrue((final_board == raw_board).all())
+        final_board = np.array(playout.run(raw_board, GoStone.Black, 10)).reshape(raw_board.shape)
+        self.assertEqual(final_board[1, 1], GoStone.White)
+        self.assertEqual(final_board[2, 2], GoStone.Empty)
+
+    def test_ko(self):
+        for board in (GoBasicBoard(5), GoFastBoard(5)):
+            for coordinate in ((2, 3), (4, 3), (3, 2)):
+                board.put_stone_by_coordinate(coordinate, GoStone.Black)
+            for coordinate in ((2, 4), (4, 4), (3, 5), (3, 3)):
+                board.put_stone_by_coordinate(coordinate, GoStone.White)
+            board.put_stone_by_coordinate((3, 4), GoStone.Black)
+            # white can't retake at (3, 3) at once
+            self.assertFalse(board.is_valid_move_by_coordinate((3, 3), GoStone.White))
+            self.assertEqual(GoPlayout.get_ko_index(board, GoStone.White), 3 * 7 + 3)
+            self.assertEqual(GoPlayout.get_ko_index(board, GoStone.Black), -1)
+            raw_board = np.array(board.get_board())
+            playout = GoPlayout(0)
+            moves = set()
+            for _ in range(50):
+                final_board = playout.run(raw_board, GoStone.White, 1, ko_index=3 * 7 + 3)
+                self.assertEqual(final_board[3 * 7 + 3], GoStone.Empty)
+                moves.add(np.flatnonzero(np.array(final_board) != raw_board.ravel())[0])
+            self.assertGreater(len(moves), 5)
+            # w/o the ko index it may be retaken
+            self.assertTrue(any(playout.run(raw_board, GoStone.White, 1)[3 * 7 + 3] == GoStone.White
+                                for _ in range(100)))
+
+    def test_ko_after_pass(self):
+        # white: only the ko (3, 3) to retake, black: may connect it at (3, 3) after white passes
+        raw_board = np.array(GoBasicBoard(5).get_board())
+        raw_board[1:-1, 1:-1] = GoStone.Black
+        for row, col in ((1, 4), (2, 4), (2, 5), (3, 5), (4, 4), (4, 5), (5, 4), (5, 5)):
+            raw_board[row, col] = GoStone.White
+        for row, col in ((1, 1), (5, 1), (3, 3), (1, 5)):
+            raw_board[row, col] = GoStone.Empty
+        playout = GoPlayout(0)
+        final_boards = [playout.run(raw_board, GoStone.White, 2, ko_index=3 * 7 + 3) for _ in range(50)]
+        self.assertTrue(all(board[3 * 7 + 3] != GoStone.White for board in final_boards))
+        self.assertTrue(any(board[3 * 7 + 3] == GoStone.Black for board in final_boards))
+
+    def test_evaluator(self):
+        for board, num in ((GoFastBoard(9), 4), (GoBasicBoard(9), 1)):
+            evaluator = GoPlayoutEvaluator(num, np.random.RandomState(0))
+            state = GoState(board)
+            state.apply_action(board.iter_valid_moves(GoStone.Black)[40])
+            rewards = evaluator.evaluate_state(state)
+            self.assertEqual(rewards[0], -rewards[1])
+            self.assertLessEqual(abs(rewards[0]), 1)
+            self.assertEqual(state.get_move_count(), 1)
+            state.apply_action(board.get_pass_move())
+            self.assertEqual(state.get_pass_count(), 1)
+            rewards = evaluator.evaluate_state(state)
+            self.assertLessEqual(abs(rewards[0]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
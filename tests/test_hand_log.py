@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from texas import hand_log
+from texas.common import AgentAction, TexasRound
+from texas.texas_games import NoLimitTexasGame
+from texas.agent import naive_agents
+from texas.judge import TexasJudge
+from texas.monte_carlo import BatchSimulator
+from texas.preflop import PreflopTablePrCalc
+from texas.pr_cache import CachedPrCalc
+
+
+class HandLogTestCase(unittest.TestCase):
+    def test_pack_action(self):
+        packed = [hand_log.pack_action(3, 9, a, b) for a, b in ((-1, 0), (7, 123456789))]
+        rounds, seats, actions, bets = hand_log.unpack_actions(packed)
+        self.assertEqual(rounds.tolist(), [3, 3])
+        self.assertEqual(seats.tolist(), [9, 9])
+        self.assertEqual(actions.tolist(), [-1, 7])
+        self.assertEqual(bets.tolist(), [0, 123456789])
+
+    def test_write_replay(self):
+        judge = TexasJudge()
+        calc = CachedPrCalc(PreflopTablePrCalc(BatchSimulator(judge)))
+        with tempfile.TemporaryDirectory() as dir_name:
+            fname = os.path.join(dir_name, "hands.bin")
+            all_amounts = []
+            for seed in range(2):  # appended
+                with hand_log.HandLogWriter(fname, buffer_size=7) as writer:
+                    game = NoLimitTexasGame(judge, seed=seed, hand_log=writer)
+                    agents = [naive_agents.StaticAgent(20, 400, calc, 100) if n % 2 == 0
+                              else naive_agents.BraveAgent(20, 400, calc) for n in range(4)]
+                    for _ in range(20):
+                        all_amounts.append(game.run_a_hand(agents, False))
+                        for agent, amount in zip(agents, all_amounts[-1]):
+                            agent.set_reward(amount)
+            reader = hand_log.HandLogReader(fname)
+            self.assertEqual(len(reader), 40)
+            self.assertEqual(reader.records["seed"].tolist(), [0] * 20 + [1] * 20)
+            self.assertEqual(reader.records["hand"].tolist(), list(range(20)) * 2)
+            self.assertEqual(reader.records["amounts"][:, :4].tolist(), np.array(all_amounts).tolist())
+            self.assertEqual(reader.records["amounts"].sum(), 0)
+            for n in range(len(reader)):
+                amounts, _ = reader.replay(n, game)
+                self.assertEqual(list(amounts), list(all_amounts[n]))
+            showdowns = reader.filter(is_showdown=True)
+            self.assertTrue(0 < len(showdowns) < 40)
+            for n in showdowns:
+                self.assertEqual(len(reader.get_cards(reader[n])[1]), 5)
+            self.assertEqual(reader.filter(seat=1, min_amount=1).tolist(),
+                             [n for n, amounts in enumerate(all_amounts) if amounts[1] >= 1])
+            del reader
+
+    def test_aborted_hand(self):
+        judge = TexasJudge()
+        calc = CachedPrCalc(PreflopTablePrCalc(BatchSimulator(judge)))
+        with tempfile.TemporaryDirectory() as dir_name:
+            fname = os.path.join(dir_name, "hands.bin")
+            with hand_log.HandLogWriter(fname) as writer:
+                game = NoLimitTexasGame(judge, seed=0, hand_log=writer)
+                agents = [naive_agents.StaticAgent(20, 400, calc, 100) for _ in range(3)]
+                # a hand aborted before write_hand
+                writer.add_action(TexasRound.Flop, 2, AgentAction.Raise, 80)
+                amounts = game.run_a_hand(agents, False)
+            reader = hand_log.HandLogReader(fname)
+            rounds, seats, actions, _ = hand_log.unpack_actions(reader[0]["actions"][:reader[0]["action_num"]])
+            self.assertEqual(actions[:2].tolist(), [AgentAction.Blind] * 2)
+            self.assertEqual(list(reader.replay(0, game)[0]), list(amounts))
+            del reader
+
+
+if __name__ == "__main__":
+    unittest.main()
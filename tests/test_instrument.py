@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from texas.instrument import Instrument
+from texas.texas_games import NoLimitTexasGame
+from texas.judge import TexasJudge
+from texas.monte_carlo import BatchSimulator
+from texas.preflop import PreflopTablePrCalc
+from texas.pr_cache import CachedPrCalc
+from texas.agent import naive_agents
+
+
+class InstrumentTestCase(unittest.TestCase):
+    def test_stats(self):
+        original = NoLimitTexasGame.run_a_hand
+        judge = TexasJudge()
+        calc = CachedPrCalc(PreflopTablePrCalc(BatchSimulator(judge)))
+        agents = [naive_agents.StaticAgent(20, 2000, calc, 100) for _ in range(3)]
+        game = NoLimitTexasGame(judge, 20, seed=0)
+        fname = os.path.join(tempfile.mkdtemp(), "hands.pstats")
+        with Instrument() as instrument:
+            self.assertIsNot(NoLimitTexasGame.run_a_hand, original)
+            self.assertRaises(RuntimeError, Instrument().enable)
+            instrument.profile_hands(5, fname, skip_hand_num=2)
+            for _ in range(10):
+                for agent in agents:
+                    agent.set_amount(2000)
+                amounts = game.run_a_hand(agents, is_verbose=False)
+                for n, agent in enumerate(agents):
+                    agent.set_reward(amounts[n])
+        self.assertIs(NoLimitTexasGame.run_a_hand, original)
+        self.assertTrue(os.path.exists(fname))
+
+        stats = instrument.get_stats()
+        self.assertEqual(stats["hands"], 10)
+        self.assertGreater(stats["decisions"], 10)
+        # the nested get_pr calls of the pr_calc chain are counted once
+        self.assertLessEqual(instrument.counts["equity"], stats["decisions"])
+        self.assertGreater(stats["breakdown"]["equity"][1], 0)
+        self.assertLessEqual(stats["breakdown"]["decision"][1], 1.0)
+        self.assertIn("hands/sec", instrument.format_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from texas.texas_games import NoLimitTexasGame
+from texas.judge import TexasJudge
+from texas.pr_cache import CachedPrCalc
+from texas.direct_cmp import ApproxComparer
+from texas.common import InnerAction
+from texas.agent import key_state_agent, model_io
+from rl import q_learner, bandit
+
+
+class ModelIOTestCase(unittest.TestCase):
+    def setUp(self):
+        self.pr_calc = CachedPrCalc(ApproxComparer())
+        learner = q_learner.QLearner(bandit.EpsilonGreedySampler(eps_end=0.2, eps_decay=1000), 0.01)
+        self.agents = [key_state_agent.InnerKeyStateAgent(
+            20, 2000, self.pr_calc, key_state_agent.State5Quantizer(), learner) for _ in range(3)]
+        self.play(self.agents, 100)
+        self.dirname = tempfile.mkdtemp()
+
+    @staticmethod
+    def play(agents, hand_num):
+        game = NoLimitTexasGame(TexasJudge(), 20, seed=0)
+        for _ in range(hand_num):
+            for agent in agents:
+                agent.set_amount(2000)
+            amounts = game.run_a_hand(agents, is_verbose=False)
+            for n, agent in enumerate(agents):
+                agent.set_reward(amounts[n])
+
+    def test_save_load(self):
+        model_io.save_model(self.dirname, self.agents[0], epoch=100)
+        self.assertTrue(model_io.is_model_dir(self.dirname))
+        agent = model_io.load_model(self.dirname, self.pr_calc)
+        self.assertTrue(agent.is_test)
+        self.assertIsInstance(agent.q_learner.table.values, np.memmap)
+        self.assertEqual(model_io.load_meta(self.dirname)["metadata"], {"epoch": 100})
+
+        learner = self.agents[0].q_learner
+        actions = list(InnerAction)
+        for state, action_values in learner._q_values.items():
+            if state is None:
+                continue
+            self.assertEqual(agent.q_learner.get_action(state, actions), learner.get_action(state, actions))
+            index = agent.q_learner.table.get_index(state)
+            for action, value in action_values.items():
+                self.assertEqual(agent.q_learner.table.values[index, action], value)
+
+        # frozen & shared by the copies
+        agents = [copy.deepcopy(agent, {id(self.pr_calc): self.pr_calc}) for _ in range(3)]
+        self.assertIs(agents[0].q_learner.table.values, agent.q_learner.table.values)
+        self.play(agents, 20)
+
+        # trainable in memory
+        agent = model_io.load_model(self.dirname, self.pr_calc, mmap_mode=None)
+        self.assertFalse(agent.is_test)
+        self.play([agent] + [copy.deepcopy(agent, {id(self.pr_calc): self.pr_calc}) for _ in range(2)], 20)
+
+    def test_version(self):
+        model_io.save_model(self.dirname, self.agents[0])
+        fname = os.path.join(self.dirname, model_io.META_FNAME)
+        with open(fname) as fin:
+            meta = json.load(fin)
+        meta["version"] = model_io.MODEL_VERSION + 1
+        with open(fname, "w") as fout:
+            json.dump(meta, fout)
+        self.assertRaises(ValueError, model_io.load_model, self.dirname, self.pr_calc)
+
+
+if __name__ == "__main__":
+    unittest.main()
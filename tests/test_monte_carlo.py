@@ -17,6 +17,78 @@ class SimulatorTestCase(unittest.TestCase):
         pr = simulator.get_pr([(poker.PokerSymbol.heart, poker.PokerDigit.A), (poker.PokerSymbol.heart, 13)])
         self.assertTrue(pr >= 0.60)
 
+    def test_batch_get_pr(self):
+        judge = TexasJudge()
+        simulator = monte_carlo.Simulator(judge)
+        batch_simulator = monte_carlo.BatchSimulator(judge)
+        cases = [
+            ([(poker.PokerSymbol.heart, 2), (poker.PokerSymbol.diamond, 3)], [], 2),
+            ([(poker.PokerSymbol.heart, poker.PokerDigit.A), (poker.PokerSymbol.diamond, poker.PokerDigit.A)], [], 6),
+            ([(poker.PokerSymbol.heart, 2), (poker.PokerSymbol.heart, 3)],
+             [(poker.PokerSymbol.heart, 4), (poker.PokerSymbol.heart, 5), (poker.PokerSymbol.club, 9)], 4),
+            ([(poker.PokerSymbol.spade, 10), (poker.PokerSymbol.spade, 11)],
+             [(poker.PokerSymbol.heart, 4), (poker.PokerSymbol.heart, 5), (poker.PokerSymbol.club, 9),
+              (poker.PokerSymbol.club, 12), (poker.PokerSymbol.diamond, 13)], 3),
+        ]
+        for cards, common_cards, player_num in cases:
+            pr = simulator.get_pr(cards, common_cards, player_num, trial_num=10000)
+            batch_pr = batch_simulator.get_pr(cards, common_cards, player_num, trial_num=10000)
+            self.assertAlmostEqual(pr, batch_pr, delta=0.03, msg=str(cards + common_cards))
+            self.assertEqual(batch_pr, batch_simulator.get_pr(cards, common_cards, player_num, trial_num=10000))
+
+    def test_parallel_get_pr(self):
+        judge = TexasJudge()
+        batch_simulator = monte_carlo.BatchSimulator(judge)
+        cards = [(poker.PokerSymbol.heart, poker.PokerDigit.A), (poker.PokerSymbol.diamond, poker.PokerDigit.A)]
+        common_cards = [(poker.PokerSymbol.heart, 4), (poker.PokerSymbol.heart, 5), (poker.PokerSymbol.club, 9)]
+        batch_pr = batch_simulator.get_pr(cards, common_cards, 4, trial_num=10000)
+        for worker_num in (1, 2):
+            with monte_carlo.ParallelSimulator(judge, worker_num, seed=1) as simulator:
+                pr = simulator.get_pr(cards, common_cards, 4, trial_num=10000)
+                self.assertAlmostEqual(pr, batch_pr, delta=0.03)
+                self.assertEqual(pr, simulator.get_pr(cards, common_cards, 4, trial_num=10000))
+                level_counts = simulator.get_level_counts(cards, common_cards, trial_num=1001)
+                self.assertEqual(sum(level_counts.values()), 1001)
+            with monte_carlo.ParallelSimulator(judge, worker_num, seed=1) as simulator:
+                self.assertEqual(pr, simulator.get_pr(cards, common_cards, 4, trial_num=10000))
+
+    def test_get_pr_interval(self):
+        simulator = monte_carlo.BatchSimulator(TexasJudge())
+        cards = [(poker.PokerSymbol.heart, 2), (poker.PokerSymbol.diamond, 7)]
+        pr, (low, high), trial_num = simulator.get_pr_interval(cards, [], 3, std_err=0.005, batch_size=1000)
+        self.assertTrue(low <= pr <= high)
+        self.assertTrue(high - low <= 2 * 1.96 * 0.005)
+        self.assertTrue(trial_num < 100000)
+        self.assertEqual(trial_num % 1000, 0)
+        self.assertAlmostEqual(pr, simulator.get_pr(cards, [], 3, trial_num=100000), delta=0.01)
+        # a lock: far from the threshold after one batch
+        cards = [(poker.PokerSymbol.heart, poker.PokerDigit.A), (poker.PokerSymbol.diamond, poker.PokerDigit.A)]
+        _, (low, high), trial_num = simulator.get_pr_interval(cards, [], 2, std_err=0.001, thresholds=(0.5,))
+        self.assertEqual(trial_num, 1000)
+        self.assertTrue(low > 0.5)
+        _, _, trial_num = simulator.get_pr_interval(cards, [], 2, std_err=0.0001, max_trial_num=3500)
+        self.assertEqual(trial_num, 3500)
+
+    def test_adaptive_get_pr(self):
+        judge = TexasJudge()
+        simulator = monte_carlo.AdaptiveSimulator(judge, std_err=0.005, max_trial_num=20000, batch_size=1000)
+        self.assertEqual(simulator.get_mean_trial_num(), 0.0)
+        # a lock: decided after one batch
+        cards = [(poker.PokerSymbol.heart, poker.PokerDigit.A), (poker.PokerSymbol.diamond, poker.PokerDigit.A)]
+        self.assertGreater(simulator.get_pr(cards), 0.8)
+        self.assertEqual(simulator.get_mean_trial_num(), 1000)
+        # near 1 / 3: the same as get_pr_interval with the thresholds
+        cards = [(poker.PokerSymbol.heart, 2), (poker.PokerSymbol.diamond, 7)]
+        pr, _, trial_num = monte_carlo.BatchSimulator(judge).get_pr_interval(
+            cards, [], 3, std_err=0.005, max_trial_num=20000, batch_size=1000, thresholds=(1.0 / 3, 0.5))
+        self.assertEqual(simulator.get_pr(cards, [], 3), pr)
+        self.assertEqual(simulator.pr_num, 2)
+        self.assertEqual(simulator.trial_num_sum, 1000 + trial_num)
+        self.assertEqual(simulator.get_mean_trial_num(), (1000 + trial_num) / 2)
+        # trial_num caps it
+        simulator.get_pr(cards, [], 3, trial_num=500)
+        self.assertEqual(simulator.trial_num_sum, 1000 + trial_num + 500)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,77 @@
+import pickle
+import unittest
+
+from texas import poker
+from texas.judge import TexasJudge
+from texas.monte_carlo import BatchSimulator
+from texas.pr_cache import CachedPrCalc, LruCache, get_canonical_key, get_canonical_cards
+
+
+class CountingPrCalc(object):
+    def __init__(self):
+        self.count = 0
+
+    def get_pr(self, hole_cards, common_cards=None, player_num=2):
+        self.count += 1
+        return 0.5
+
+
+class PrCacheTestCase(unittest.TestCase):
+    def test_canonical_key(self):
+        heart, diamond, spade, club = (poker.PokerSymbol.heart, poker.PokerSymbol.diamond,
+                                       poker.PokerSymbol.spade, poker.PokerSymbol.club)
+        key = get_canonical_key([(heart, 14), (heart, 13)], [(diamond, 2), (heart, 5), (club, 9)], 3)
+        self.assertEqual(key, get_canonical_key([(spade, 13), (spade, 14)], [(spade, 5), (club, 2), (heart, 9)], 3))
+        self.assertNotEqual(key, get_canonical_key([(spade, 13), (spade, 14)], [(spade, 5), (club, 2), (club, 9)], 3))
+        self.assertNotEqual(key, get_canonical_key([(heart, 14), (heart, 13)], [(diamond, 2), (heart, 5), (club, 9)], 4))
+        # hole cards & community cards are not exchangeable
+        self.assertNotEqual(get_canonical_key([(heart, 14), (heart, 13)], [(heart, 5)], 2),
+                            get_canonical_key([(heart, 14), (heart, 5)], [(heart, 13)], 2))
+
+    def test_lru(self):
+        cache = LruCache(2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        self.assertEqual(cache.get(1), "a")
+        cache.put(3, "c")
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), "c")
+        stats = cache.get_stats()
+        self.assertEqual((stats["size"], stats["hits"], stats["misses"], stats["evictions"]), (2, 2, 1, 1))
+
+    def test_cached_pr_calc(self):
+        inner_calc = CountingPrCalc()
+        calc = CachedPrCalc(inner_calc, capacity=10)
+        heart, club = poker.PokerSymbol.heart, poker.PokerSymbol.club
+        self.assertEqual(calc.get_pr([(heart, 14), (club, 14)], [], 2), 0.5)
+        self.assertEqual(calc.get_pr([(club, 14), (heart, 14)], None, 2), 0.5)
+        self.assertEqual(inner_calc.count, 1)
+        self.assertEqual(calc.get_stats()["hits"], 1)
+        copied_calc = pickle.loads(pickle.dumps(calc))
+        self.assertEqual(len(copied_calc.cache), 0)
+
+    def test_canonical_cards(self):
+        heart, diamond, spade, club = (poker.PokerSymbol.heart, poker.PokerSymbol.diamond,
+                                       poker.PokerSymbol.spade, poker.PokerSymbol.club)
+        cards = get_canonical_cards([(heart, 14), (heart, 13)], [(heart, 2), (diamond, 7), (spade, 9)])
+        self.assertEqual(cards, get_canonical_cards([(spade, 13), (spade, 14)], [(club, 7), (spade, 2), (heart, 9)]))
+        hole_cards, common_cards = cards
+        self.assertEqual(get_canonical_key(hole_cards, common_cards, 3),
+                         get_canonical_key([(heart, 14), (heart, 13)], [(heart, 2), (diamond, 7), (spade, 9)], 3))
+
+    def test_isomorphic_order(self):
+        # Monte Carlo gives different values for isomorphic states, the cached one must not depend on the order
+        heart, diamond, spade, club = (poker.PokerSymbol.heart, poker.PokerSymbol.diamond,
+                                       poker.PokerSymbol.spade, poker.PokerSymbol.club)
+        queries = [([(heart, 14), (heart, 13)], [(heart, 2), (diamond, 7), (spade, 9)]),
+                   ([(spade, 14), (spade, 13)], [(spade, 2), (club, 7), (heart, 9)])]
+        values = []
+        for ordered_queries in (queries, queries[::-1]):
+            calc = CachedPrCalc(BatchSimulator(TexasJudge()))
+            values.append([calc.get_pr(hole_cards, common_cards, 3, trial_num=2000)
+                           for hole_cards, common_cards in ordered_queries])
+        self.assertEqual(len(set(values[0] + values[1])), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+
+from texas import poker
+from texas import preflop
+
+
+class CountingPrCalc(object):
+    def __init__(self):
+        self.count = 0
+
+    def get_pr(self, hole_cards, common_cards=None, player_num=2, trial_num=100):
+        self.count += 1
+        return -1.0
+
+
+class PreflopTestCase(unittest.TestCase):
+    def test_hole_class(self):
+        classes = set()
+        for hole_class in range(preflop.CLASS_NUM):
+            cards = preflop.get_class_cards(hole_class)
+            self.assertEqual(hole_class, preflop.get_hole_class(cards))
+            self.assertEqual(hole_class, preflop.get_hole_class(cards[::-1]))
+            classes.add(hole_class)
+        self.assertEqual(len(classes), 169)
+        suited = [(poker.PokerSymbol.spade, 9), (poker.PokerSymbol.spade, 12)]
+        off_suit = [(poker.PokerSymbol.spade, 9), (poker.PokerSymbol.club, 12)]
+        self.assertNotEqual(preflop.get_hole_class(suited), preflop.get_hole_class(off_suit))
+        self.assertEqual(preflop.get_hole_class(off_suit),
+                         preflop.get_hole_class([(poker.PokerSymbol.heart, 12), (poker.PokerSymbol.diamond, 9)]))
+
+    def test_table_pr_calc(self):
+        table = np.zeros((preflop.MAX_PLAYER_NUM + 1, preflop.CLASS_NUM), dtype=np.float32)
+        table[3, :] = 0.25
+        inner_calc = CountingPrCalc()
+        calc = preflop.PreflopTablePrCalc(inner_calc, table)
+        cards = [(poker.PokerSymbol.heart, 2), (poker.PokerSymbol.diamond, 7)]
+        self.assertEqual(calc.get_pr(cards, [], 3), 0.25)
+        self.assertEqual(inner_calc.count, 0)
+        self.assertEqual(calc.get_pr(cards, [(poker.PokerSymbol.heart, 3)] * 3, 3), -1.0)
+        self.assertEqual(calc.get_pr(cards, [], 11), -1.0)
+        self.assertEqual(inner_calc.count, 2)
+
+    def test_shipped_table(self):
+        table = preflop.PREFLOP_TABLE
+        self.assertIsNotNone(table)
+        aces = preflop.get_hole_class([(poker.PokerSymbol.heart, 14), (poker.PokerSymbol.diamond, 14)])
+        seven_two = preflop.get_hole_class([(poker.PokerSymbol.heart, 7), (poker.PokerSymbol.diamond, 2)])
+        self.assertAlmostEqual(table[2, aces], 0.85, delta=0.01)
+        self.assertTrue(table[2, seven_two] < 0.36)
+        self.assertTrue(np.all(np.diff(table[2:, aces]) < 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+
+from rl.q_learner import QLearner, DenseQLearner
+from rl.q_table import DenseQTable
+from rl.simple_games import SimpleMovingGame
+from rl import bandit
+from texas.common import InnerAction
+from texas.agent import key_state_agent
+
+
+class DenseQTableTestCase(unittest.TestCase):
+    def test_index(self):
+        table = DenseQTable((11, 4), [0, 1], offsets=(-1, 0))
+        self.assertEqual(table.num_states, 44)
+        self.assertEqual(table.get_index(None), -1)
+        self.assertEqual(table.get_index((-1, 0)), 0)
+        self.assertEqual(table.get_index((2, 3)), 3 * 4 + 3)
+        # clipped
+        self.assertEqual(table.get_index((-5, 9)), 3)
+        states = [(-1, 0), (2, 3), (-5, 9), (20, 1)]
+        self.assertEqual(table.get_indexes(states).tolist(), [table.get_index(s) for s in states])
+
+        quantizer_table = key_state_agent.State5Quantizer.get_dense_table(list(InnerAction))
+        self.assertEqual(quantizer_table.values.shape, (4 * 11 * 13 * 13 * 5, 4))
+        # every amount bucket down to 1 chip has its own row
+        quantize_amount = key_state_agent.StateQuantizer.quantize_amount
+        amounts = sorted({quantize_amount(20, amount) for amount in range(0, 20 * 512)})
+        self.assertEqual(amounts, list(range(-4, 9)))
+        indexes = [quantizer_table.get_index((0, 5, amount, 0, 0)) for amount in amounts]
+        self.assertEqual(len(set(indexes)), len(amounts))
+        # the smaller are merged into -4
+        self.assertEqual(quantize_amount(40, 1), -5)
+        self.assertEqual(quantizer_table.get_index((0, 5, -5, 0, 0)), indexes[0])
+
+    def test_max_values(self):
+        table = DenseQTable((3, ), ["a", "b", "c"])
+        table.set_value(0, 1, -2.0)
+        table.set_value(0, 2, -1.0)
+        table.set_value(2, 0, 3.0)
+        table.set_value(0, 2, -3.0)
+        self.assertEqual(table.get_max_values([0, 1, 2, -1]).tolist(), [-2.0, 0.0, 3.0, 0.0])
+        self.assertEqual(table.get_best_actions([0, 1, 2]).tolist(), [0, 0, 0])
+        self.assertEqual(table.get_best_actions([0, 2], [2, 1]).tolist(), [1, 2])
+        self.assertEqual(table.get_visited_num(), 2)
+
+    def test_same_as_dict(self):
+        game = SimpleMovingGame()
+        learner = QLearner(bandit.ThompsonSampler(), 0.2)
+        game.train(learner, itr_num=2000)
+        game = SimpleMovingGame()
+        dense_learner = DenseQLearner(bandit.ThompsonSampler(), 0.2, DenseQTable((6, 6), [0, 1, 2, 3]))
+        game.train(dense_learner, itr_num=2000)
+        for state, action_values in learner._q_values.items():
+            index = dense_learner.table.get_index(state)
+            for action, value in action_values.items():
+                self.assertEqual(dense_learner.table.values[index, action], value)
+                self.assertEqual(dense_learner.table.counts[index, action], learner._q_counts[state][action])
+        self.assertEqual(dense_learner.table.get_visited_num(), len(learner._q_values))
+
+        table = DenseQTable((6, 6), [0, 1, 2, 3]).load_dict(learner._q_values, learner._q_counts)
+        self.assertTrue(np.array_equal(table.values, dense_learner.table.values))
+        self.assertTrue(np.array_equal(table.max_values, dense_learner.table.max_values))
+
+
+if __name__ == "__main__":
+    unittest.main()
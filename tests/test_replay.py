@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+
+from rl.q_learner import DenseQLearner
+from rl.q_table import DenseQTable
+from rl.replay import ReplayBuffer
+from rl import bandit
+
+
+class ReplayTestCase(unittest.TestCase):
+    def test_ring_buffer(self):
+        buffer = ReplayBuffer(4)
+        for n in range(3):
+            buffer.add(n, 0, -1, float(n))
+        buffer.add_batch(np.arange(3, 6), np.zeros(3), np.full(3, -1), np.arange(3, 6))
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.get_all()[0].tolist(), [2, 3, 4, 5])
+        buffer.add_batch(np.arange(6, 12), np.zeros(6), np.full(6, -1), np.arange(6, 12))
+        self.assertEqual(buffer.get_all()[0].tolist(), [8, 9, 10, 11])
+        states, _, _, rewards = buffer.sample(100)
+        self.assertEqual(set(states.tolist()), {8, 9, 10, 11})
+        self.assertTrue(np.array_equal(states, rewards))
+
+    def test_update_batch(self):
+        rand = np.random.RandomState(0)
+        for _ in range(20):
+            states = rand.randint(0, 10, 30)
+            actions = rand.randint(0, 3, 30)
+            next_states = rand.randint(-1, 10, 30)
+            rewards = rand.randint(-2, 3, 30).astype(float)
+            learner = DenseQLearner(bandit.GreedySampler(), 0.1, DenseQTable((10, ), [0, 1, 2]))
+            learner.update_batch(states, actions, next_states, rewards)
+            # against the values before the batch (all 0), the duplicates in order
+            expected = DenseQLearner(bandit.GreedySampler(), 0.1, DenseQTable((10, ), [0, 1, 2]))
+            for state, action, reward in zip(states, actions, rewards):
+                expected.table.set_value(state, action, 0.9 * expected.table.values[state, action] + 0.1 * reward)
+            for state, action in set(zip(states, actions)):
+                targets = rewards[(states == state) & (actions == action)]
+                if len(set(targets)) == 1:
+                    self.assertAlmostEqual(learner.table.values[state, action], expected.table.values[state, action])
+            self.assertTrue(np.array_equal(learner.table.counts, expected.table.counts))
+            self.assertTrue(np.array_equal(learner.table.max_values, np.where(
+                learner.table.counts > 0, learner.table.values, -np.inf).max(axis=1)))
+
+    def test_learn(self):
+        learner = DenseQLearner(bandit.GreedySampler(), 0.5, DenseQTable((4, ), [0, 1]), ReplayBuffer(100))
+        learner.update((0, ), 1, (1, ), 0.0)
+        learner.update((1, ), 0, None, 2.0)
+        self.assertEqual(learner.table.get_visited_num(), 0)
+        learner.learn()
+        self.assertEqual(learner.table.values[1, 0], 1.0)
+        learner.learn()
+        self.assertEqual(learner.table.values[0, 1], 0.5 * 0.99 * 1.0)
+        learner.learn(8, 10)
+        self.assertEqual(learner.table.counts.sum(), 4 + 80)
+        self.assertEqual(learner.get_action((0, ), [0, 1]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
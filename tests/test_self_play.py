@@ -0,0 +1,48 @@
+import unittest
+
+from texas.self_play import SelfPlayTrainer
+from texas.pr_cache import CachedPrCalc
+from texas.direct_cmp import ApproxComparer
+from texas.agent import key_state_agent
+from rl import q_learner, bandit
+
+
+class BrokenPrCalc(object):
+    def get_pr(self, hole_cards, common_cards=None, player_num=2, **kwargs):
+        raise ValueError("broken")
+
+
+class SelfPlayTestCase(unittest.TestCase):
+    def test_actor_learner(self):
+        learner = q_learner.ActorQLearner(bandit.EpsilonGreedySampler(), 0.1)
+        learner.update((1, 0), 2, None, 10)
+        self.assertEqual(learner.pop_transitions(), [((1, 0), 2, None, 10)])
+        self.assertEqual(learner.transitions, [])
+        learner.set_values({(1, 0): {2: 1.0}}, {(1, 0): {2: 1}})
+        self.assertEqual(learner.get_action((1, 0), [1, 2, 3]), 2)
+
+    def test_run(self):
+        learner = q_learner.QLearner(bandit.EpsilonGreedySampler(eps_end=0.2, eps_decay=1000), 0.01)
+        model = key_state_agent.InnerKeyStateAgent(
+            20, 2000, CachedPrCalc(ApproxComparer()), key_state_agent.State2Quantizer(), learner)
+        trainer = SelfPlayTrainer(model, worker_num=2, batch_hand_num=20)
+        self.assertGreater(trainer.run(50), 0)
+        self.assertEqual(trainer.hand_num, 100)
+        self.assertGreater(trainer.broadcast_num, 0)
+        # every transition is applied once
+        self.assertEqual(sum(sum(counts.values()) for counts in learner._q_counts.values()), trainer.transition_num)
+        trainer.run(10)
+        self.assertEqual(trainer.hand_num, 120)
+
+    def test_dead_actor(self):
+        learner = q_learner.QLearner(bandit.EpsilonGreedySampler(), 0.01)
+        model = key_state_agent.InnerKeyStateAgent(
+            20, 2000, BrokenPrCalc(), key_state_agent.State2Quantizer(), learner)
+        trainer = SelfPlayTrainer(model, worker_num=2, batch_hand_num=20)
+        trainer.poll_seconds = 0.1
+        with self.assertRaises(RuntimeError):
+            trainer.run(50)
+
+
+if __name__ == "__main__":
+    unittest.main()
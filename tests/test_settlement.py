@@ -0,0 +1,116 @@
+import random
+import unittest
+import numpy as np
+
+from texas import settlement
+
+
+MINIMAL_UNIT = 10
+
+
+def legacy_divide_the_money(total_pot, all_in_main_pots, ranks):
+    """
+    NoLimitTexasGame._divide_the_money before the settlement module
+    - argsort is stable here, the default one is not for ties on SIMD-sort builds,
+      i.e. the odd chips of the winners with the same cap went to an arbitrary one
+    """
+    def divide_evenly(amount, num):
+        if num == 1:
+            return [amount]
+        share = (amount // MINIMAL_UNIT // num) * MINIMAL_UNIT
+        last_share = amount - share * (num - 1)
+        return [last_share] + [share] * (num - 1)
+
+    ranks = np.array(ranks)
+    org_indexes = np.arange(len(ranks), dtype=int)
+    share_amounts = np.zeros(len(ranks), dtype=int)
+    exhausted_pot = 0
+    rank_level = ranks.min() - 1
+    while exhausted_pot < total_pot:
+        rank_level += 1
+        best_indexes = org_indexes[ranks == rank_level]
+        winner_all_in_pots = []
+        for index in best_indexes:
+            main_pot = all_in_main_pots[org_indexes[index]]
+            winner_all_in_pots.append(main_pot if main_pot else total_pot)
+        indexes = np.argsort(winner_all_in_pots, kind="stable")
+        best_indexes = np.array(best_indexes)[indexes]
+        winner_all_in_pots = np.array(winner_all_in_pots)[indexes]
+        share_num = len(best_indexes) + 1
+        for n, index in enumerate(best_indexes):
+            share_num -= 1
+            main_pot = winner_all_in_pots[n]
+            to_be_share = main_pot - exhausted_pot
+            if to_be_share <= 0:
+                continue
+            shares = divide_evenly(to_be_share, share_num)
+            for m in range(len(shares)):
+                share_amounts[org_indexes[best_indexes[m + n]]] += shares[m]
+            exhausted_pot = main_pot
+    return share_amounts
+
+
+def random_showdown(rand):
+    """
+    :return: total pot, all-in main pots of the left seats, dense ranks of the left seats, is_left of all the seats
+    """
+    num = rand.randint(2, 10)
+    max_bet = rand.randint(1, 100) * MINIMAL_UNIT + rand.choice([0, 0, 5])
+    bets = [rand.randint(0, max_bet) for _ in range(num)]
+    states = [rand.choice(["active", "all_in", "all_in", "fold"]) for _ in range(num)]
+    states[rand.randrange(num)] = "active"  # someone matches the max bet
+    for n in range(num):
+        if states[n] == "active":
+            bets[n] = max_bet
+    left_seats = [n for n in range(num) if states[n] != "fold"]
+    if len(left_seats) < 2:
+        states[(left_seats[0] + 1) % num] = "all_in"
+        left_seats = [n for n in range(num) if states[n] != "fold"]
+    main_pots = [sum(min(b, bets[n]) for b in bets) if states[n] == "all_in" else None for n in left_seats]
+    strengths = [rand.randint(0, 3) for _ in left_seats]
+    _, ranks = np.unique(-np.array(strengths), return_inverse=True)
+    return sum(bets), main_pots, ranks.tolist(), [s != "fold" for s in states]
+
+
+class SettlementTestCase(unittest.TestCase):
+    def test_dividing_money(self):
+        self.assertEqual(settlement.divide_the_money(500, [300, None, None, None], [0, 0, 1, 2], MINIMAL_UNIT),
+                         [150, 350, 0, 0])
+        self.assertEqual(settlement.divide_the_money(500, [300, 400, 200, None], [0, 0, 1, 1], MINIMAL_UNIT),
+                         [150, 250, 0, 100])
+        # odd chips to the first winner, a main pot of 0 is the total pot
+        self.assertEqual(settlement.divide_the_money(65, [None, 0, None], [0, 0, 0], MINIMAL_UNIT), [25, 20, 20])
+
+    def test_random_showdowns(self):
+        rand = random.Random(0)
+        for _ in range(3000):
+            total_pot, main_pots, ranks, _ = random_showdown(rand)
+            shares = settlement.divide_the_money(total_pot, main_pots, ranks, MINIMAL_UNIT)
+            self.assertEqual(sum(shares), total_pot)
+            self.assertEqual(shares, legacy_divide_the_money(total_pot, main_pots, ranks).tolist(),
+                             msg=str((total_pot, main_pots, ranks)))
+
+    def test_batch(self):
+        rand = random.Random(1)
+        table_num, num = 500, 10
+        total_pots = np.zeros(table_num, dtype=np.int64)
+        main_pots = np.full((table_num, num), -1, dtype=np.int64)
+        ranks = np.zeros((table_num, num), dtype=np.int64)
+        is_left = np.zeros((table_num, num), dtype=bool)
+        expected = np.zeros((table_num, num), dtype=np.int64)
+        for k in range(table_num):
+            total_pot, left_main_pots, left_ranks, left_flags = random_showdown(rand)
+            seats = [n for n, x in enumerate(left_flags) if x]
+            total_pots[k] = total_pot
+            is_left[k, :len(left_flags)] = left_flags
+            main_pots[k, seats] = [-1 if p is None else p for p in left_main_pots]
+            ranks[k] = rand.randint(0, 9)  # ignored for the folded
+            ranks[k, seats] = left_ranks
+            expected[k, seats] = settlement.divide_the_money(total_pot, left_main_pots, left_ranks, MINIMAL_UNIT)
+        shares = settlement.divide_the_money_batch(total_pots, main_pots, ranks, is_left, MINIMAL_UNIT)
+        self.assertEqual(shares.tolist(), expected.tolist())
+        self.assertEqual(shares.sum(axis=1).tolist(), total_pots.tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
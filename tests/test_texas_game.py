@@ -1,6 +1,14 @@
 import unittest
+import numpy as np
+
 from texas import texas_games
+from texas import batch_games
+from texas.agent import naive_agents
+from texas.common import AgentAction, TexasRound
 from texas.judge import TexasJudge
+from texas.monte_carlo import BatchSimulator
+from texas.preflop import PreflopTablePrCalc
+from texas.pr_cache import CachedPrCalc
 
 
 class TexasGameTestCase(unittest.TestCase):
@@ -11,3 +19,56 @@ class TexasGameTestCase(unittest.TestCase):
         self.assertEqual(list(amounts), [150, 350, 0, 0])
         amounts = game._divide_the_money(500, [300, 400, 200, None], [0, 0, 1, 1])
         self.assertEqual(list(amounts), [150, 250, 0, 100])
+
+    def test_context(self):
+        context = texas_games.TexasContext(3, 20)
+        for _ in range(2):  # reused
+            context.reset()
+            context.round = TexasRound.PreFlop
+            context.set_action_bet(0, AgentAction.Blind, 10)
+            context.set_action_bet(1, AgentAction.Blind, 20)
+            context.set_action_bet(2, AgentAction.Raise, 40)
+            context.set_action_bet(0, AgentAction.All_in, 5)
+            self.assertEqual(context.get_max_earning(40), 65)
+            self.assertEqual(context.get_max_earning(10), 25)
+            context.finish_a_scan(is_round_over=False)
+            context.set_action_bet(1, AgentAction.Fold, 20)
+            context.finish_a_scan(is_round_over=True, index=1)
+            self.assertEqual((context.num_left, context.get_active_num()), (2, 1))
+            self.assertEqual(list(context.cum_bets), [5, 20, 40])
+            self.assertEqual(context.total_pot, 65)
+            self.assertEqual(context.all_in_main_pots, [15, None, None])
+            self.assertEqual(context.get_action_bet(2), (AgentAction.Blind, 0))
+            self.assertEqual(context.round_bet_records[TexasRound.PreFlop], [[5, 20, 40], [5, 20, 40]])
+            self.assertEqual(context.round_action_records[TexasRound.PreFlop], [
+                [AgentAction.All_in, AgentAction.Blind, AgentAction.Raise],
+                [AgentAction.All_in, AgentAction.Fold, AgentAction.Padding],
+            ])
+            context.round = TexasRound.Flop
+            for _ in range(texas_games.TexasContext.INIT_ROW_CAPACITY):
+                context.finish_a_scan(is_round_over=False)
+            self.assertEqual(len(context.round_action_records[TexasRound.Flop]),
+                             texas_games.TexasContext.INIT_ROW_CAPACITY)
+
+    def test_batch_game(self):
+        judge = TexasJudge()
+        calc = CachedPrCalc(PreflopTablePrCalc(BatchSimulator(judge)))
+        table_num, num, hand_num, total_amount = 6, 4, 25, 400
+        # scalar, table by table
+        scalar_amounts = np.zeros((hand_num, table_num, num), dtype=int)
+        for k in range(table_num):
+            game = texas_games.NoLimitTexasGame(judge, seed=k)
+            agents = [naive_agents.StaticAgent(20, total_amount, calc, 100) if n % 2 == 0
+                      else naive_agents.BraveAgent(20, total_amount, calc) for n in range(num)]
+            for h in range(hand_num):
+                scalar_amounts[h, k] = game.run_a_hand(agents, False)
+                for agent, amount in zip(agents, scalar_amounts[h, k]):
+                    agent.set_reward(amount)
+        # batch
+        game = batch_games.BatchNoLimitTexasGame(judge, table_num, num, seeds=range(table_num),
+                                                 total_amounts=total_amount)
+        agents = [naive_agents.BatchStaticAgent(20, calc, 100) if n % 2 == 0
+                  else naive_agents.BatchBraveAgent(20, calc) for n in range(num)]
+        for h in range(hand_num):
+            self.assertEqual(game.run_a_hand(agents).tolist(), scalar_amounts[h].tolist(), msg=str(h))
+        self.assertEqual(game.stacks.sum(), total_amount * table_num * num)
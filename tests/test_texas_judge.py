@@ -1,6 +1,8 @@
+import random
 import unittest
+import numpy as np
 
-from texas.judge import TexasJudge, TexasLevel
+from texas.judge import TexasJudge, TexasLevel, HandEvaluator, encode_card, encode_cards, get_strength_level
 
 
 class TexasJudgeTestCase(unittest.TestCase):
@@ -54,6 +56,35 @@ class TexasJudgeTestCase(unittest.TestCase):
         ranks = judge.rank([x[0] for x in self.two_cards_levels])
         self.assertEqual(list(ranks), self.two_cards_levels_ranks)
 
+    def test_evaluator_level(self):
+        evaluator = HandEvaluator()
+        for cards, level in self.cards_levels:
+            strength = evaluator.evaluate(cards)
+            self.assertEqual(level, get_strength_level(strength), cards)
+            self.assertEqual(strength, evaluator.evaluate_codes([encode_card(c) for c in cards]))
+
+    def test_evaluator_vs_sorting(self):
+        judge = TexasJudge()
+        total_cards = [(s, d) for s in range(1, 5) for d in range(2, 15)]
+        rand = random.Random(0)
+        for n in range(2000):
+            card_lists = [rand.sample(total_cards, 5 + n % 3) for _ in range(4)]
+            level_sets = [judge._get_level_set(cs) for cs in card_lists]
+            self.assertEqual(list(judge.rank(card_lists)), list(judge._rank(level_sets)), card_lists)
+            self.assertEqual(judge.argmax(card_lists), judge._arg_max(level_sets), card_lists)
+
+    def test_rank_batch(self):
+        judge = TexasJudge()
+        evaluator = HandEvaluator()
+        card_lists = [x[0] for x in self.cards_levels if len(x[0]) == 7]
+        self.assertEqual(list(judge.rank_batch(encode_cards(card_lists))),
+                         [evaluator.evaluate(cs) for cs in card_lists])
+        rand = np.random.RandomState(0)
+        codes = np.argsort(rand.random_sample((20000, 52)), axis=1)[:, :7]
+        for size in (5, 6, 7):
+            strengths = judge.rank_batch(codes[:, :size])
+            self.assertEqual(list(strengths), [evaluator.evaluate_codes(cs) for cs in codes[:, :size]])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from texas import tournament
+
+
+class TournamentTestCase(unittest.TestCase):
+    def test_pairs(self):
+        self.assertEqual(tournament.get_round_robin_pairs(["a", "b", "c"]), [(0, 1), (0, 2), (1, 2)])
+        self.assertEqual(tournament.get_swiss_pairs([3.0, 1.0, 2.0, 0.0], set()), [(0, 2), (1, 3)])
+        # no rematch if possible
+        self.assertEqual(tournament.get_swiss_pairs([3.0, 1.0, 2.0, 0.0], {(0, 2)}), [(0, 1), (2, 3)])
+        self.assertEqual(tournament.get_swiss_pairs([3.0, 1.0, 2.0], set()), [(0, 2)])
+
+    def test_match(self):
+        results = tournament.run_match("static", "random", 30, seed=7)
+        self.assertEqual(results.shape, (30, 2))
+        self.assertEqual(results.sum(), 0)
+        self.assertEqual(results.tolist(), tournament.run_match("static", "random", 30, seed=7).tolist())
+
+    def test_match_after_another(self):
+        # the same seed after a different match in the same process
+        results = tournament.run_match("static", "brave", 30, seed=4)
+        tournament.run_match("brave", "static", 30, seed=5)
+        self.assertEqual(results.tolist(), tournament.run_match("static", "brave", 30, seed=4).tolist())
+
+    def test_tournament(self):
+        game = tournament.Tournament(["static", "brave", "random"], 20, seed=1, worker_num=2)
+        game.run_swiss(2)
+        self.assertEqual(len(game.matches), 2)
+        self.assertNotEqual((game.matches[0]["left"], game.matches[0]["right"]),
+                            (game.matches[1]["left"], game.matches[1]["right"]))
+        match = game.matches[1]
+        results = tournament.run_match(game.names[match["left"]], game.names[match["right"]], 20, match["seed"])
+        self.assertEqual(results.tolist(), match["results"].tolist())
+        standings = game.get_standings()
+        self.assertEqual([x[0] for x in standings], game.names)
+        for name, bb_per_100, (low, high), hand_num in standings:
+            self.assertTrue(low <= bb_per_100 <= high)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,10 +4,29 @@ action: probability + amount
 """
 from texas import common
 from texas.common import InnerAction
+from rl.q_table import DenseQTable
+from rl.q_learner import DenseQLearner
 import math
 
 
 class StateQuantizer(object):
+    # (min, size) of the dimensions for DenseQTable
+    # pr 0..10, round 0..3, num 0..4
+    # amount -4..8: -4 for 1 chip at big blind 20, the smaller (a big blind > 31) are clipped into -4
+    PR_RANGE = (0, 11)
+    ROUND_RANGE = (0, 4)
+    AMOUNT_RANGE = (-4, 13)
+    NUM_RANGE = (0, 5)
+    STATE_RANGES = ()
+
+    @classmethod
+    def get_dense_table(cls, actions):
+        """
+        :return: DenseQTable of the states of the quantizer
+        """
+        offsets, sizes = zip(*cls.STATE_RANGES)
+        return DenseQTable(sizes, actions, offsets)
+
     @staticmethod
     def quantize_pr(pr):
         return int(pr/0.1)
@@ -26,6 +45,8 @@ class StateQuantizer(object):
 
 
 class State2Quantizer(StateQuantizer):
+    STATE_RANGES = (StateQuantizer.PR_RANGE, StateQuantizer.ROUND_RANGE)
+
     def quantize(self, pr, open_bet, remain_amt, context, index):
         return (
             StateQuantizer.quantize_pr(pr),
@@ -34,6 +55,8 @@ class State2Quantizer(StateQuantizer):
 
 
 class State3Quantizer(StateQuantizer):
+    STATE_RANGES = (StateQuantizer.PR_RANGE, StateQuantizer.AMOUNT_RANGE, StateQuantizer.AMOUNT_RANGE)
+
     def quantize(self, pr, open_bet, remain_amt, context, index):
         _, latest_bet = context.get_action_bet(index)
         delta_bet = min(open_bet - latest_bet, remain_amt) # How much to bet
@@ -47,6 +70,9 @@ class State3Quantizer(StateQuantizer):
 
 
 class State5Quantizer(StateQuantizer):
+    STATE_RANGES = (StateQuantizer.ROUND_RANGE, StateQuantizer.PR_RANGE, StateQuantizer.AMOUNT_RANGE,
+                    StateQuantizer.AMOUNT_RANGE, StateQuantizer.NUM_RANGE)
+
     def quantize(self, pr, open_bet, remain_amt, context, index):
         _, latest_bet = context.get_action_bet(index)
         delta_bet = min(open_bet - latest_bet, remain_amt) # How much to bet
@@ -62,6 +88,13 @@ class State5Quantizer(StateQuantizer):
         )
 
 
+def create_dense_q_learner(sampler, alpha, state_quantizer):
+    """
+    DenseQLearner over the states of state_quantizer & the inner actions of InnerKeyStateAgent
+    """
+    return DenseQLearner(sampler, alpha, state_quantizer.get_dense_table(list(InnerAction)))
+
+
 class InnerKeyStateAgent(common.BaseAgent):
     def __init__(self, big_blind, total_amount, pr_calc, state_quantizer, q_learner):
         super().__init__(big_blind, total_amount)
@@ -0,0 +1,104 @@
+"""
+Model files of InnerKeyStateAgent, instead of pickling the whole agent
+- a directory: meta.json + values.npy, counts.npy, max_values.npy of the DenseQTable
+- meta.json: version, quantizer, table layout, learner & sampler parameters, free metadata
+- pr_calc is not saved, it is given when loading
+- np.load(mmap_mode="r"): inference agents start at once & share the table pages across processes
+"""
+import os
+import json
+import numpy as np
+
+from rl import bandit
+from rl.q_table import DenseQTable
+from rl.q_learner import DenseQLearner
+from texas.common import InnerAction
+from . import key_state_agent
+
+
+MODEL_VERSION = 1
+META_FNAME = "meta.json"
+ARRAY_NAMES = ("values", "counts", "max_values")
+QUANTIZERS = {
+    cls.__name__: cls for cls in (
+        key_state_agent.State2Quantizer, key_state_agent.State3Quantizer, key_state_agent.State5Quantizer)
+}
+SAMPLERS = {
+    cls.__name__: cls for cls in (bandit.GreedySampler, bandit.EpsilonGreedySampler, bandit.ThompsonSampler)
+}
+
+
+def is_model_dir(fname):
+    return os.path.isfile(os.path.join(fname, META_FNAME))
+
+
+def _get_sampler_meta(sampler):
+    # the constructor parameters, not the random state
+    params = {k[1:]: v for k, v in vars(sampler).items() if k not in ("_rand", "_count")}
+    return {"name": type(sampler).__name__, "params": params}
+
+
+def save_model(dirname, agent, **metadata):
+    """
+    :param agent: InnerKeyStateAgent, the dict tables of QLearner are converted to a DenseQTable
+    :param metadata: saved as it is, e.g. epoch
+    """
+    learner = agent.q_learner
+    quantizer = agent.state_quantizer
+    if isinstance(learner, DenseQLearner):
+        table = learner.table
+    else:
+        table = quantizer.get_dense_table(list(InnerAction)).load_dict(learner._q_values, learner._q_counts)
+    os.makedirs(dirname, exist_ok=True)
+    for name in ARRAY_NAMES:
+        np.save(os.path.join(dirname, name + ".npy"), np.ascontiguousarray(getattr(table, name)))
+    meta = {
+        "version": MODEL_VERSION,
+        "agent": type(agent).__name__,
+        "quantizer": type(quantizer).__name__,
+        "sizes": list(table.sizes),
+        "offsets": list(table.offsets),
+        "actions": [int(a) for a in table.actions],
+        "default_value": table.default_value,
+        "alpha": learner._alpha,
+        "gamma": learner.GAMMA,
+        "sampler": _get_sampler_meta(learner._sampler),
+        "big_blind": agent._big_blind,
+        "metadata": metadata,
+    }
+    # the last one, a model without meta.json is not complete
+    with open(os.path.join(dirname, META_FNAME), "w") as fout:
+        json.dump(meta, fout, indent=2)
+
+
+def load_meta(dirname):
+    with open(os.path.join(dirname, META_FNAME)) as fin:
+        meta = json.load(fin)
+    if meta.get("version") != MODEL_VERSION:
+        raise ValueError("%s: model version %s not supported" % (dirname, meta.get("version")))
+    if meta["quantizer"] not in QUANTIZERS or meta["sampler"]["name"] not in SAMPLERS:
+        raise ValueError("%s: unknown quantizer %s or sampler %s" % (
+            dirname, meta["quantizer"], meta["sampler"]["name"]))
+    return meta
+
+
+def load_table(dirname, meta, mmap_mode="r"):
+    arrays = {name: np.load(os.path.join(dirname, name + ".npy"), mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+    return DenseQTable(meta["sizes"], [InnerAction(a) for a in meta["actions"]], meta["offsets"],
+                       meta["default_value"], **arrays)
+
+
+def load_model(dirname, pr_calc, total_amount=0, mmap_mode="r"):
+    """
+    :param mmap_mode: "r" for inference, the learner is frozen & the agent is_test,
+        None to load the arrays into memory & go on training
+    :return: InnerKeyStateAgent with a DenseQLearner
+    """
+    meta = load_meta(dirname)
+    sampler = SAMPLERS[meta["sampler"]["name"]](**meta["sampler"]["params"])
+    is_frozen = mmap_mode == "r"
+    learner = DenseQLearner(sampler, meta["alpha"], load_table(dirname, meta, mmap_mode), is_frozen=is_frozen)
+    agent = key_state_agent.InnerKeyStateAgent(
+        meta["big_blind"], total_amount, pr_calc, QUANTIZERS[meta["quantizer"]](), learner)
+    agent.is_test = is_frozen
+    return agent
@@ -1,4 +1,5 @@
 import random
+import numpy as np
 
 from texas import common
 
@@ -74,3 +75,51 @@ class BraveAgent(common.BaseAgent):
         else:
             inner_action = common.InnerAction.Normal
         return self._wrap_return(*self._normalize_action_bet(inner_action, open_bet))
+
+
+class BatchStaticAgent(common.BatchBaseAgent):
+    """
+    StaticAgent for K tables, pr is calculated once per (table, round)
+    """
+    def __init__(self, big_blind, pr_calc, doubt_max_call=None):
+        super().__init__(big_blind)
+        self.pr_calc = pr_calc
+        self._doubt_max_call = doubt_max_call if doubt_max_call else big_blind * 10
+        # cache
+        self._prs = np.zeros(0)
+        self._pr_rounds = np.zeros(0, dtype=int)
+
+    def start_new_games(self, table_num):
+        self._prs = np.zeros(table_num)
+        self._pr_rounds = np.full(table_num, -1)
+
+    def _get_prs(self, obs):
+        tables = obs.tables
+        for n in np.nonzero(self._pr_rounds[tables] != obs.rounds)[0]:
+            self._prs[tables[n]] = self.pr_calc.get_pr(obs.get_hole_cards(n), obs.get_community_cards(n), obs.num)
+        self._pr_rounds[tables] = obs.rounds
+        return self._prs[tables]
+
+    def get_bets(self, obs):
+        prs = self._get_prs(obs)
+        open_bets = obs.open_bets
+        is_doubt = open_bets >= self._doubt_max_call
+        inner_actions = np.where(
+            prs < 0.5,
+            np.where((prs < 1.0 / obs.num) | is_doubt, common.InnerAction.Conservative, common.InnerAction.Normal),
+            np.where(is_doubt | (open_bets == 0), common.InnerAction.Normal, common.InnerAction.Aggressive),
+        )
+        return self._wrap_returns(*self._normalize_action_bets(inner_actions, open_bets, obs.latest_bets), obs)
+
+
+class BatchBraveAgent(BatchStaticAgent):
+    """
+    BraveAgent for K tables
+    """
+    def __init__(self, big_blind, pr_calc):
+        super().__init__(big_blind, pr_calc)
+
+    def get_bets(self, obs):
+        prs = self._get_prs(obs)
+        inner_actions = np.where(prs < 1.0 / obs.num, common.InnerAction.Conservative, common.InnerAction.Normal)
+        return self._wrap_returns(*self._normalize_action_bets(inner_actions, obs.open_bets, obs.latest_bets), obs)
@@ -0,0 +1,243 @@
+"""
+无限德扑, K tables in lockstep
+
+- state: arrays [K] or [K, num] (stacks, bets, actions, pot, ...), one hand per table at a time
+- all the tables play the same round & the same seat at a time, so one seat step is one agent call (BatchBaseAgent)
+- showdown: judge.rank_batch over all the tables
+- table k shuffles its deck with RandomState(seeds[k]), the same as NoLimitTexasGame(seed=seeds[k])
+  so the per-hand results are the same as the scalar game with the scalar agents
+"""
+import numpy as np
+
+from .poker import PokerConst
+from .common import AgentAction, TexasRound
+from . import settlement
+from .texas_games import NoLimitTexasGame, AgentWrongBetError, GameNoWinnerError
+
+
+INF_AMOUNT = 1 << 60  # total_amount None
+
+
+class BatchObservation(object):
+    """
+    The tables waiting for seat index, arrays of len(tables)
+    """
+    def __init__(self, game, tables, index):
+        self.tables = tables
+        self.index = index
+        self.num = game.num
+        self.big_blind = game._big_blind
+        self.rounds = game.rounds[tables]
+        self.open_bets = game.open_bets[tables]
+        self.latest_bets = game.latest_bets[tables, index]
+        self.cum_bets = game.cum_bets[tables, index]
+        self.stacks = game.stacks[tables, index]
+        self.total_pots = game.total_pots[tables]
+        self.num_left = game.num_left[tables]
+        self.hole_codes = game.hole_codes[tables, index]
+        self.community_codes = game.community_codes[tables]
+        self.community_nums = np.array([0, 3, 4, 5])[self.rounds]
+        self.all_latest_bets = game.latest_bets[tables]
+
+    def get_hole_cards(self, n):
+        return [get_card(c) for c in self.hole_codes[n]]
+
+    def get_community_cards(self, n):
+        return [get_card(c) for c in self.community_codes[n, :self.community_nums[n]]]
+
+    def get_max_earnings(self, my_bets):
+        """
+        TexasContext.get_max_earning for arrays
+        """
+        return self.total_pots + np.minimum(self.all_latest_bets, my_bets[:, None]).sum(axis=1)
+
+
+def get_card(code):
+    """
+    :return: [symbol, digit], the same as the cards of NoLimitTexasGame
+    """
+    return [int(code // PokerConst.DIGIT_NUM) + 1, int(code % PokerConst.DIGIT_NUM) + PokerConst.MIN_DIGIT]
+
+
+class BatchNoLimitTexasGame(NoLimitTexasGame):
+    def __init__(self, judge, table_num, num, big_blind=20, minimal_unit=10, *, seeds=None, total_amounts=None):
+        """
+        :param seeds: [K], None for 0..K-1
+        :param total_amounts: [num] or [K, num], None for inf
+        """
+        super().__init__(judge, big_blind, minimal_unit)
+        self.table_num = table_num
+        self.num = num
+        seeds = range(table_num) if seeds is None else seeds
+        self._random_states = [np.random.RandomState(s) for s in seeds]
+        self.decks = np.tile(np.arange(PokerConst.DIGIT_NUM * 4), (table_num, 1))
+        self.stacks = np.zeros((table_num, num), dtype=np.int64)
+        self.stacks[:] = INF_AMOUNT if total_amounts is None else total_amounts
+
+        # state of the current hand
+        self.rounds = np.zeros(table_num, dtype=int)
+        self.open_bets = np.zeros(table_num, dtype=np.int64)
+        self.total_pots = np.zeros(table_num, dtype=np.int64)
+        self.num_left = np.zeros(table_num, dtype=int)
+        self.num_all_in = np.zeros(table_num, dtype=int)
+        self.latest_bets = np.zeros((table_num, num), dtype=np.int64)
+        self.latest_actions = np.zeros((table_num, num), dtype=int)
+        self.cum_bets = np.zeros((table_num, num), dtype=np.int64)
+        self.all_in_main_pots = np.zeros((table_num, num), dtype=np.int64)  # -1 for None
+        self.hole_codes = np.zeros((table_num, num, 2), dtype=int)
+        self.community_codes = np.zeros((table_num, 5), dtype=int)
+
+    def run_a_hand(self, agents):
+        """
+        :param agents: [num] BatchBaseAgent, one per seat
+        :return: int array [K, num], the stacks & the agents are updated
+        """
+        assert len(agents) == self.num
+        num = self.num
+        for deck, random_state in zip(self.decks, self._random_states):
+            random_state.shuffle(deck)
+        self.hole_codes[:] = self.decks[:, :num * 2].reshape((-1, num, 2))
+        card_index = num * 2 + 1
+        self.community_codes[:, :3] = self.decks[:, card_index: card_index + 3]
+        self.community_codes[:, 3] = self.decks[:, card_index + 4]
+        self.community_codes[:, 4] = self.decks[:, card_index + 6]
+
+        self.total_pots[:] = 0
+        self.num_left[:] = num
+        self.num_all_in[:] = 0
+        self.latest_bets[:] = 0
+        self.latest_actions[:] = AgentAction.Blind
+        self.cum_bets[:] = 0
+        self.all_in_main_pots[:] = -1
+        for agent in agents:
+            agent.start_new_games(self.table_num)
+
+        is_over = np.zeros(self.table_num, dtype=bool)
+        for round_ in TexasRound:
+            self.rounds[~is_over] = round_
+            self._run_a_round(round_, agents, ~is_over & (self.num_left - self.num_all_in > 1))
+            is_over |= self.num_left <= 1
+        amounts = self.shut_down()
+        self.stacks += amounts
+        for n, agent in enumerate(agents):
+            agent.set_rewards(amounts[:, n])
+        return amounts
+
+    def _check_bets(self, bets, last_bets, actions, cur_bets):
+        """
+        NoLimitTexasGame._check_bet for arrays
+        """
+        return np.select([
+            actions == AgentAction.Fold,
+            actions == AgentAction.Check,
+            actions == AgentAction.Bet,
+            actions == AgentAction.Call,
+            actions == AgentAction.Raise,
+            actions == AgentAction.Raise_more,
+            actions == AgentAction.All_in,
+        ], [
+            cur_bets == last_bets,
+            (bets == 0) & (cur_bets == 0),
+            (bets == 0) & (cur_bets >= self._big_blind),
+            (cur_bets == bets) & (bets > 0),
+            (cur_bets >= bets * 2) & (bets > 0),
+            (cur_bets > bets * 2) & (bets > 0),
+            cur_bets >= 0,
+        ], False)
+
+    def _run_a_round(self, round_, agents, is_playing):
+        tables = np.nonzero(is_playing)[0]
+        if len(tables) == 0:
+            return
+        if round_ == TexasRound.PreFlop:
+            self.latest_bets[tables, 0] = self._small_blind
+            self.latest_bets[tables, 1] = self._big_blind
+            self.open_bets[tables] = self._big_blind
+            start_index = 2
+        else:
+            self.open_bets[tables] = 0
+            start_index = 0
+
+        active_ready_nums = np.zeros(self.table_num, dtype=int)  # Blind is not ready
+        while len(tables) > 0:
+            # scan
+            for index in range(start_index, self.num):
+                latest_actions = self.latest_actions[tables, index]
+                latest_bets = self.latest_bets[tables, index]
+                open_bets = self.open_bets[tables]
+                actions, bets = latest_actions.copy(), latest_bets.copy()
+                is_hand_over = (latest_actions == AgentAction.Fold) | (latest_actions == AgentAction.All_in)
+                # no decision needed, Big-blind 可以躺赢
+                is_auto = ~is_hand_over & (latest_bets == open_bets) & (
+                        self.num_left[tables] - self.num_all_in[tables] == 1)
+                actions[is_auto] = AgentAction.Call
+                is_asked = ~is_hand_over & ~is_auto
+                if is_asked.any():
+                    obs = BatchObservation(self, tables[is_asked], index)
+                    actions[is_asked], bets[is_asked] = agents[index].get_bets(obs)
+                is_valid = self._check_bets(open_bets, latest_bets, actions, bets)
+                if not is_valid.all():
+                    n = np.nonzero(~is_valid)[0][0]
+                    raise AgentWrongBetError(agents[index].get_name(), open_bets[n], latest_bets[n],
+                                             AgentAction(actions[n]), bets[n])
+                # set_action_bet
+                is_changed = latest_actions != actions
+                self.num_left[tables] -= is_changed & (actions == AgentAction.Fold)
+                self.num_all_in[tables] += is_changed & (actions == AgentAction.All_in)
+                self.latest_actions[tables, index] = actions
+                self.latest_bets[tables, index] = bets
+
+                active_ready_nums[tables[bets > open_bets]] = 0
+                active_ready_nums[tables] += (actions != AgentAction.Fold) & (actions != AgentAction.All_in)
+                self.open_bets[tables] = np.maximum(open_bets, bets)
+
+                # num_active=0: all fold or all-in, 1: the active one has the largest bet
+                is_round_over = active_ready_nums[tables] == self.num_left[tables] - self.num_all_in[tables]
+                if is_round_over.any():
+                    self._finish_a_round(tables[is_round_over])
+                    tables = tables[~is_round_over]
+                    if len(tables) == 0:
+                        return
+            # new scan
+            start_index = 0
+
+    def _finish_a_round(self, tables):
+        """
+        TexasContext.finish_a_scan(is_round_over=True)
+        """
+        latest_bets = self.latest_bets[tables]
+        latest_actions = self.latest_actions[tables]
+        # new all-in: main pot = total pot + min(bet, my bet) of everyone
+        main_pots = self.total_pots[tables, None] + np.minimum(latest_bets[:, :, None], latest_bets[:, None, :]).sum(
+            axis=1)
+        is_new_all_in = (latest_actions == AgentAction.All_in) & (self.all_in_main_pots[tables] < 0)
+        self.all_in_main_pots[tables] = np.where(is_new_all_in, main_pots, self.all_in_main_pots[tables])
+        self.cum_bets[tables] += latest_bets
+        self.total_pots[tables] += latest_bets.sum(axis=1)
+        is_hand_over = (latest_actions == AgentAction.Fold) | (latest_actions == AgentAction.All_in)
+        self.latest_actions[tables] = np.where(is_hand_over, latest_actions, AgentAction.Blind)
+        self.latest_bets[tables] = 0
+
+    def shut_down(self):
+        """
+        :return: int array [K, num], the earnings of this hand
+        """
+        is_left = self.latest_actions != AgentAction.Fold
+        left_nums = is_left.sum(axis=1)
+        if (left_nums == 0).any():
+            raise GameNoWinnerError()
+        amounts = np.zeros((self.table_num, self.num), dtype=np.int64)
+        ones = np.nonzero(left_nums == 1)[0]
+        amounts[ones, is_left[ones].argmax(axis=1)] = self.total_pots[ones]
+        showdowns = np.nonzero(left_nums > 1)[0]
+        if len(showdowns) > 0:
+            codes = np.concatenate([
+                self.hole_codes[showdowns],
+                np.repeat(self.community_codes[showdowns, None, :], self.num, axis=1)
+            ], axis=2)
+            strengths = self._judge.rank_batch(codes.reshape((-1, 7))).reshape((-1, self.num))
+            # main pot 0 is None as well, the same as NoLimitTexasGame
+            amounts[showdowns] = settlement.divide_the_money_batch(
+                self.total_pots[showdowns], self.all_in_main_pots[showdowns], -strengths, is_left[showdowns],
+                self._minimal_unit)
+        return amounts - self.cum_bets
@@ -1,4 +1,5 @@
 import enum
+import numpy as np
 
 
 class TexasRound(enum.IntEnum):
@@ -180,3 +181,78 @@ class BaseAgent(object):
         if self._total_amount is not None:
             self._total_amount += amount
         self._cum_amount = 0
+
+
+class BatchBaseAgent(object):
+    """
+    One seat of K tables, see batch_games.BatchNoLimitTexasGame
+    - get_bets: batched observations of the tables waiting for this seat
+    - the stacks & bets are kept by the game, not by the agent
+    """
+    glb_count = 0
+
+    def __init__(self, big_blind, *, name=None):
+        self._big_blind = big_blind
+        self._name = name
+        self._agent_index = BatchBaseAgent.glb_count
+        BatchBaseAgent.glb_count += 1
+
+    def get_name(self):
+        if not self._name:
+            return type(self).__name__ + str(self._agent_index)
+        return self._name
+
+    def _normalize_action_bets(self, inner_actions, open_bets, latest_bets):
+        """
+        BaseAgent._normalize_action_bet for arrays
+        :return: actions, bets
+        """
+        big_blind = self._big_blind
+        is_open = open_bets == 0
+        conservative = inner_actions == InnerAction.Conservative
+        normal = (inner_actions == InnerAction.Normal) | (latest_bets > 0)  # do not raise twice
+        aggressive = inner_actions == InnerAction.Aggressive
+        actions = np.select([
+            is_open & conservative, is_open,
+            conservative & (latest_bets == open_bets), conservative,
+            normal, aggressive,
+        ], [
+            AgentAction.Check, AgentAction.Bet,
+            AgentAction.Call, AgentAction.Fold,
+            AgentAction.Call, AgentAction.Raise,
+        ], AgentAction.Raise_more)
+        bets = np.select([
+            is_open & conservative, is_open & (inner_actions == InnerAction.Normal), is_open & aggressive, is_open,
+            conservative, normal, aggressive,
+        ], [
+            0, big_blind, big_blind * 2, big_blind * 4,
+            latest_bets, open_bets, open_bets * 2,
+        ], open_bets * 4)
+        return actions, bets
+
+    @staticmethod
+    def _wrap_returns(actions, bets, obs):
+        """
+        BaseAgent._wrap_return for arrays, all-in if there is not enough money
+        """
+        is_all_in = obs.cum_bets + bets >= obs.stacks
+        actions = np.where(is_all_in, AgentAction.All_in, actions)
+        bets = np.where(is_all_in, obs.stacks - obs.cum_bets, bets)
+        return actions, bets
+
+    # the following are for game-agent interaction
+    def start_new_games(self, table_num):
+        pass
+
+    def get_bets(self, obs):
+        """
+        :param obs: batch_games.BatchObservation
+        :return: actions, bets, int arrays of len(obs.tables)
+        """
+        raise NotImplementedError()
+
+    def set_rewards(self, amounts):
+        """
+        :param amounts: [K], rewards of this seat
+        """
+        pass
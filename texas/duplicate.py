@@ -0,0 +1,85 @@
+"""
+Duplicate poker
+- K models, seat n is a copy of model (n + r) % K in rotation r, every deal is played in K rotations
+  so every model gets the cards of every seat once, the card luck cancels out
+- every hand starts with init_amount for each seat, the stacks don't carry luck over
+- the seats of a model share one frozen copy of its q_learner & act greedily (is_test),
+  the same policy at every seat for the whole evaluation, the model itself is not changed
+- score of a deal: chips won per seat of the model, averaged over the rotations
+  the deals are independent, bb/100 with a normal confidence interval over the deals
+"""
+import copy
+import numpy as np
+
+from .texas_games import NoLimitTexasGame
+from .tournament import get_bb_per_100
+
+
+class DuplicateEvaluator(object):
+    def __init__(self, judge, models, seat_num=6, big_blind=20, init_amount=None, seed=0, memo=None):
+        """
+        :param models: K agents, seat_num copies in total, K divides seat_num
+        :param memo: for copy.deepcopy, e.g. {id(pr_calc): pr_calc} to share the pr_calc
+        """
+        assert seat_num % len(models) == 0
+        self.model_num = len(models)
+        self.seat_num = seat_num
+        self.big_blind = big_blind
+        self.init_amount = big_blind * 100 if init_amount is None else init_amount
+        # agents[m][n]: copy of model m at seat n, the agents keep their state (e.g. cache) of the seats
+        self.agents = [[copy.deepcopy(model, dict(memo)) for _ in range(seat_num)]
+                       for model, memo in zip(models, self._get_memos(models, memo))]
+        for m, agents in enumerate(self.agents):
+            for n, agent in enumerate(agents):
+                agent._agent_index = m * seat_num + n
+                if hasattr(agent, "is_test"):
+                    agent.is_test = True
+        self._game = NoLimitTexasGame(judge, big_blind)
+        self._random_state = np.random.RandomState(seed)
+
+    @staticmethod
+    def _get_memos(models, memo):
+        """
+        :return: the memo of each model, with a frozen copy of its q_learner (copied once) if any
+        """
+        memos = []
+        for model in models:
+            model_memo = dict(memo or {})
+            learner = getattr(model, "q_learner", None)
+            if learner is not None:
+                if not learner.is_frozen:
+                    learner = copy.deepcopy(learner, dict(model_memo))
+                    learner.is_frozen = True
+                model_memo[id(model.q_learner)] = learner
+            memos.append(model_memo)
+        return memos
+
+    def run_a_deal(self):
+        """
+        :return: [K], chips won per seat of the models, averaged over the rotations
+        """
+        deck = self._game.total_cards.copy()
+        self._random_state.shuffle(deck)
+        scores = np.zeros(self.model_num)
+        for r in range(self.model_num):
+            models = [(n + r) % self.model_num for n in range(self.seat_num)]
+            agents = [self.agents[m][n] for n, m in enumerate(models)]
+            for agent in agents:
+                agent.set_amount(self.init_amount)
+            amounts = self._game.run_a_hand(agents, is_verbose=False, deck=deck)
+            for n, agent in enumerate(agents):
+                agent.set_reward(amounts[n])
+                scores[models[n]] += amounts[n]
+        return scores / self.seat_num
+
+    def run(self, deal_num):
+        """
+        :return: [deal_num, K] scores of the deals
+        """
+        return np.array([self.run_a_deal() for _ in range(deal_num)])
+
+    def get_bb_per_100(self, scores, z=1.96):
+        """
+        :return: [(bb/100, (low, high))] of the models
+        """
+        return [get_bb_per_100(scores[:, m], self.big_blind, z) for m in range(self.model_num)]
@@ -0,0 +1,102 @@
+"""
+Exact equity by enumeration, for the turn & the river
+- boards: the river (turn) or the community cards (river)
+- opponents: all hole card pairs out of the left cards
+- weighted equivalence classes: suits matter only for the flush symbol (the only symbol with >= 3 board cards)
+  - opponent cards: (digit, is-flush-symbol) pairs are evaluated once
+  - boards: rivers of the same (digit, is-flush-symbol) are evaluated once
+Heads-up equity is exact; multiway equity assumes opponents are independent given the board
+"""
+import math
+import numpy as np
+
+from .poker import PokerConst
+from .judge import encode_cards
+
+
+class ExactPrCalc(object):
+    MAX_COMMON_NUM = 5
+    MIN_COMMON_NUM = 4
+
+    def __init__(self, judge, pr_calc=None):
+        """
+        :param pr_calc: for the pre-flop & the flop, None for not supported
+        """
+        self.judge = judge
+        self._pr_calc = pr_calc
+        self.total_codes = np.arange(PokerConst.DIGIT_NUM * 4)
+
+    def get_pr(self, hole_cards, common_cards=None, player_num=2, **kwargs):
+        common_cards = [] if common_cards is None else common_cards
+        if len(common_cards) < self.MIN_COMMON_NUM:
+            if self._pr_calc is None:
+                raise ValueError("exact equity needs %d+ community cards" % self.MIN_COMMON_NUM)
+            return self._pr_calc.get_pr(hole_cards, common_cards, player_num, **kwargs)
+        p_wins, p_ties = self.get_win_tie_prs(hole_cards, common_cards)
+        return float(self.get_multiway_prs(p_wins, p_ties, player_num - 1).mean())
+
+    def get_win_tie_prs(self, hole_cards, common_cards):
+        """
+        :return: [B], [B], pr of beating/tying one opponent for each board
+        """
+        hole_codes = encode_cards([hole_cards])[0]
+        common_codes = encode_cards([common_cards])[0]
+        left_codes = np.setdiff1d(self.total_codes, np.concatenate([hole_codes, common_codes]))
+        firsts, seconds = np.triu_indices(len(left_codes), 1)
+        if len(common_cards) == self.MAX_COMMON_NUM:
+            boards = common_codes[None, :]
+            board_indexes, pair_indexes = np.nonzero(np.ones((1, len(firsts)), dtype=bool))
+        else:
+            # board n gets the river left_codes[n], which is not available for opponents
+            rivers = np.arange(len(left_codes))[:, None]
+            boards = np.concatenate([np.tile(common_codes, (len(left_codes), 1)), left_codes[:, None]], axis=1)
+            board_indexes, pair_indexes = np.nonzero((firsts != rivers) & (seconds != rivers))
+        first_codes = left_codes[firsts[pair_indexes]]
+        second_codes = left_codes[seconds[pair_indexes]]
+
+        # equivalence classes, card key: digit * 2 + is-flush-symbol
+        # boards of the same (flush symbol, river key) share classes, the turn cards are the same
+        board_symbols = boards // PokerConst.DIGIT_NUM
+        symbol_counts = (board_symbols[:, :, None] == np.arange(4)).sum(axis=1)
+        flush_symbols = np.where(symbol_counts.max(axis=1) >= 3, symbol_counts.argmax(axis=1), -1)
+        key_num = PokerConst.DIGIT_NUM * 2
+        river_keys = (boards[:, -1] % PokerConst.DIGIT_NUM) * 2 + (board_symbols[:, -1] == flush_symbols)
+        board_keys = ((flush_symbols + 1) * key_num + river_keys)[board_indexes]
+        flush_symbols = flush_symbols[board_indexes]
+        first_keys = (first_codes % PokerConst.DIGIT_NUM) * 2 + (first_codes // PokerConst.DIGIT_NUM == flush_symbols)
+        second_keys = (second_codes % PokerConst.DIGIT_NUM) * 2 + (
+            second_codes // PokerConst.DIGIT_NUM == flush_symbols)
+        keys = (board_keys * key_num + np.minimum(first_keys, second_keys)) * key_num + np.maximum(
+            first_keys, second_keys)
+        # a dense key space (5 * 26 ** 3) is cheaper than np.unique
+        key_classes = np.zeros(5 * key_num ** 3, dtype=int)
+        key_classes[keys] = 1
+        class_num = key_classes.sum()
+        key_classes[key_classes > 0] = np.arange(class_num)
+        inverse = key_classes[keys]
+        class_indexes = np.zeros(class_num, dtype=int)
+        class_indexes[inverse] = np.arange(len(keys))
+
+        class_codes = np.concatenate([
+            first_codes[class_indexes, None],
+            second_codes[class_indexes, None],
+            boards[board_indexes[class_indexes]],
+        ], axis=1)
+        oppo_strengths = self.judge.rank_batch(class_codes)[inverse]
+        my_strengths = self.judge.rank_batch(
+            np.concatenate([np.tile(hole_codes, (len(boards), 1)), boards], axis=1))[board_indexes]
+
+        pair_nums = np.bincount(board_indexes, minlength=len(boards))
+        p_wins = np.bincount(board_indexes, weights=oppo_strengths < my_strengths, minlength=len(boards))
+        p_ties = np.bincount(board_indexes, weights=oppo_strengths == my_strengths, minlength=len(boards))
+        return p_wins / pair_nums, p_ties / pair_nums
+
+    @staticmethod
+    def get_multiway_prs(p_wins, p_ties, oppo_num):
+        """
+        Share of the pot against oppo_num independent opponents, t of them tie
+        """
+        prs = np.zeros(len(p_wins))
+        for t in range(oppo_num + 1):
+            prs += math.comb(oppo_num, t) * p_ties ** t * p_wins ** (oppo_num - t) / (t + 1)
+        return prs
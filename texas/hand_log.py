@@ -0,0 +1,197 @@
+"""
+Hand history log, one fixed-width binary record per hand
+- file: HEADER (magic, version, record size) + records, append-only
+- record: seed, hand index, num, big blind, seat cards, board, amounts, action stream
+  - cards: card codes (see judge), NO_CARD for the cards not dealt/seats not used
+  - action stream: one uint64 per action, bet << 16 | round << 12 | seat << 8 | action + 1
+    the blinds, the decisions & the calls with no decision needed, in order
+- HandLogWriter: buffered, HandLogReader: np.memmap, filter by array masks, replay by TexasContext
+"""
+import os
+import numpy as np
+
+from .common import AgentAction, TexasRound
+from .judge import encode_card, decode_card
+from .texas_games import TexasContext
+
+
+MAX_PLAYER_NUM = 10
+MAX_ACTION_NUM = 64
+NO_CARD = 0xff
+MAGIC = b"TXHL"
+VERSION = 1
+
+RECORD_DTYPE = np.dtype([
+    ("seed", "<i8"),            # -1 for None
+    ("hand", "<u4"),            # hand index of the game
+    ("num", "u1"),
+    ("is_truncated", "u1"),     # more than MAX_ACTION_NUM actions
+    ("action_num", "<u2"),
+    ("big_blind", "<u4"),
+    ("hole_cards", "u1", (MAX_PLAYER_NUM, 2)),
+    ("board", "u1", (5, )),
+    ("amounts", "<i8", (MAX_PLAYER_NUM, )),
+    ("actions", "<u8", (MAX_ACTION_NUM, )),
+])
+HEADER_DTYPE = np.dtype([("magic", "S4"), ("version", "<u4"), ("record_size", "<u4"), ("reserved", "<u4")])
+
+
+def pack_action(round_, index, action, bet):
+    return (bet << 16) | (round_ << 12) | (index << 8) | (action + 1)
+
+
+def unpack_actions(packed):
+    """
+    :param packed: uint64 array
+    :return: rounds, seats, actions, bets, int arrays
+    """
+    packed = np.asarray(packed, dtype=np.uint64)
+    return (
+        ((packed >> 12) & 0xf).astype(int),
+        ((packed >> 8) & 0xf).astype(int),
+        (packed & 0xff).astype(int) - 1,
+        (packed >> 16).astype(np.int64),
+    )
+
+
+class HandLogWriter(object):
+    def __init__(self, fname, buffer_size=4096):
+        self._fname = fname
+        if not os.path.exists(fname) or os.path.getsize(fname) == 0:
+            with open(fname, "wb") as fout:
+                fout.write(np.array([(MAGIC, VERSION, RECORD_DTYPE.itemsize, 0)], dtype=HEADER_DTYPE).tobytes())
+        else:
+            check_header(fname)
+        self._fout = open(fname, "ab")
+        self._buffer = np.zeros(buffer_size, dtype=RECORD_DTYPE)
+        self._buffer_num = 0
+        self._actions = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start_hand(self):
+        """
+        Drop the actions of a hand not written, e.g. aborted by an error
+        """
+        self._actions = []
+
+    def add_action(self, round_, index, action, bet):
+        self._actions.append(pack_action(round_, index, action, bet))
+
+    def write_hand(self, seed, hand, big_blind, agent_cards, community_cards, amounts):
+        """
+        :param agent_cards: [num] hole cards, (symbol, digit)
+        """
+        record = self._buffer[self._buffer_num]
+        num = len(agent_cards)
+        record["seed"] = -1 if seed is None else seed
+        record["hand"] = hand
+        record["num"] = num
+        record["big_blind"] = big_blind
+        record["hole_cards"] = NO_CARD
+        record["hole_cards"][:num] = [[encode_card(c) for c in cards] for cards in agent_cards]
+        record["board"] = NO_CARD
+        record["board"][:len(community_cards)] = [encode_card(c) for c in community_cards]
+        record["amounts"] = 0
+        record["amounts"][:num] = amounts
+        actions = self._actions[:MAX_ACTION_NUM]
+        record["is_truncated"] = len(self._actions) > MAX_ACTION_NUM
+        record["action_num"] = len(actions)
+        record["actions"] = 0
+        record["actions"][:len(actions)] = actions
+        self._actions = []
+        self._buffer_num += 1
+        if self._buffer_num == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        self._fout.write(self._buffer[:self._buffer_num].tobytes())
+        self._fout.flush()
+        self._buffer_num = 0
+
+    def close(self):
+        if self._fout is None:
+            return
+        self.flush()
+        self._fout.close()
+        self._fout = None
+
+
+def check_header(fname):
+    header = np.fromfile(fname, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header[0]["magic"] != MAGIC:
+        raise ValueError("%s is not a hand log" % fname)
+    if header[0]["version"] != VERSION or header[0]["record_size"] != RECORD_DTYPE.itemsize:
+        raise ValueError("%s: version %d, record size %d not supported" % (
+            fname, header[0]["version"], header[0]["record_size"]))
+
+
+class HandLogReader(object):
+    """
+    records: structured np.memmap, e.g. reader.records["amounts"][:, 0].sum()
+    """
+    def __init__(self, fname):
+        check_header(fname)
+        size = os.path.getsize(fname) - HEADER_DTYPE.itemsize
+        if size // RECORD_DTYPE.itemsize == 0:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        else:
+            self.records = np.memmap(fname, dtype=RECORD_DTYPE, mode="r", offset=HEADER_DTYPE.itemsize,
+                                     shape=(size // RECORD_DTYPE.itemsize, ))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, item):
+        return self.records[item]
+
+    def filter(self, num=None, is_showdown=None, seat=None, min_amount=None):
+        """
+        :param seat: with min_amount, hands that seat won >= min_amount
+        :return: indexes of the hands
+        """
+        records = self.records
+        mask = np.ones(len(records), dtype=bool)
+        if num is not None:
+            mask &= records["num"] == num
+        if is_showdown is not None:
+            # a seat folds once at most, the padding actions are 0
+            fold_nums = ((records["actions"] & 0xff) == AgentAction.Fold + 1).sum(axis=1)
+            mask &= (records["num"] - fold_nums > 1) == is_showdown
+        if seat is not None and min_amount is not None:
+            mask &= records["amounts"][:, seat] >= min_amount
+        return np.nonzero(mask)[0]
+
+    @staticmethod
+    def get_cards(record):
+        """
+        :return: hole cards [num], community cards, (symbol, digit) like NoLimitTexasGame
+        """
+        num = int(record["num"])
+        agent_cards = [[decode_card(int(c)) for c in cards] for cards in record["hole_cards"][:num]]
+        community_cards = [decode_card(int(c)) for c in record["board"] if c != NO_CARD]
+        return agent_cards, community_cards
+
+    def replay(self, index, game):
+        """
+        Apply the action stream to a TexasContext & settle it again
+        :param game: NoLimitTexasGame, for the settlement
+        :return: amounts, context
+        """
+        record = self.records[index]
+        if record["is_truncated"]:
+            raise ValueError("hand %d is truncated" % index)
+        agent_cards, community_cards = self.get_cards(record)
+        context = TexasContext(int(record["num"]), int(record["big_blind"]))
+        rounds, seats, actions, bets = unpack_actions(record["actions"][:record["action_num"]])
+        for n in range(len(rounds)):
+            if context.round is not None and rounds[n] != context.round:
+                context.finish_a_scan(is_round_over=True)
+            context.round = TexasRound(rounds[n])
+            context.set_action_bet(int(seats[n]), AgentAction(actions[n]), int(bets[n]))
+        context.finish_a_scan(is_round_over=True)
+        return game.shut_down([], agent_cards, community_cards, context, False), context
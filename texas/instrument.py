@@ -0,0 +1,189 @@
+"""
+Instrumentation of the hot calls, named timers & counters
+- components: hand (run_a_hand), equity (get_pr), judge (rank), decision (get_bet), q_update (update), settlement
+- enable() patches the methods of the classes/modules below with timed wrappers, disable() restores them,
+  nothing is left in the code paths when disabled
+- only the current process is patched, the worker processes (e.g. the self-play actors) are not instrumented
+- the times are inclusive (equity & q_update are inside decision, all inside hand), a nested call of the same
+  component is counted once, by the outermost one
+- report_hand_num: print the stats every n hands; profile_hands: cProfile a window of n hands to a pstats file
+"""
+import cProfile
+import importlib
+import inspect
+import io
+import pstats
+import time
+
+
+COMPONENTS = ("hand", "equity", "judge", "decision", "q_update", "settlement")
+# component: (modules, attributes), the classes of the modules that define the attributes, or the module functions
+TARGETS = {
+    "hand": (("texas.texas_games", "texas.batch_games"), ("run_a_hand", )),
+    "equity": (("texas.pr_cache", "texas.preflop", "texas.enumeration", "texas.monte_carlo", "texas.direct_cmp",
+                "texas.direct_calc"), ("get_pr", )),
+    "judge": (("texas.judge", ), ("rank", "rank_batch")),
+    "decision": (("texas.agent.naive_agents", "texas.agent.key_state_agent", "texas.agent.human_agent"),
+                 ("get_bet", "get_bets")),
+    "q_update": (("rl.q_learner", ), ("update", "update_batch")),
+    "settlement": (("texas.settlement", ), ("divide_the_money", "divide_the_money_batch")),
+}
+
+_active = None
+
+
+def get_targets():
+    """
+    :return: [(component, owner, attribute)], owner is a class or a module
+    """
+    targets = []
+    for name, (module_names, attrs) in TARGETS.items():
+        for module_name in module_names:
+            module = importlib.import_module(module_name)
+            for attr in attrs:
+                if inspect.isfunction(vars(module).get(attr)):
+                    targets.append((name, module, attr))
+            for obj in vars(module).values():
+                if not inspect.isclass(obj) or obj.__module__ != module.__name__:
+                    continue
+                for attr in attrs:
+                    if attr in vars(obj):
+                        targets.append((name, obj, attr))
+    return targets
+
+
+class Instrument(object):
+    def __init__(self, report_hand_num=None):
+        """
+        :param report_hand_num: print the stats every n hands, None for never
+        """
+        self.report_hand_num = report_hand_num
+        self.seconds = dict.fromkeys(COMPONENTS, 0.0)
+        self.counts = dict.fromkeys(COMPONENTS, 0)
+        self._depths = dict.fromkeys(COMPONENTS, 0)
+        self._patches = []
+        self._beg_time = time.perf_counter()
+        self._profile = None
+        self._profile_window = None
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disable()
+
+    def _wrap(self, name, func):
+        seconds = self.seconds
+        counts = self.counts
+        depths = self._depths
+        is_hand = name == "hand"
+
+        def wrapper(*args, **kwargs):
+            if depths[name] > 0:
+                return func(*args, **kwargs)
+            if is_hand:
+                self._on_hand_start()
+            depths[name] += 1
+            beg = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds[name] += time.perf_counter() - beg
+                depths[name] -= 1
+                # a batch game plays table_num hands at a time
+                counts[name] += getattr(args[0], "table_num", 1) if is_hand else 1
+                if is_hand:
+                    self._on_hand_end()
+        wrapper.__wrapped__ = func
+        wrapper.__name__ = func.__name__
+        return wrapper
+
+    def enable(self):
+        global _active
+        if _active is self:
+            return
+        if _active is not None:
+            raise RuntimeError("another Instrument is enabled")
+        for name, owner, attr in get_targets():
+            original = vars(owner)[attr]
+            if isinstance(original, staticmethod):
+                patched = staticmethod(self._wrap(name, original.__func__))
+            else:
+                patched = self._wrap(name, original)
+            setattr(owner, attr, patched)
+            self._patches.append((owner, attr, original))
+        _active = self
+        self.reset()
+
+    def disable(self):
+        global _active
+        if _active is not self:
+            return
+        for owner, attr, original in reversed(self._patches):
+            setattr(owner, attr, original)
+        self._patches = []
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile = None
+        _active = None
+
+    def reset(self):
+        for name in COMPONENTS:
+            self.seconds[name] = 0.0
+            self.counts[name] = 0
+        self._beg_time = time.perf_counter()
+
+    def profile_hands(self, hand_num, fname, skip_hand_num=0):
+        """
+        cProfile the hands [skip_hand_num, skip_hand_num + hand_num) from now on, then dump the pstats to fname
+        """
+        start = self.counts["hand"] + skip_hand_num
+        self._profile_window = (start, start + hand_num, fname)
+
+    def _on_hand_start(self):
+        if self._profile_window is not None and self._profile is None and \
+                self.counts["hand"] >= self._profile_window[0]:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def _on_hand_end(self):
+        if self._profile is not None and self.counts["hand"] >= self._profile_window[1]:
+            self._profile.disable()
+            self._profile.dump_stats(self._profile_window[2])
+            print(self.format_profile(self._profile), flush=True)
+            self._profile = None
+            self._profile_window = None
+        if self.report_hand_num and self.counts["hand"] % self.report_hand_num == 0:
+            print(self.format_stats(), flush=True)
+
+    def get_stats(self):
+        """
+        :return: dict(seconds, hands, decisions, hands/sec, decisions/sec, breakdown={component: (seconds, share)})
+            share: of the hand time
+        """
+        seconds = time.perf_counter() - self._beg_time
+        hand_seconds = self.seconds["hand"] or seconds
+        return {
+            "seconds": seconds,
+            "hands": self.counts["hand"],
+            "decisions": self.counts["decision"],
+            "hands/sec": self.counts["hand"] / seconds if seconds > 0 else 0.0,
+            "decisions/sec": self.counts["decision"] / seconds if seconds > 0 else 0.0,
+            "breakdown": {name: (self.seconds[name], self.seconds[name] / hand_seconds if hand_seconds > 0 else 0.0)
+                          for name in COMPONENTS},
+        }
+
+    def format_stats(self):
+        stats = self.get_stats()
+        lines = ["hands %d, %.1f hands/sec, decisions %d, %.1f decisions/sec" % (
+            stats["hands"], stats["hands/sec"], stats["decisions"], stats["decisions/sec"])]
+        for name, (seconds, share) in stats["breakdown"].items():
+            lines.append("\t%-10s %10.3fs %6.1f%% %10d calls" % (name, seconds, share * 100, self.counts[name]))
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_profile(profile, line_num=20):
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(line_num)
+        return stream.getvalue()
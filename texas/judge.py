@@ -3,13 +3,17 @@ Judge
 set_: 最好的一组5张牌
 cards: 手牌
 Card: size=2数组表示(symbol, digit)
+Card code: (symbol - 1) * 13 + (digit - 2), 0-51, the same order as Simulator.total_cards
+Strength: level + 5 digits of set_, packed together as hex (0 for missing digits), the larger the better
 """
 
 from collections import defaultdict
 import enum
+import itertools
 import numpy as np
 
-from .poker import PokerDigit, PokerSymbol, PokerCard
+from .poker import PokerDigit, PokerSymbol, PokerCard, PokerConst
+from .common import TexasConst
 
 
 class TexasLevel(enum.IntEnum):
@@ -26,22 +30,316 @@ class TexasLevel(enum.IntEnum):
     unknown = 0
 
 
+def encode_card(card):
+    return (card[0] - PokerSymbol.heart) * PokerConst.DIGIT_NUM + (card[1] - PokerConst.MIN_DIGIT)
+
+
+def decode_card(code):
+    return PokerSymbol.heart + code // PokerConst.DIGIT_NUM, PokerConst.MIN_DIGIT + code % PokerConst.DIGIT_NUM
+
+
+def pack_strength(level, digits):
+    strength = level
+    for n in range(TexasConst.BEST_HAND_SIZE):
+        strength = (strength << 4) + (digits[n] if n < len(digits) else 0)
+    return strength
+
+
+def get_strength_level(strength):
+    return TexasLevel(strength >> (4 * TexasConst.BEST_HAND_SIZE))
+
+
+def get_straight_digits(mask):
+    """
+    :param mask: bit n is set if digit n exists
+    :return: digits of the highest straight, or None
+    """
+    for high in range(PokerDigit.A, TexasConst.BEST_HAND_SIZE, -1):
+        if (mask >> (high - 4)) & 0b11111 == 0b11111:
+            return tuple(range(high, high - TexasConst.BEST_HAND_SIZE, -1))
+    if mask & (1 << PokerDigit.A) and (mask >> 2) & 0b1111 == 0b1111:
+        return 5, 4, 3, 2, PokerDigit.A
+    return None
+
+
+class HandEvaluator(object):
+    """
+    Lookup-table evaluator, the same results as TexasJudge._get_level_set
+    - rank table: {sum of digit keys: strength}, flush ignored
+    - flush table: [digit mask] -> strength of flush/straight flush
+    - flush symbols: [sum of symbol keys] -> the symbol with 5+ cards
+    Tables are shared by all instances and built at the first construction
+    """
+    # at most 4 cards per digit, quinary keys never carry
+    DIGIT_KEYS = [0] * PokerConst.MIN_DIGIT + [5 ** n for n in range(PokerConst.DIGIT_NUM)]
+    # at most 7 cards per symbol, 3 bits (SYMBOL_BITS) never carry
+    SYMBOL_BITS = 3
+    SYMBOL_KEYS = [0] + [1 << (3 * n) for n in range(PokerSymbol.heart, PokerSymbol.club + 1)]
+
+    _rank_table = None
+    _flush_table = None
+    _flush_symbols = None
+
+    def __init__(self):
+        if HandEvaluator._rank_table is None:
+            HandEvaluator._build_tables()
+
+    @staticmethod
+    def _get_count_strength(digit_counts):
+        """
+        :param digit_counts: [(digit, count)], sorted by digit descending
+        """
+        def kickers(excluded, num):
+            return [d for d, _ in digit_counts if d not in excluded][:num]
+
+        # stable, digits are still descending for the same count
+        counted = sorted(digit_counts, key=lambda dc: dc[1], reverse=True)
+        first, first_cnt = counted[0]
+        second, second_cnt = counted[1] if len(counted) >= 2 else (PokerDigit.unknown, 0)
+        if first_cnt >= 4:
+            return pack_strength(TexasLevel.four, [first] * 4 + kickers((first, ), 1))
+        if first_cnt == 3 and second_cnt >= 2:
+            return pack_strength(TexasLevel.full_house, [first] * 3 + [second] * 2)
+        if first_cnt == 3:
+            return pack_strength(TexasLevel.three, [first] * 3 + kickers((first, ), 2))
+        if first_cnt == 2 and second_cnt == 2:
+            return pack_strength(TexasLevel.two_pairs, [first] * 2 + [second] * 2 + kickers((first, second), 1))
+        if first_cnt == 2:
+            return pack_strength(TexasLevel.pair, [first] * 2 + kickers((first, ), 3))
+        return pack_strength(TexasLevel.high_card, kickers((), 5))
+
+    @staticmethod
+    def _fill_rank_table(rank_table, digit_counts, digit_key, max_digit, max_size):
+        """
+        Depth-first, digit_counts: [(digit, count)] sorted by digit descending, 1 <= count <= 4
+        """
+        if digit_counts:
+            strength = HandEvaluator._get_count_strength(digit_counts)
+            if len(digit_counts) >= TexasConst.BEST_HAND_SIZE:
+                straight_digits = get_straight_digits(sum(1 << d for d, _ in digit_counts))
+                if straight_digits is not None:
+                    strength = max(strength, pack_strength(TexasLevel.straight, straight_digits))
+            rank_table[digit_key] = strength
+        for digit in range(max_digit, PokerConst.MIN_DIGIT - 1, -1):
+            for cnt in range(1, min(4, max_size) + 1):
+                digit_counts.append((digit, cnt))
+                HandEvaluator._fill_rank_table(
+                    rank_table, digit_counts, digit_key + HandEvaluator.DIGIT_KEYS[digit] * cnt,
+                    digit - 1, max_size - cnt)
+                digit_counts.pop()
+
+    @staticmethod
+    def build_flush_table():
+        """
+        :return: [digit mask] -> strength of flush/straight flush, 0 for less than 5 digits
+        """
+        digits = range(PokerConst.MIN_DIGIT, PokerConst.MAX_DIGIT + 1)
+        flush_table = [0] * (1 << (PokerConst.MAX_DIGIT + 1))
+        for combination in itertools.chain.from_iterable(
+                itertools.combinations(digits, size)
+                for size in range(TexasConst.BEST_HAND_SIZE, TexasConst.MAX_HAND_SIZE + 1)):
+            mask = sum(1 << d for d in combination)
+            straight_digits = get_straight_digits(mask)
+            if straight_digits is not None:
+                flush_table[mask] = pack_strength(TexasLevel.straight_flush, straight_digits)
+            else:
+                flush_table[mask] = pack_strength(TexasLevel.flush, sorted(combination, reverse=True))
+        return flush_table
+
+    @staticmethod
+    def _build_tables():
+        rank_table = {}
+        HandEvaluator._fill_rank_table(rank_table, [], 0, PokerDigit.A, TexasConst.MAX_HAND_SIZE)
+        flush_table = HandEvaluator.build_flush_table()
+
+        symbol_bits = HandEvaluator.SYMBOL_BITS
+        flush_symbols = [PokerSymbol.unknown] * (1 << (symbol_bits * (PokerSymbol.club + 1)))
+        for key in range(len(flush_symbols)):
+            for symbol in range(PokerSymbol.heart, PokerSymbol.club + 1):
+                if (key >> (symbol_bits * symbol)) & 0b111 >= TexasConst.BEST_HAND_SIZE:
+                    flush_symbols[key] = symbol
+
+        HandEvaluator._rank_table = rank_table
+        HandEvaluator._flush_table = flush_table
+        HandEvaluator._flush_symbols = flush_symbols
+
+    def evaluate(self, cards):
+        """
+        :param cards: 1-7 cards, (symbol, digit)
+        :return: strength
+        """
+        digit_keys = self.DIGIT_KEYS
+        symbol_keys = self.SYMBOL_KEYS
+        digit_key = 0
+        symbol_key = 0
+        for symbol, digit in cards:
+            digit_key += digit_keys[digit]
+            symbol_key += symbol_keys[symbol]
+        strength = self._rank_table[digit_key]
+        flush_symbol = self._flush_symbols[symbol_key]
+        if flush_symbol:
+            mask = 0
+            for symbol, digit in cards:
+                if symbol == flush_symbol:
+                    mask |= 1 << digit
+            strength = max(strength, self._flush_table[mask])
+        return strength
+
+    def evaluate_codes(self, codes):
+        """
+        :param codes: 1-7 card codes
+        """
+        return self.evaluate([decode_card(c) for c in codes])
+
+
+class BatchHandEvaluator(object):
+    """
+    Vectorized evaluator for card codes of shape [N, M], M <= 7, the same strengths as HandEvaluator
+    - digit histograms -> four/full house/three/two pairs/pair/high card
+    - symbol counts -> flush symbol -> digit mask of the flush symbol -> flush table
+    - digit mask -> straight table
+    Rows are evaluated in chunks to bound the memory of temporary arrays
+    """
+    CHUNK_SIZE = 1 << 16
+    DIGITS = np.arange(PokerConst.MIN_DIGIT, PokerConst.MAX_DIGIT + 1, dtype=np.int16)
+    SYMBOLS = np.arange(PokerSymbol.club - PokerSymbol.heart + 1)
+
+    _flush_table = None
+    _straight_table = None
+    _code_digit_indexes = None
+    _code_bits = None
+
+    def __init__(self):
+        if BatchHandEvaluator._flush_table is None:
+            BatchHandEvaluator._build_tables()
+
+    @staticmethod
+    def _build_tables():
+        straight_table = np.zeros(1 << (PokerConst.MAX_DIGIT + 1), dtype=np.int32)
+        for mask in range(len(straight_table)):
+            straight_digits = get_straight_digits(mask)
+            if straight_digits is not None:
+                straight_table[mask] = pack_strength(TexasLevel.straight, straight_digits)
+        codes = np.arange(PokerConst.DIGIT_NUM * len(BatchHandEvaluator.SYMBOLS))
+        BatchHandEvaluator._flush_table = np.array(HandEvaluator.build_flush_table(), dtype=np.int32)
+        BatchHandEvaluator._straight_table = straight_table
+        BatchHandEvaluator._code_digit_indexes = codes % PokerConst.DIGIT_NUM
+        BatchHandEvaluator._code_bits = np.left_shift(
+            1, 16 * (codes // PokerConst.DIGIT_NUM) + codes % PokerConst.DIGIT_NUM + PokerConst.MIN_DIGIT)
+
+    def evaluate(self, codes):
+        """
+        :param codes: int array [N, M], card codes
+        :return: int32 array [N], strengths
+        """
+        codes = np.asarray(codes)
+        assert codes.ndim == 2 and codes.shape[1] <= TexasConst.MAX_HAND_SIZE
+        strengths = np.zeros(len(codes), dtype=np.int32)
+        for beg in range(0, len(codes), self.CHUNK_SIZE):
+            strengths[beg: beg + self.CHUNK_SIZE] = self._evaluate_chunk(codes[beg: beg + self.CHUNK_SIZE])
+        return strengths
+
+    @staticmethod
+    def _pack(level, digit_columns):
+        strengths = np.full(len(digit_columns[0]), level, dtype=np.int32)
+        for digits in digit_columns:
+            strengths = (strengths << 4) + digits
+        return strengths
+
+    def _evaluate_chunk(self, codes):
+        num, size = codes.shape
+        digit_indexes = self._code_digit_indexes[codes]
+
+        # flush & straight: cards never overlap, so the sum is a bitboard of 16 bits per symbol
+        boards = self._code_bits[codes].sum(axis=1)
+        flush_strengths = np.zeros(num, dtype=np.int32)
+        digit_masks = np.zeros(num, dtype=np.int64)
+        for symbol_index in range(len(self.SYMBOLS)):
+            masks = (boards >> (16 * symbol_index)) & 0xFFFF
+            flush_strengths = np.maximum(flush_strengths, self._flush_table[masks])
+            digit_masks |= masks
+        straight_strengths = self._straight_table[digit_masks]
+
+        # numbers: digit groups sorted by (count, digit) descending
+        counts = np.bincount((np.arange(num)[:, None] * PokerConst.DIGIT_NUM + digit_indexes).ravel(),
+                             minlength=num * PokerConst.DIGIT_NUM).reshape((num, PokerConst.DIGIT_NUM))
+        group_keys = ((counts.astype(np.int16) << 4) + self.DIGITS) * (counts > 0)
+        group_keys = np.sort(group_keys, axis=1)[:, :-TexasConst.BEST_HAND_SIZE - 1:-1]
+        cnts = [group_keys[:, n] >> 4 for n in range(TexasConst.BEST_HAND_SIZE)]
+        digits = [group_keys[:, n] & 0xF for n in range(TexasConst.BEST_HAND_SIZE)]
+        num_strengths = np.select(
+            [
+                cnts[0] >= 4,
+                (cnts[0] == 3) & (cnts[1] >= 2),
+                cnts[0] == 3,
+                (cnts[0] == 2) & (cnts[1] == 2),
+                cnts[0] == 2,
+            ],
+            [
+                # the kicker might be a single card after a pair/three
+                self._pack(TexasLevel.four, [digits[0]] * 4 + [np.maximum.reduce(digits[1:4])]),
+                self._pack(TexasLevel.full_house, [digits[0]] * 3 + [digits[1]] * 2),
+                self._pack(TexasLevel.three, [digits[0]] * 3 + digits[1:3]),
+                # the kicker might be a single card after the third pair
+                self._pack(TexasLevel.two_pairs,
+                           [digits[0]] * 2 + [digits[1]] * 2 + [np.maximum(digits[2], digits[3])]),
+                self._pack(TexasLevel.pair, [digits[0]] * 2 + digits[1:4]),
+            ],
+            self._pack(TexasLevel.high_card, digits),
+        )
+        return np.maximum(np.maximum(num_strengths, straight_strengths), flush_strengths)
+
+
+def encode_cards(card_lists):
+    """
+    :param card_lists: [[(symbol, digit)]], the same size for each list
+    :return: int array [N, M], card codes
+    """
+    cards = np.array(card_lists, dtype=int).reshape((len(card_lists), -1, 2))
+    return (cards[:, :, 0] - PokerSymbol.heart) * PokerConst.DIGIT_NUM + (cards[:, :, 1] - PokerConst.MIN_DIGIT)
+
+
 class TexasJudge(object):
     BEST_SET_SIZE = 5
     MAX_CARD_SIZE = 7
 
     def __init__(self, is_debug=False):
+        """
+        :param is_debug: print level & best set, using the slow sorting implementation
+        """
         self.is_debug = is_debug
 
     def argmax(self, card_lists):
         if not card_lists:
             return []
-        return self._arg_max([self._get_level_set(cs) for cs in card_lists])
+        if self.is_debug:
+            return self._arg_max([self._get_level_set(cs) for cs in card_lists])
+        strengths = self.get_strengths(card_lists)
+        best_strength = max(strengths)
+        return [n for n, strength in enumerate(strengths) if strength == best_strength]
 
     def rank(self, card_lists):
         if not card_lists:
             return []
-        return self._rank([self._get_level_set(cs) for cs in card_lists])
+        if self.is_debug:
+            return self._rank([self._get_level_set(cs) for cs in card_lists])
+        strengths = self.get_strengths(card_lists)
+        _, ranks = np.unique(-np.array(strengths), return_inverse=True)
+        return ranks.astype(int)
+
+    def rank_batch(self, cards):
+        """
+        :param cards: int array [N, 7] (or fewer columns), card codes
+        :return: int32 array [N], strengths
+        """
+        return BatchHandEvaluator().evaluate(cards)
+
+    def get_strengths(self, card_lists):
+        """
+        :return: [strength], comparable 32-bit ints
+        """
+        evaluate = HandEvaluator().evaluate
+        return [evaluate(cs) for cs in card_lists]
 
     def _arg_max(self, level_best_sets):
         """
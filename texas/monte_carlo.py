@@ -1,7 +1,23 @@
+import os
 import numpy as np
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 from texas.poker import PokerConst, PokerSymbol
+from texas.judge import TexasLevel, encode_cards, get_strength_level
+
+
+def get_wilson_interval(pr, trial_num, z=1.96):
+    """
+    Wilson score interval, also conservative for tie shares in [0, 1] (variance <= pr * (1 - pr))
+    :return: low, high
+    """
+    if trial_num == 0:
+        return 0.0, 1.0
+    denom = 1 + z * z / trial_num
+    center = (pr + z * z / (2 * trial_num)) / denom
+    half = z * np.sqrt(pr * (1 - pr) / trial_num + z * z / (4 * trial_num * trial_num)) / denom
+    return max(center - half, 0.0), min(center + half, 1.0)
 
 
 class Simulator(object):
@@ -90,3 +106,224 @@ class Simulator(object):
             level_counts[level] += 1
         np.random.set_state(random_state)
         return level_counts
+
+
+class BatchSimulator(Simulator):
+    """
+    All trials at once
+    - trials: random keys -> argpartition, an index matrix of left cards [trial_num, draw_num]
+    - community & opponent cards: fancy indexing
+    - every seat: judge.rank_batch
+    A local Generator seeded by seed per call, the global random state is untouched
+    """
+    def __init__(self, judge, seed=0):
+        super().__init__(judge)
+        self.total_codes = encode_cards([self.total_cards])[0]
+        self._seed = seed
+
+    def _draw(self, cards, common_cards, draw_num, trial_num, rng):
+        """
+        :return: common codes [trial_num, 5], drawn codes [trial_num, draw_num - (5 - len(common_cards))]
+        """
+        known_codes = encode_cards([list(cards) + list(common_cards)])[0]
+        left_codes = np.setdiff1d(self.total_codes, known_codes)
+        keys = rng.random((trial_num, len(left_codes)))
+        indexes = np.argpartition(keys, draw_num - 1, axis=1)[:, :draw_num]
+        # argpartition doesn't shuffle, order the drawn cards by their keys
+        orders = np.argsort(np.take_along_axis(keys, indexes, axis=1), axis=1)
+        drawn_codes = left_codes[np.take_along_axis(indexes, orders, axis=1)]
+        common_num = self.MAX_COMMON_NUM - len(common_cards)
+        common_codes = np.concatenate([
+            np.tile(known_codes[len(cards):], (trial_num, 1)),
+            drawn_codes[:, :common_num]
+        ], axis=1)
+        return common_codes, drawn_codes[:, common_num:]
+
+    def get_pr(self, cards, common_cards=None, player_num=2, trial_num=100):
+        """
+        :return: 胜率
+        """
+        assert len(cards) == 2
+        if common_cards is None:
+            common_cards = []
+        assert len(common_cards) <= self.MAX_COMMON_NUM
+        wins = self.get_wins(cards, common_cards, player_num, trial_num, np.random.default_rng(self._seed))
+        return wins[0] / wins.sum()
+
+    def get_pr_interval(self, cards, common_cards=None, player_num=2, std_err=0.01, max_trial_num=100000,
+                        batch_size=1000, thresholds=(), z=1.96):
+        """
+        Trials in batches, stop once the Wilson interval is narrower than +-z * std_err,
+        or it lies on one side of every threshold (the decision is known)
+        :return: 胜率, (low, high), trial number used
+        """
+        assert len(cards) == 2
+        if common_cards is None:
+            common_cards = []
+        assert len(common_cards) <= self.MAX_COMMON_NUM
+        rng = np.random.default_rng(self._seed)
+        win = 0.0
+        trial_num = 0
+        low, high = 0.0, 1.0
+        while trial_num < max_trial_num:
+            num = min(batch_size, max_trial_num - trial_num)
+            win += self.get_wins(cards, common_cards, player_num, num, rng)[0]
+            trial_num += num
+            low, high = get_wilson_interval(win / trial_num, trial_num, z)
+            if high - low <= 2 * z * std_err:
+                break
+            if thresholds and all(high < t or low > t for t in thresholds):
+                break
+        return float(win / trial_num), (float(low), float(high)), trial_num
+
+    def get_wins(self, cards, common_cards, player_num, trial_num, rng):
+        """
+        :return: [player_num], 各座位的胜场, 平局均分
+        """
+        draw_num = self.MAX_COMMON_NUM - len(common_cards) + (player_num - 1) * 2
+        common_codes, hole_codes = self._draw(cards, common_cards, draw_num, trial_num, rng)
+        seat_codes = [np.concatenate([np.tile(encode_cards([cards])[0], (trial_num, 1)), common_codes], axis=1)]
+        for j in range(player_num - 1):
+            seat_codes.append(np.concatenate([hole_codes[:, j * 2: j * 2 + 2], common_codes], axis=1))
+        # [trial_num * player_num, 7] -> [trial_num, player_num]
+        strengths = self.judge.rank_batch(np.stack(seat_codes, axis=1).reshape((-1, len(seat_codes[0][0]))))
+        strengths = strengths.reshape((trial_num, player_num))
+        winners = strengths == strengths.max(axis=1, keepdims=True)
+        return (winners / winners.sum(axis=1, keepdims=True)).sum(axis=0)
+
+    def get_level_counts(self, cards, common_cards=None, trial_num=100):
+        """
+        :return: 各种牌型的概率
+        """
+        assert len(cards) == 2
+        if common_cards is None:
+            common_cards = []
+        assert len(common_cards) <= self.MAX_COMMON_NUM
+        return self._to_level_counts(
+            self.get_level_nums(cards, common_cards, trial_num, np.random.default_rng(self._seed)))
+
+    def get_level_nums(self, cards, common_cards, trial_num, rng):
+        """
+        :return: [level_num], 各牌型的次数, index = strength >> 20
+        """
+        common_codes, _ = self._draw(cards, common_cards, self.MAX_COMMON_NUM - len(common_cards), trial_num, rng)
+        codes = np.concatenate([np.tile(encode_cards([cards])[0], (trial_num, 1)), common_codes], axis=1)
+        return np.bincount(self.judge.rank_batch(codes) >> 20, minlength=TexasLevel.straight_flush.value + 1)
+
+    @staticmethod
+    def _to_level_counts(level_nums):
+        level_counts = defaultdict(int)
+        for level in np.nonzero(level_nums)[0]:
+            level_counts[get_strength_level(int(level) << 20)] = int(level_nums[level])
+        return level_counts
+
+
+class AdaptiveSimulator(BatchSimulator):
+    """
+    get_pr by get_pr_interval, precise only near the decision boundaries of StaticAgent/BraveAgent: 1 / num, 0.5
+    """
+    def __init__(self, judge, std_err=0.01, max_trial_num=10000, batch_size=500, seed=0):
+        super().__init__(judge, seed)
+        self.std_err = std_err
+        self.max_trial_num = max_trial_num
+        self.batch_size = batch_size
+        # the trial numbers used, for get_mean_trial_num
+        self.pr_num = 0
+        self.trial_num_sum = 0
+
+    def get_pr(self, cards, common_cards=None, player_num=2, trial_num=None):
+        """
+        :param trial_num: None for max_trial_num
+        """
+        pr, _, trial_num = self.get_pr_interval(
+            cards, common_cards, player_num, self.std_err, trial_num or self.max_trial_num, self.batch_size,
+            thresholds=(1.0 / player_num, 0.5)
+        )
+        self.pr_num += 1
+        self.trial_num_sum += trial_num
+        return pr
+
+    def get_mean_trial_num(self):
+        """
+        :return: the mean trial number of get_pr so far, 0 if none
+        """
+        return self.trial_num_sum / self.pr_num if self.pr_num else 0.0
+
+
+_worker_simulator = None
+
+
+def _init_worker(judge):
+    global _worker_simulator
+    _worker_simulator = BatchSimulator(judge)
+
+
+def _run_worker(method, args, seed_seq):
+    return getattr(_worker_simulator, method)(*args, np.random.default_rng(seed_seq))
+
+
+class ParallelSimulator(BatchSimulator):
+    """
+    BatchSimulator over a persistent process pool
+    - trials are split into worker_num parts, part i draws from SeedSequence(seed).spawn(worker_num)[i]
+    - parts are combined in order, so the result only depends on seed & worker_num
+    - worker_num = 1 runs in this process, the same streams, no pool
+    The pool is created on first use, call close() (or use with) to shut it down
+    """
+    def __init__(self, judge, worker_num=None, seed=0):
+        super().__init__(judge, seed)
+        self.worker_num = worker_num or os.cpu_count() or 1
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _map(self, method, args, trial_num):
+        """
+        :return: results of the parts, in order
+        """
+        trial_nums = [trial_num // self.worker_num + (i < trial_num % self.worker_num) for i in range(self.worker_num)]
+        seed_seqs = np.random.SeedSequence(self._seed).spawn(self.worker_num)
+        if self.worker_num == 1:
+            return [getattr(self, method)(*args, trial_nums[0], np.random.default_rng(seed_seqs[0]))]
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.worker_num, initializer=_init_worker, initargs=(self.judge,))
+        futures = [
+            self._executor.submit(_run_worker, method, args + (n,), seed_seq)
+            for n, seed_seq in zip(trial_nums, seed_seqs) if n > 0
+        ]
+        return [f.result() for f in futures]
+
+    def get_pr(self, cards, common_cards=None, player_num=2, trial_num=100):
+        """
+        :return: 胜率
+        """
+        assert len(cards) == 2
+        if common_cards is None:
+            common_cards = []
+        assert len(common_cards) <= self.MAX_COMMON_NUM
+        wins = sum(self._map("get_wins", (list(cards), list(common_cards), player_num), trial_num))
+        return wins[0] / wins.sum()
+
+    def get_level_counts(self, cards, common_cards=None, trial_num=100):
+        """
+        :return: 各种牌型的概率
+        """
+        assert len(cards) == 2
+        if common_cards is None:
+            common_cards = []
+        assert len(common_cards) <= self.MAX_COMMON_NUM
+        return self._to_level_counts(sum(self._map("get_level_nums", (list(cards), list(common_cards)), trial_num)))
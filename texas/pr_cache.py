@@ -0,0 +1,114 @@
+"""
+Equity cache shared by agents
+- key: (hole cards, community cards, player_num) canonicalized under suit permutation
+  - per symbol: (sorted hole digits, sorted community digits), then sorted over symbols
+  - equivalent states (e.g. AhKh vs AsKs preflop) share one key
+- LRU: bounded, with hit/miss/eviction counters
+"""
+from collections import OrderedDict
+
+from .poker import PokerSymbol
+
+
+SYMBOLS = (PokerSymbol.heart, PokerSymbol.diamond, PokerSymbol.spade, PokerSymbol.club)
+
+
+def _get_suit_keys(hole_cards, common_cards):
+    """
+    :return: {symbol: (sorted hole digits, sorted community digits)} for all the SYMBOLS
+    """
+    hole_digits = {}
+    common_digits = {}
+    for symbol, digit in hole_cards:
+        hole_digits.setdefault(symbol, []).append(digit)
+    for symbol, digit in common_cards:
+        common_digits.setdefault(symbol, []).append(digit)
+    return {s: (tuple(sorted(hole_digits.get(s, ()))), tuple(sorted(common_digits.get(s, ())))) for s in SYMBOLS}
+
+
+def get_canonical_key(hole_cards, common_cards, player_num):
+    return tuple(sorted(_get_suit_keys(hole_cards, common_cards).values())), player_num
+
+
+def get_canonical_cards(hole_cards, common_cards):
+    """
+    Remap the suits to the representatives of the canonical key, the cards are sorted
+    - the suits are ordered as in get_canonical_key, the i-th one becomes SYMBOLS[i]
+    - suits with the same digits are interchangeable, any order of them gives the same cards
+    :return: hole cards, common cards
+    """
+    suit_keys = _get_suit_keys(hole_cards, common_cards)
+    symbols = {symbol: SYMBOLS[n] for n, symbol in enumerate(sorted(SYMBOLS, key=suit_keys.get))}
+    return (sorted((symbols[symbol], digit) for symbol, digit in hole_cards),
+            sorted((symbols[symbol], digit) for symbol, digit in common_cards))
+
+
+class LruCache(object):
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, key, default=None):
+        value = self._values.get(key, default)
+        if key in self._values:
+            self._values.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return value
+
+    def put(self, key, value):
+        self._values[key] = value
+        self._values.move_to_end(key)
+        if len(self._values) > self._capacity:
+            self._values.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._values.clear()
+
+    def get_stats(self):
+        return {
+            "size": len(self._values),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / max(self.hits + self.misses, 1),
+        }
+
+
+class CachedPrCalc(object):
+    """
+    Wrap any pr_calc, share one instance among agents
+    - keyword arguments (e.g. trial_num) are not part of the key
+    - the wrapped pr_calc is asked with the canonical cards (get_canonical_cards), so the value only depends on
+      the key, not on which of the equivalent states is asked first (Monte Carlo is not suit invariant)
+    - the cached values are not pickled/copied with the agents
+    """
+    def __init__(self, pr_calc, capacity=100000):
+        self._pr_calc = pr_calc
+        self._capacity = capacity
+        self.cache = LruCache(capacity)
+
+    def get_pr(self, hole_cards, common_cards=None, player_num=2, **kwargs):
+        common_cards = [] if common_cards is None else common_cards
+        key = get_canonical_key(hole_cards, common_cards, player_num)
+        pr = self.cache.get(key)
+        if pr is None:
+            pr = self._pr_calc.get_pr(*get_canonical_cards(hole_cards, common_cards), player_num, **kwargs)
+            self.cache.put(key, pr)
+        return pr
+
+    def get_stats(self):
+        return self.cache.get_stats()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["cache"] = LruCache(self._capacity)
+        return state
@@ -0,0 +1,76 @@
+"""
+Preflop equity table
+- 169 hole classes: a 13x13 matrix, row/col = A..2 of the higher/lower digit
+  - pairs on the diagonal, suited above it (row < col), off-suit below it (row > col)
+- table: float32 [MAX_PLAYER_NUM + 1, 169], row = player_num, built by gen_preflop_table.py
+"""
+import os
+import numpy as np
+
+from .poker import PokerConst, PokerSymbol
+
+
+CLASS_NUM = PokerConst.DIGIT_NUM ** 2
+MIN_PLAYER_NUM = 2
+MAX_PLAYER_NUM = 10
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "preflop_equity.npy")
+
+
+def get_hole_class(hole_cards):
+    (sym1, digit1), (sym2, digit2) = hole_cards
+    high, low = max(digit1, digit2), min(digit1, digit2)
+    row, col = PokerConst.MAX_DIGIT - high, PokerConst.MAX_DIGIT - low
+    if sym1 == sym2:
+        return row * PokerConst.DIGIT_NUM + col
+    return col * PokerConst.DIGIT_NUM + row
+
+
+def get_class_cards(hole_class):
+    """
+    :return: representative hole cards of the class
+    """
+    row, col = divmod(hole_class, PokerConst.DIGIT_NUM)
+    if row < col:
+        return [(PokerSymbol.heart, PokerConst.MAX_DIGIT - row), (PokerSymbol.heart, PokerConst.MAX_DIGIT - col)]
+    return [(PokerSymbol.heart, PokerConst.MAX_DIGIT - col), (PokerSymbol.diamond, PokerConst.MAX_DIGIT - row)]
+
+
+def build_table(simulator, trial_num, verbose=False):
+    """
+    :param simulator: Simulator-like, get_pr(cards, common_cards, player_num, trial_num)
+    """
+    table = np.zeros((MAX_PLAYER_NUM + 1, CLASS_NUM), dtype=np.float32)
+    for hole_class in range(CLASS_NUM):
+        cards = get_class_cards(hole_class)
+        for player_num in range(MIN_PLAYER_NUM, MAX_PLAYER_NUM + 1):
+            table[player_num, hole_class] = simulator.get_pr(cards, [], player_num, trial_num=trial_num)
+        if verbose:
+            print(hole_class, cards, table[MIN_PLAYER_NUM:, hole_class], flush=True)
+    return table
+
+
+def load_table(fname=TABLE_PATH):
+    if not os.path.exists(fname):
+        return None
+    return np.load(fname)
+
+
+PREFLOP_TABLE = load_table()
+
+
+class PreflopTablePrCalc(object):
+    """
+    O(1) lookup before the flop, pr_calc otherwise
+    """
+    def __init__(self, pr_calc, table=None):
+        """
+        :param table: None for PREFLOP_TABLE, which is not pickled with the agents
+        """
+        self._pr_calc = pr_calc
+        self._table = table
+
+    def get_pr(self, hole_cards, common_cards=None, player_num=2, **kwargs):
+        table = PREFLOP_TABLE if self._table is None else self._table
+        if not common_cards and table is not None and MIN_PLAYER_NUM <= player_num <= MAX_PLAYER_NUM:
+            return float(table[player_num, get_hole_class(hole_cards)])
+        return self._pr_calc.get_pr(hole_cards, common_cards, player_num, **kwargs)
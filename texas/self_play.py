@@ -0,0 +1,153 @@
+"""
+Self-play training, actors & one learner
+- actor: a worker process, NoLimitTexasGame with agent_num copies of the model, all of them share an ActorQLearner
+  - every batch_hand_num hands: put (actor index, hand number, transitions) to the transition queue,
+    then take the tables broadcast so far
+- learner: QLearner of the model, applies the transitions in the order they come
+  - every broadcast_batch_num batches: the values of the states changed since the last broadcast to every actor
+- the actors are off-policy by a few batches at most, the hands/sec scales with the cores
+- the learner checks the actors every poll_seconds w/o transitions, a dead actor stops all of them with an error
+"""
+import copy
+import queue
+import multiprocessing
+import datetime as dt
+
+from .judge import TexasJudge
+from .texas_games import NoLimitTexasGame
+from rl.q_learner import ActorQLearner
+
+
+def _run_actor(actor_index, model, agent_num, big_blind, total_amount, hand_num, batch_hand_num, seed,
+               transition_queue, table_queue):
+    learner = ActorQLearner(model.q_learner._sampler, model.q_learner._alpha, seed)
+    learner.set_values(*table_queue.get())
+    # the agents share the learner & the pr_calc
+    model = copy.copy(model)
+    model.q_learner = learner
+    agents = [copy.deepcopy(model, {id(learner): learner, id(model.pr_calc): model.pr_calc})
+              for _ in range(agent_num)]
+    for n, agent in enumerate(agents):
+        agent._agent_index = n
+        agent.is_test = False
+
+    game = NoLimitTexasGame(TexasJudge(), big_blind, seed=seed)
+    batch_num = 0
+    for hand in range(1, hand_num + 1):
+        # 充钱 or 归零
+        for agent in agents:
+            if agent.get_amount() < big_blind or agent.get_amount() > total_amount * 10:
+                agent.set_amount(total_amount)
+        amounts = game.run_a_hand(agents, is_verbose=False)
+        for n, agent in enumerate(agents):
+            agent.set_reward(amounts[n])
+        if hand % batch_hand_num == 0 or hand == hand_num:
+            transition_queue.put((actor_index, hand - batch_num * batch_hand_num, learner.pop_transitions()))
+            batch_num += 1
+            while True:
+                try:
+                    learner.set_values(*table_queue.get_nowait())
+                except queue.Empty:
+                    break
+    transition_queue.put((actor_index, 0, None))
+
+
+class SelfPlayTrainer(object):
+    poll_seconds = 5.0
+
+    def __init__(self, model, worker_num=None, agent_num=6, big_blind=20, total_amount=2000, batch_hand_num=100,
+                 broadcast_batch_num=None, seed=0):
+        """
+        :param model: InnerKeyStateAgent, model.q_learner is the learner
+        :param worker_num: None for all cores
+        :param broadcast_batch_num: None for worker_num, i.e. about one batch per actor
+        """
+        self.model = model
+        self.learner = model.q_learner
+        self.worker_num = multiprocessing.cpu_count() if worker_num is None else worker_num
+        self.agent_num = agent_num
+        self.big_blind = big_blind
+        self.total_amount = total_amount
+        self.batch_hand_num = batch_hand_num
+        self.broadcast_batch_num = self.worker_num if broadcast_batch_num is None else broadcast_batch_num
+        self.seed = seed
+        self.hand_num = 0
+        self.transition_num = 0
+        self.broadcast_num = 0
+        self._epoch = 0
+
+    def _get_table(self, states):
+        q_values = {s: dict(self.learner._q_values[s]) for s in states}
+        q_counts = {s: dict(self.learner._q_counts[s]) for s in states}
+        return q_values, q_counts
+
+    def run(self, hand_num, callback=None):
+        """
+        :param hand_num: per worker
+        :param callback: callback(trainer, seconds) after every broadcast, e.g. for the logs
+        :return: hands/sec
+        """
+        beg_time = dt.datetime.now()
+        transition_queue = multiprocessing.Queue()
+        table_queues = [multiprocessing.Queue() for _ in range(self.worker_num)]
+        table = self._get_table(list(self.learner._q_values))
+        workers = []
+        for n in range(self.worker_num):
+            table_queues[n].put(table)
+            # different decks & explorations every run
+            seed = self.seed + self._epoch * self.worker_num + n
+            worker = multiprocessing.Process(target=_run_actor, args=(
+                n, self.model, self.agent_num, self.big_blind, self.total_amount, hand_num, self.batch_hand_num, seed,
+                transition_queue, table_queues[n]), daemon=True)
+            worker.start()
+            workers.append(worker)
+        self._epoch += 1
+
+        finished = set()
+        batch_num = 0
+        changed_states = set()
+        while len(finished) < self.worker_num:
+            try:
+                actor_index, batch_hand_num, transitions = transition_queue.get(timeout=self.poll_seconds)
+            except queue.Empty:
+                self._check_workers(workers, finished)
+                continue
+            if transitions is None:
+                finished.add(actor_index)
+                continue
+            for state, action, next_state, reward in transitions:
+                self.learner.update(state, action, next_state, reward)
+                changed_states.add(state)
+            self.hand_num += batch_hand_num
+            self.transition_num += len(transitions)
+            batch_num += 1
+            if batch_num % self.broadcast_batch_num == 0:
+                table = self._get_table(changed_states)
+                changed_states = set()
+                for table_queue in table_queues:
+                    table_queue.put(table)
+                self.broadcast_num += 1
+                if callback is not None:
+                    callback(self, (dt.datetime.now() - beg_time).total_seconds())
+        for worker, table_queue in zip(workers, table_queues):
+            # the tables after its last batch are never taken
+            table_queue.cancel_join_thread()
+            worker.join()
+        seconds = (dt.datetime.now() - beg_time).total_seconds()
+        return hand_num * self.worker_num / seconds
+
+    @staticmethod
+    def _check_workers(workers, finished):
+        """
+        Raise if a worker exited w/o finishing, after terminating & joining all of them
+        :param finished: the indices of the workers finished
+        """
+        dead = [n for n, worker in enumerate(workers) if n not in finished and worker.exitcode not in (None, 0)]
+        if not dead:
+            return
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers:
+            worker.join()
+        raise RuntimeError("actor %s died, exitcode %s" % (dead, [workers[n].exitcode for n in dead]))
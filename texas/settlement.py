@@ -0,0 +1,79 @@
+"""
+Side-pot settlement
+- cap of a seat: the main pot when it went all-in, the total pot otherwise (None/0 main pot)
+- seats sorted once by (rank, cap), the best rank first
+- pot layers: each winner in order takes the layer (cap - exhausted), split evenly among the winners
+  of the same rank that are not exhausted yet, in minimal units, the first one gets the odd chips
+divide_the_money: plain ints for 2-10 players, divide_the_money_batch: arrays for K tables
+"""
+import numpy as np
+
+
+def divide_the_money(total_pot, all_in_main_pots, ranks, minimal_unit):
+    """
+    :param ranks: the smaller the better, the same for ties
+    :return: [int], shares of the seats
+    """
+    num = len(ranks)
+    caps = [main_pot if main_pot else total_pot for main_pot in all_in_main_pots]
+    orders = sorted(range(num), key=lambda n: (ranks[n], caps[n]))
+    shares = [0] * num
+    exhausted_pot = 0
+    beg = 0
+    while beg < num and exhausted_pot < total_pot:
+        rank = ranks[orders[beg]]
+        end = beg + 1
+        while end < num and ranks[orders[end]] == rank:
+            end += 1
+        for n in range(beg, end):
+            cap = caps[orders[n]]
+            to_be_share = cap - exhausted_pot
+            if to_be_share <= 0:
+                continue
+            share_num = end - n
+            share = to_be_share // minimal_unit // share_num * minimal_unit
+            shares[orders[n]] += to_be_share - share * (share_num - 1)
+            for m in range(n + 1, end):
+                shares[orders[m]] += share
+            exhausted_pot = cap
+        beg = end
+    return shares
+
+
+def divide_the_money_batch(total_pots, all_in_main_pots, ranks, is_left, minimal_unit):
+    """
+    :param total_pots: [K]
+    :param all_in_main_pots: [K, num], <= 0 for None
+    :param ranks: [K, num], the smaller the better, e.g. -strengths
+    :param is_left: [K, num], False for the folded seats
+    :return: int64 [K, num], shares
+    """
+    table_num, num = ranks.shape
+    total_pots = np.asarray(total_pots, dtype=np.int64)
+    caps = np.where(all_in_main_pots > 0, all_in_main_pots, total_pots[:, None]).astype(np.int64)
+    # sorted once: the left seats by (rank, cap), then the folded
+    orders = np.lexsort((caps, ranks, ~is_left), axis=-1)
+    caps = np.take_along_axis(caps, orders, axis=1)
+    ranks = np.take_along_axis(ranks, orders, axis=1)
+    is_left = np.take_along_axis(is_left, orders, axis=1)
+    # group end of each position: the first position with another rank
+    positions = np.arange(num)
+    is_group_end = np.ones((table_num, num), dtype=bool)
+    is_group_end[:, :-1] = (ranks[:, 1:] != ranks[:, :-1]) | ~is_left[:, 1:]
+    ends = np.where(is_group_end, positions + 1, num)
+    ends = np.minimum.accumulate(ends[:, ::-1], axis=1)[:, ::-1]
+
+    shares = np.zeros((table_num, num), dtype=np.int64)
+    exhausted_pots = np.zeros(table_num, dtype=np.int64)
+    for n in range(num):
+        to_be_shares = np.where(is_left[:, n], caps[:, n] - exhausted_pots, 0)
+        is_shared = to_be_shares > 0
+        to_be_shares[~is_shared] = 0
+        share_nums = ends[:, n] - n
+        per_shares = to_be_shares // minimal_unit // share_nums * minimal_unit
+        shares += per_shares[:, None] * ((positions > n) & (positions < ends[:, n, None]))
+        shares[:, n] += to_be_shares - per_shares * (share_nums - 1)
+        exhausted_pots = np.where(is_shared, caps[:, n], exhausted_pots)
+    amounts = np.zeros((table_num, num), dtype=np.int64)
+    np.put_along_axis(amounts, orders, shares, axis=1)
+    return amounts
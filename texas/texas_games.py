@@ -4,10 +4,12 @@
 action: check/bet/raise/raise_more/all_in/fold
 phase: pre-flop/flop/Turn/river
 """
+import array
 import numpy as np
 
 from .poker import PokerSymbol, PokerConst, PokerCard
 from .common import AgentAction, TexasRound
+from . import settlement
 
 
 class AgentWrongBetError(Exception):
@@ -22,31 +24,79 @@ class GameNoWinnerError(Exception):
     pass
 
 
+# AgentAction by value, Padding(-1) is the last one
+ACTIONS = tuple(sorted(AgentAction, key=lambda x: x.value % len(AgentAction)))
+HAND_OVER_ACTIONS = frozenset((AgentAction.Fold, AgentAction.All_in))
+
+
 class TexasContext(object):
+    """
+    - per-seat state: fixed-size arrays, actions as AgentAction values
+    - history: preallocated rows (one per scan) of actions & bets, doubled when full
+    - running sum & max of latest_bets, get_max_earning is O(1) for the largest bet
+    Reused for hands of the same num, see reset
+    """
+    __slots__ = (
+        "num", "big_blind", "round", "cum_bets", "all_in_main_pots", "total_pot",
+        "num_left", "num_all_in", "latest_bets", "latest_actions",
+        "_bet_sum", "_max_bet", "_row_num", "_row_capacity", "_row_rounds", "_row_actions", "_row_bets",
+    )
+    INIT_ROW_CAPACITY = 16
+
     def __init__(self, num, big_blind):
         # basic info
         self.num = num
         self.big_blind = big_blind
 
         # history
-        self.round_action_records = [[], [], [], []]
-        self.round_bet_records = [[], [], [], []]
-
+        self._row_capacity = self.INIT_ROW_CAPACITY
+        self._row_rounds = array.array("b", bytes(self._row_capacity))
+        self._row_actions = array.array("b", bytes(self._row_capacity * num))
+        self._row_bets = array.array("q", bytes(8 * self._row_capacity * num))
+
+        self.cum_bets = array.array("q", bytes(8 * num))  # cumulative bets before this round
+        self.latest_bets = array.array("q", bytes(8 * num))
+        self.latest_actions = array.array("b", bytes(num))
+        self.all_in_main_pots = [None] * num
+        self.reset()
+
+    def reset(self):
+        """
+        For a new hand
+        """
+        num = self.num
+        self._row_num = 0
         self.round = None
-        self.cum_bets = [0] * num  # cumulative bets before this round
-
+        self.cum_bets[:] = array.array("q", bytes(8 * num))
         # the total amount of money in main pot when the agent all-in
-        self.all_in_main_pots = [None] * num
+        self.all_in_main_pots[:] = [None] * num
         self.total_pot = 0
 
         # latest actions in this round & to accelerate calculations
         self.num_left = num
         self.num_all_in = 0
-        self.latest_bets = [0] * num
-        self.latest_actions = [AgentAction.Blind] * num
+        self.latest_bets[:] = array.array("q", bytes(8 * num))
+        self.latest_actions[:] = array.array("b", [AgentAction.Blind] * num)
+        self._bet_sum = 0
+        self._max_bet = 0
+
+    @property
+    def round_action_records(self):
+        return self._get_records(self._row_actions, lambda x: ACTIONS[x])
+
+    @property
+    def round_bet_records(self):
+        return self._get_records(self._row_bets, int)
+
+    def _get_records(self, rows, convert):
+        records = [[], [], [], []]
+        num = self.num
+        for n in range(self._row_num):
+            records[self._row_rounds[n]].append([convert(x) for x in rows[n * num: n * num + num]])
+        return records
 
     def get_action_bet(self, index):
-        return self.latest_actions[index], self.latest_bets[index]
+        return ACTIONS[self.latest_actions[index]], self.latest_bets[index]
 
     def set_action_bet(self, index, action, bet):
         if self.latest_actions[index] != action:
@@ -54,43 +104,67 @@ class TexasContext(object):
                 self.num_left -= 1
             if action == AgentAction.All_in:
                 self.num_all_in += 1
-        self.latest_actions[index], self.latest_bets[index] = action, bet
+            self.latest_actions[index] = action
+        latest_bet = self.latest_bets[index]
+        if bet == latest_bet:
+            return
+        self.latest_bets[index] = bet
+        self._bet_sum += bet - latest_bet
+        if bet > self._max_bet:
+            self._max_bet = bet
+        elif latest_bet == self._max_bet:  # all-in with less than the blind
+            self._max_bet = max(self.latest_bets)
 
     def get_max_earning(self, my_bet):
+        if my_bet >= self._max_bet:
+            return self.total_pot + self._bet_sum
         total_amt = self.total_pot
         for bet in self.latest_bets:
             total_amt += min(bet, my_bet)
         return total_amt
 
     def finish_a_scan(self, is_round_over, index=None):
+        num = self.num
+        latest_actions = self.latest_actions
+        latest_bets = self.latest_bets
         if is_round_over and index is not None:
-            for n in range(index+1, len(self.latest_actions)):
-                if not self.latest_actions[n].is_hand_over():
-                    self.latest_actions[n] = AgentAction.Padding
-        round_ = self.round
-        self.round_action_records[round_].append(self.latest_actions[:])
-        self.round_bet_records[round_].append(self.latest_bets[:])
+            for n in range(index+1, num):
+                if latest_actions[n] not in HAND_OVER_ACTIONS:
+                    latest_actions[n] = AgentAction.Padding
+        self._append_row()
         if is_round_over:
-            for n in range(self.num):
-                if self.latest_actions[n] == AgentAction.All_in and (
-                        round_ == TexasRound.PreFlop
-                        or self.round_action_records[round_ - 1][-1][n] != AgentAction.All_in
-                ):  # new all-in
+            for n in range(num):
+                # new all-in, all_in_main_pots is set when the agent all-in in a former round
+                if latest_actions[n] == AgentAction.All_in and self.all_in_main_pots[n] is None:
                     main_pot = self.total_pot
-                    for m in range(self.num):
-                        main_pot += min(self.latest_bets[m], self.latest_bets[n])
+                    my_bet = latest_bets[n]
+                    for bet in latest_bets:
+                        main_pot += min(bet, my_bet)
                     self.all_in_main_pots[n] = main_pot
-            for n in range(self.num):
-                self.cum_bets[n] += self.latest_bets[n]
-            for n in range(self.num):
-                self.total_pot += self.latest_bets[n]
-            # update latest
-            for n in range(self.num):
-                if not self.latest_actions[n].is_hand_over():
-                    self.latest_actions[n] = AgentAction.Blind
-                self.latest_bets[n] = 0
+            for n in range(num):
+                self.cum_bets[n] += latest_bets[n]
+                # update latest
+                if latest_actions[n] not in HAND_OVER_ACTIONS:
+                    latest_actions[n] = AgentAction.Blind
+                latest_bets[n] = 0
+            self.total_pot += self._bet_sum
+            self._bet_sum = 0
+            self._max_bet = 0
         return
 
+    def _append_row(self):
+        num = self.num
+        if self._row_num == self._row_capacity:
+            self._row_rounds.extend(self._row_rounds)
+            self._row_actions.extend(self._row_actions)
+            self._row_bets.extend(self._row_bets)
+            self._row_capacity *= 2
+        n = self._row_num
+        self._row_rounds[n] = self.round
+        self._row_actions[n * num: n * num + num] = self.latest_actions
+        self._row_bets[n * num: n * num + num] = self.latest_bets
+        self._row_num += 1
+
     def is_one_winner(self):
         return self.num_left <= 1
 
@@ -99,7 +173,10 @@ class TexasContext(object):
 
 
 class NoLimitTexasGame(object):
-    def __init__(self, judge, big_blind=20, minimal_unit=10, *, seed=None):
+    def __init__(self, judge, big_blind=20, minimal_unit=10, *, seed=None, hand_log=None):
+        """
+        :param hand_log: hand_log.HandLogWriter, None for no log
+        """
         self._big_blind = big_blind
         self._minimal_unit = 10
         self._small_blind = max(big_blind // minimal_unit // 2, 1) * minimal_unit
@@ -113,55 +190,76 @@ class NoLimitTexasGame(object):
         symbols += [PokerSymbol.spade.value] * PokerConst.DIGIT_NUM
         symbols += [PokerSymbol.club.value] * PokerConst.DIGIT_NUM
         self.total_cards = np.array([symbols, list(digits) * 4]).T
+        self._context = None
+        self._seed = seed
+        self._hand_index = 0
+        self._hand_log = hand_log
+
+    def _get_context(self, num):
+        """
+        One context for all the hands
+        """
+        if self._context is None or self._context.num != num:
+            self._context = TexasContext(num, self._big_blind)
+        else:
+            self._context.reset()
+        return self._context
 
-    def run_a_hand(self, agents, is_verbose, is_public=False):
+    def run_a_hand(self, agents, is_verbose, is_public=False, *, deck=None):
+        """
+        :param deck: [52, 2] cards in the order of dealing, None to shuffle total_cards
+        """
         if is_verbose:
             print("***Starting a new hand***")
+        if self._hand_log is not None:
+            self._hand_log.start_hand()
         agent_cards = []
-        context = TexasContext(len(agents), self._big_blind)
+        context = self._get_context(len(agents))
         # shuffle
-        np.random.shuffle(self.total_cards)
+        if deck is None:
+            np.random.shuffle(self.total_cards)
+            deck = self.total_cards
         # pre-flop
         for n, agent in enumerate(agents):
             agent.start_new_game()
-            hole_cards = self.total_cards[n * 2: n * 2 + 2, :].tolist()
+            hole_cards = deck[n * 2: n * 2 + 2, :].tolist()
             agent.get_hole_cards(hole_cards)
             agent_cards.append(hole_cards)
             if is_public:
                 print(agent.get_name(), " ".join(str(PokerCard(*c)) for c in hole_cards))
         self._run_a_round(TexasRound.PreFlop, agents, context, is_verbose)
         if context.is_one_winner():
-            return self.shut_down(agents, agent_cards, [], context, is_verbose)
+            return self._finish_a_hand(agents, agent_cards, [], context, is_verbose)
         # flop
         card_index = len(agents) * 2 + 1
-        community_cards = self.total_cards[card_index: card_index + 3, :].tolist()
+        community_cards = deck[card_index: card_index + 3, :].tolist()
         if is_verbose:
             print("Flop - Community cards: ", ' '.join(str(PokerCard(*c)) for c in community_cards))
         for agent in agents:
             agent.get_community_cards(community_cards)
         self._run_a_round(TexasRound.Flop, agents, context, is_verbose)
         if context.is_one_winner():
-            return self.shut_down(agents, agent_cards, community_cards, context, is_verbose)
+            return self._finish_a_hand(agents, agent_cards, community_cards, context, is_verbose)
         # turn
         card_index = card_index + 3 + 1
-        community_cards.append(self.total_cards[card_index].tolist())
+        community_cards.append(deck[card_index].tolist())
         if is_verbose:
             print("Turn - Community cards: ", ' '.join(str(PokerCard(*c)) for c in community_cards))
         for agent in agents:
             agent.get_community_cards(community_cards)
         self._run_a_round(TexasRound.Turn, agents, context, is_verbose)
         if context.is_one_winner():
-            return self.shut_down(agents, agent_cards, community_cards, context, is_verbose)
+            return self._finish_a_hand(agents, agent_cards, community_cards, context, is_verbose)
         # river
         card_index = card_index + 1 + 1
-        community_cards.append(self.total_cards[card_index].tolist())
+        community_cards.append(deck[card_index].tolist())
         if is_verbose:
             print("River - Community cards: ", ' '.join(str(PokerCard(*c)) for c in community_cards))
         for agent in agents:
             agent.get_community_cards(community_cards)
         self._run_a_round(TexasRound.River, agents, context, is_verbose)
         # over
-        return self.shut_down(agents, agent_cards, community_cards, context, is_verbose)
+        return self._finish_a_hand(agents, agent_cards, community_cards, context, is_verbose)
 
     def _check_bet(self, bet, last_bet, action, cur_bet):
         if action == AgentAction.Fold:
@@ -189,6 +287,9 @@ class NoLimitTexasGame(object):
         if round_ == TexasRound.PreFlop:
             context.set_action_bet(0, AgentAction.Blind, self._small_blind)
             context.set_action_bet(1, AgentAction.Blind, self._big_blind)
+            if self._hand_log is not None:
+                self._hand_log.add_action(round_, 0, AgentAction.Blind, self._small_blind)
+                self._hand_log.add_action(round_, 1, AgentAction.Blind, self._big_blind)
             agents[0].set_bet(self._small_blind)
             agents[1].set_bet(self._big_blind)
             if is_verbose:
@@ -206,7 +307,7 @@ class NoLimitTexasGame(object):
             for index in range(start_index, len(agents)):
                 agent = agents[index]
                 latest_action, latest_bet = context.get_action_bet(index)
-                if latest_action.is_hand_over():
+                if latest_action in HAND_OVER_ACTIONS:
                     action, bet = latest_action, latest_bet
                 elif latest_bet == open_bet and context.get_active_num() == 1:
                     # no decision needed
@@ -217,10 +318,12 @@ class NoLimitTexasGame(object):
                 if not self._check_bet(open_bet, latest_bet, action, bet):
                     raise AgentWrongBetError(agent.get_name(), open_bet, latest_bet, action, bet)
                 context.set_action_bet(index, action, bet)
+                if self._hand_log is not None and latest_action not in HAND_OVER_ACTIONS:
+                    self._hand_log.add_action(round_, index, action, bet)
 
                 if bet > open_bet:
                     active_ready_num = 0
-                if not action.is_hand_over():  # only the active counts
+                if action not in HAND_OVER_ACTIONS:  # only the active counts
                     active_ready_num += 1
                 open_bet = max(open_bet, bet)
 
@@ -238,6 +341,14 @@ class NoLimitTexasGame(object):
             start_index = 0
         pass
 
+    def _finish_a_hand(self, agents, agent_cards, community_cards, context, is_verbose):
+        amounts = self.shut_down(agents, agent_cards, community_cards, context, is_verbose)
+        if self._hand_log is not None:
+            self._hand_log.write_hand(self._seed, self._hand_index, self._big_blind,
+                                      agent_cards, community_cards, amounts)
+        self._hand_index += 1
+        return amounts
+
     def shut_down(self, agents, agent_cards, community_cards, context, is_verbose):
         indexes = []
         for n, action in enumerate(context.latest_actions):
@@ -263,7 +374,7 @@ class NoLimitTexasGame(object):
         if is_verbose:
             print("End of the game")
             for index in indexes:
-                print("\t", agents[index].get_name(), context.latest_actions[index].name, end=" ")
+                print("\t", agents[index].get_name(), ACTIONS[context.latest_actions[index]].name, end=" ")
                 if len(indexes) > 1:
                     print(" ".join(str(PokerCard(*x)) for x in agent_cards[index]))
                 else:
@@ -284,41 +395,8 @@ class NoLimitTexasGame(object):
                 for record in bet_records:
                     print(TexasRound(n).name, '\t'.join(str(x) for x in record), sep="\t")
             print("Cumulative bets")
-            print(context.cum_bets)
+            print(list(context.cum_bets))
         return amounts
 
     def _divide_the_money(self, total_pot, all_in_main_pots, ranks):
-        ranks = np.array(ranks)
-        org_indexes = np.arange(len(ranks), dtype=int)
-        share_amounts = np.zeros(len(ranks), dtype=int)
-        exhausted_pot = 0
-        rank_level = ranks.min() - 1
-        while exhausted_pot < total_pot:
-            rank_level += 1
-            best_indexes = org_indexes[ranks == rank_level]
-            winner_all_in_pots = []
-            for index in best_indexes:
-                main_pot = all_in_main_pots[org_indexes[index]]
-                winner_all_in_pots.append(main_pot if main_pot else total_pot)
-            indexes = np.argsort(winner_all_in_pots)
-            best_indexes = np.array(best_indexes)[indexes]
-            winner_all_in_pots = np.array(winner_all_in_pots)[indexes]
-            share_num = len(best_indexes) + 1
-            for n, index in enumerate(best_indexes):
-                share_num -= 1
-                main_pot = winner_all_in_pots[n]
-                to_be_share = main_pot - exhausted_pot
-                if to_be_share <= 0:
-                    continue
-                shares = self._divide_evenly(to_be_share, share_num)
-                for m in range(len(shares)):
-                    share_amounts[org_indexes[best_indexes[m + n]]] += shares[m]
-                exhausted_pot = main_pot
-        return share_amounts
-
-    def _divide_evenly(self, amount, num):
-        if num == 1:
-            return [amount]
-        share = (amount // self._minimal_unit // num) * self._minimal_unit
-        last_share = amount - share * (num - 1)
-        return [last_share] + [share] * (num - 1)
+        return settlement.divide_the_money(total_pot, all_in_main_pots, ranks, self._minimal_unit)
@@ -0,0 +1,173 @@
+"""
+Tournament of agents
+- roster: "static"/"brave"/"random", model directories (see agent/model_io.py) or pickled models
+- match: two agents, copy_num copies each, seats alternated & rotated every hand, hand_num hands
+  - the seed of match n: SeedSequence([seed, n]), a match is reproducible by run_match(..., seed)
+  - each match has its own pr_calc (and equity cache), the matches run before in the process don't matter
+  - result: [hand_num, 2] chips won by the copy_num seats of each agent
+- pairings: round-robin, or Swiss (by bb/100 so far, no rematch if possible)
+- matches run in worker processes
+- bb/100 with a normal confidence interval over the hands
+"""
+import copy
+import pickle
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from .judge import TexasJudge
+from .texas_games import NoLimitTexasGame
+from .monte_carlo import BatchSimulator
+from .preflop import PreflopTablePrCalc
+from .enumeration import ExactPrCalc
+from .pr_cache import CachedPrCalc
+from .agent import naive_agents, model_io
+
+
+def create_pr_calc():
+    """
+    A new one for each match, shared by the agents of the match
+    """
+    judge = TexasJudge()
+    return CachedPrCalc(PreflopTablePrCalc(ExactPrCalc(judge, BatchSimulator(judge))))
+
+
+def load_agent(name, big_blind, pr_calc=None):
+    """
+    :param name: static/brave/random, a model directory or the file name of a pickled model
+    :param pr_calc: None for a new one
+    """
+    pr_calc = create_pr_calc() if pr_calc is None else pr_calc
+    if name == "static":
+        return naive_agents.StaticAgent(big_blind, 0, pr_calc, 1000)
+    if name == "brave":
+        return naive_agents.BraveAgent(big_blind, 0, pr_calc)
+    if name == "random":
+        return naive_agents.RandomAgent(big_blind, 0)
+    if model_io.is_model_dir(name):
+        return model_io.load_model(name, pr_calc)
+    with open(name, "rb") as fin:
+        agent = pickle.load(fin)
+    agent.is_test = True
+    return agent
+
+
+def get_match_seed(seed, match_index):
+    return int(np.random.SeedSequence([seed, match_index]).generate_state(1)[0])
+
+
+def run_match(left_name, right_name, hand_num, seed, big_blind=20, copy_num=3, init_amount=None):
+    """
+    :return: int array [hand_num, 2], chips won by the seats of left/right
+    """
+    init_amount = big_blind * 100 if init_amount is None else init_amount
+    pr_calc = create_pr_calc()
+    models = [load_agent(left_name, big_blind, pr_calc), load_agent(right_name, big_blind, pr_calc)]
+    agents = []
+    sides = []
+    for _ in range(copy_num):
+        for side, model in enumerate(models):
+            agents.append(copy.deepcopy(model, {id(pr_calc): pr_calc}))
+            sides.append(side)
+    for n, agent in enumerate(agents):
+        agent._agent_index = n
+        agent.set_amount(init_amount)
+
+    game = NoLimitTexasGame(TexasJudge(), big_blind, seed=seed)
+    results = np.zeros((hand_num, 2), dtype=np.int64)
+    for hand in range(hand_num):
+        amounts = game.run_a_hand(agents, is_verbose=False)
+        for n, agent in enumerate(agents):
+            agent.set_reward(amounts[n])
+            results[hand, sides[n]] += amounts[n]
+            if agent.get_amount() < big_blind:
+                agent.set_amount(init_amount)
+        # rotate
+        agents = agents[-1:] + agents[:-1]
+        sides = sides[-1:] + sides[:-1]
+    return results
+
+
+def get_bb_per_100(amounts, big_blind, z=1.96):
+    """
+    :param amounts: chips won per hand
+    :return: bb/100, (low, high)
+    """
+    amounts = np.asarray(amounts, dtype=float) / big_blind * 100
+    mean = amounts.mean()
+    half = z * amounts.std(ddof=1) / np.sqrt(len(amounts)) if len(amounts) > 1 else float("inf")
+    return float(mean), (float(mean - half), float(mean + half))
+
+
+def get_round_robin_pairs(names):
+    return [(i, j) for i in range(len(names)) for j in range(i + 1, len(names))]
+
+
+def get_swiss_pairs(scores, played):
+    """
+    Neighbors by score, the best first, the next one not played yet if possible
+    :param played: set of (i, j), i < j
+    :return: [(i, j)], the odd one out has a bye
+    """
+    orders = sorted(range(len(scores)), key=lambda n: -scores[n])
+    pairs = []
+    while len(orders) > 1:
+        first = orders.pop(0)
+        second = next((n for n in orders if (min(first, n), max(first, n)) not in played), orders[0])
+        orders.remove(second)
+        pairs.append((min(first, second), max(first, second)))
+    return pairs
+
+
+class Tournament(object):
+    def __init__(self, names, hand_num, seed=0, big_blind=20, copy_num=3, worker_num=None):
+        """
+        :param worker_num: None for all cores
+        """
+        self.names = names
+        self.hand_num = hand_num
+        self.seed = seed
+        self.big_blind = big_blind
+        self.copy_num = copy_num
+        self.worker_num = worker_num
+        self.matches = []  # dict(index, left, right, seed, results)
+
+    def _run_matches(self, pairs, executor):
+        futures = []
+        for i, j in pairs:
+            index = len(self.matches) + len(futures)
+            seed = get_match_seed(self.seed, index)
+            future = executor.submit(run_match, self.names[i], self.names[j], self.hand_num, seed,
+                                     self.big_blind, self.copy_num)
+            futures.append((index, i, j, seed, future))
+        for index, i, j, seed, future in futures:
+            self.matches.append({"index": index, "left": i, "right": j, "seed": seed, "results": future.result()})
+
+    def run_round_robin(self):
+        with ProcessPoolExecutor(self.worker_num) as executor:
+            self._run_matches(get_round_robin_pairs(self.names), executor)
+        return self.matches
+
+    def run_swiss(self, round_num):
+        with ProcessPoolExecutor(self.worker_num) as executor:
+            for _ in range(round_num):
+                scores = [x[1] for x in self.get_standings()]
+                played = {(m["left"], m["right"]) for m in self.matches}
+                self._run_matches(get_swiss_pairs(scores, played), executor)
+        return self.matches
+
+    def get_standings(self):
+        """
+        :return: [(name, bb/100 per seat, (low, high), hand number)] in the order of names
+        """
+        amounts = [[] for _ in self.names]
+        for match in self.matches:
+            amounts[match["left"]].append(match["results"][:, 0] / self.copy_num)
+            amounts[match["right"]].append(match["results"][:, 1] / self.copy_num)
+        standings = []
+        for name, xs in zip(self.names, amounts):
+            if not xs:
+                standings.append((name, 0.0, (-float("inf"), float("inf")), 0))
+                continue
+            xs = np.concatenate(xs)
+            standings.append((name, *get_bb_per_100(xs, self.big_blind), len(xs)))
+        return standings
@@ -9,10 +9,15 @@ from texas.texas_games import NoLimitTexasGame
 from texas.judge import TexasJudge
 from texas.monte_carlo import Simulator
 from texas.direct_cmp import ApproxComparer
+from texas.pr_cache import CachedPrCalc
+from texas.duplicate import DuplicateEvaluator
+from texas.self_play import SelfPlayTrainer
+from texas.instrument import Instrument
 from texas.agent import human_agent, naive_agents
-from texas.agent import key_state_agent
+from texas.agent import key_state_agent, model_io
 from texas.common import BaseAgent
 from rl import q_learner, bandit
+from rl.replay import ReplayBuffer
 
 def load_model(fname):
     with open(fname, "rb") as fin:
@@ -21,7 +26,7 @@ def load_model(fname):
 
 def start_game():
     judge = TexasJudge()
-    pr_calc = ApproxComparer()
+    pr_calc = CachedPrCalc(ApproxComparer())
     big_blind = 20
 
     start_epoch = 1000000
@@ -68,6 +73,7 @@ def start_game():
 
     np.random.seed(0)
     game = NoLimitTexasGame(judge, big_blind)
+    beg_time = dt.datetime.now()
 
     for epoch in itertools.count(start=start_epoch+1):
         # 充钱 or 归零
@@ -97,6 +103,8 @@ def start_game():
             print(epoch, end=" ", flush=True)
         if epoch % 10000 == 0:
             print()
+            seconds = (dt.datetime.now() - beg_time).total_seconds()
+            print("hands/sec", trial_num / seconds, "pr-cache", pr_calc.get_stats(), flush=True)
             for n, agent in enumerate(agents):
                 print("\tagent%d" % n,
                       "acc-reward", acc_rewards[n] / trial_num,
@@ -112,9 +120,103 @@ def start_game():
         if epoch % 100000 != 0:
             continue
         for idx in test_agent_indexes:
-            with open("models/InnerKeyStateAgent-index%d-%d.pkl" % (idx, epoch), "wb") as fout:
-                pickle.dump(agents[idx], fout)
+            # luck-cancelled, vs StaticAgent
+            agents[idx].is_test = True
+            evaluator = DuplicateEvaluator(
+                judge, [agents[idx], naive_agents.StaticAgent(big_blind, 0, pr_calc, 1000)],
+                big_blind=big_blind, seed=epoch, memo={id(pr_calc): pr_calc})
+            bb_per_100, (low, high) = evaluator.get_bb_per_100(evaluator.run(200))[0]
+            print("epoch", epoch, "index", idx, "duplicate bb/100 %.2f [%.2f, %.2f]" % (bb_per_100, low, high),
+                  flush=True)
+            model_io.save_model("models/InnerKeyStateAgent-index%d-%d" % (idx, epoch), agents[idx], epoch=epoch)
+
+
+def start_parallel_game(worker_num, hand_num=10000):
+    """
+    Actors in worker processes, the learner here, hand_num hands per worker between the checkpoints
+    """
+    judge = TexasJudge()
+    pr_calc = CachedPrCalc(ApproxComparer())
+    big_blind = 20
+
+    model = load_model("models/InnerKeyStateAgent-q2-vs_naive-1000000.pkl")
+    trainer = SelfPlayTrainer(model, worker_num, big_blind=big_blind, total_amount=2000)
+
+    def print_stats(trainer_, seconds):
+        if trainer_.broadcast_num % 100 == 0:
+            print("hands", trainer_.hand_num, "transitions", trainer_.transition_num, "seconds", seconds, flush=True)
+
+    for epoch in itertools.count(start=1):
+        hands_per_sec = trainer.run(hand_num, print_stats)
+        print("epoch", epoch, "hands", trainer.hand_num, "hands/sec", hands_per_sec, flush=True)
+        model.is_test = True
+        evaluator = DuplicateEvaluator(
+            judge, [model, naive_agents.StaticAgent(big_blind, 0, pr_calc, 1000)],
+            big_blind=big_blind, seed=epoch, memo={id(pr_calc): pr_calc})
+        bb_per_100, (low, high) = evaluator.get_bb_per_100(evaluator.run(200))[0]
+        print("epoch", epoch, "duplicate bb/100 %.2f [%.2f, %.2f]" % (bb_per_100, low, high), flush=True)
+        model_io.save_model("models/InnerKeyStateAgent-parallel-%d" % trainer.hand_num, model,
+                            hand_num=trainer.hand_num)
+
+
+def start_replay_game(learn_hand_num=1000, batch_size=4096, batch_num=20):
+    """
+    DenseQLearner, the agents only collect the transitions, learn in bulk every learn_hand_num hands:
+    the new transitions once, then batch_num batches sampled from all of them
+    """
+    judge = TexasJudge()
+    pr_calc = CachedPrCalc(ApproxComparer())
+    big_blind = 20
+    quantizer5 = key_state_agent.State5Quantizer()
+    learner = key_state_agent.create_dense_q_learner(
+        bandit.EpsilonGreedySampler(eps_end=0.2, eps_decay=100000), 0.01, quantizer5)
+    learner.replay_buffer = ReplayBuffer(1 << 20)
+    replay_buffer = ReplayBuffer(1 << 22)
+    agents = [key_state_agent.InnerKeyStateAgent(big_blind, 2000, pr_calc, quantizer5, learner) for _ in range(6)]
+    game = NoLimitTexasGame(judge, big_blind, seed=0)
+    beg_time = dt.datetime.now()
+
+    for epoch in itertools.count(start=1):
+        for agent in agents:
+            if agent.get_amount() < big_blind or agent.get_amount() > 2000 * 10:
+                agent.set_amount(2000)
+        amounts = game.run_a_hand(agents, is_verbose=False)
+        for n, agent in enumerate(agents):
+            agent.set_reward(amounts[n])
+        if epoch % learn_hand_num != 0:
+            continue
+        transitions = learner.replay_buffer.get_all()
+        learner.replay_buffer.clear()
+        learner.update_batch(*transitions)
+        replay_buffer.add_batch(*transitions)
+        for _ in range(batch_num):
+            learner.update_batch(*replay_buffer.sample(batch_size))
+        if epoch % 10000 == 0:
+            seconds = (dt.datetime.now() - beg_time).total_seconds()
+            print("epoch", epoch, "hands/sec", epoch / seconds, "transitions", len(replay_buffer),
+                  "states", learner.table.get_visited_num(), flush=True)
+        if epoch % 100000 == 0:
+            model_io.save_model("models/InnerKeyStateAgent-replay-%d" % epoch, agents[0], epoch=epoch)
 
 
 if __name__ == "__main__":
-    start_game()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-w", "--worker_num", type=int, default=0, help="actor/learner self-play, 0 for single process")
+    parser.add_argument("-r", "--replay", action="store_true", help="dense Q-table, learn from a replay buffer")
+    parser.add_argument("-p", "--profile", type=int, default=0, help="time breakdown every n hands, 0 for off")
+    parser.add_argument("--pstats", type=int, default=0, help="cProfile n hands after 1000 hands to train.pstats")
+    args = parser.parse_args()
+    if (args.profile > 0 or args.pstats > 0) and args.worker_num > 0:
+        # the hands are played by the actor processes, not instrumented
+        parser.error("--profile/--pstats only instrument this process, not supported with --worker_num")
+    if args.profile > 0 or args.pstats > 0:
+        instrument = Instrument(args.profile or None)
+        instrument.enable()
+        if args.pstats > 0:
+            instrument.profile_hands(args.pstats, "train.pstats", skip_hand_num=1000)
+    if args.worker_num > 0:
+        start_parallel_game(args.worker_num)
+    elif args.replay:
+        start_replay_game()
+    else:
+        start_game()